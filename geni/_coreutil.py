@@ -72,7 +72,7 @@ def disableUrllibWarnings():
         except AttributeError:
             pass
 
-        requests.packages.urllib3.disable_warnings((warnings,))
+        requests.packages.urllib3.disable_warnings(tuple(warnings))
     except ImportError:
         # This version of requests doesn't have requests.packages.urllib3 in it
         return
@@ -120,7 +120,8 @@ try:
     from requests.packages.urllib3.poolmanager import PoolManager
     class TLSHttpAdapter(HTTPAdapter):
         def init_poolmanager(self, connections, maxsize, block=False, **pool_kwargs):
+            # Negotiate the protocol version - pinning TLSv1 leaves no usable ciphers with OpenSSL 3
             self.poolmanager = PoolManager(num_pools = connections, maxsize = maxsize,
-                                                                         block = block, ssl_version = ssl.PROTOCOL_TLSv1)
+                                                                         block = block, ssl_version = ssl.PROTOCOL_TLS)
 except ImportError:
     TLSHttpAdapter = HTTPAdapter
@@ -0,0 +1,175 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+On-disk cache of aggregate advertisements.
+
+The cache is opt-in, and is normally enabled for a context with
+:py:meth:`geni.aggregate.context.Context.enable_ad_cache`, which keeps it in the
+`adcache` directory under the context `datadir`.  Once enabled,
+:py:meth:`geni.aggregate.core.AM.list_resources` returns the cached advertisement for an
+aggregate (keyed by component manager ID and `geni_available`) as long as it is younger
+than the cache TTL, and `list_resources(..., refresh = True)` always goes to the aggregate.
+
+Each entry is a pair of files - the advertisement XML and a small JSON metadata record
+holding the fetch time and a SHA-256 digest of the XML.  Entries that fail the digest
+check are discarded.  When the total size exceeds `max_size` the least recently used
+entries are evicted.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import os.path
+import threading
+import time
+
+from lxml import etree as ET
+
+LOG = logging.getLogger("geni.aggregate.adcache")
+
+DEFAULT_TTL = 3600
+DEFAULT_MAX_SIZE = 256 * 1024 * 1024
+
+
+def _write_atomic (path, data):
+    tmppath = "%s.%d.%d" % (path, os.getpid(), threading.get_ident())
+    with open(tmppath, "wb") as outfile:
+        outfile.write(data)
+    os.replace(tmppath, path)
+
+
+class AdCache(object):
+    """Directory of cached advertisements.
+
+    Args:
+        path (str): Cache directory (created if it does not exist)
+        ttl (float): Maximum age in seconds of an entry returned by :py:meth:`get`
+        max_size (int): Maximum total size in bytes of the cached advertisements
+    """
+
+    def __init__ (self, path, ttl = DEFAULT_TTL, max_size = DEFAULT_MAX_SIZE):
+        self.path = os.path.normpath(os.path.expanduser(path))
+        self.ttl = ttl
+        self.max_size = max_size
+        self._lock = threading.Lock()
+        if not os.path.exists(self.path):
+            os.makedirs(self.path)
+
+    def _paths (self, cmid, available):
+        key = hashlib.sha256(("%s|%s" % (cmid, bool(available))).encode("utf-8")).hexdigest()
+        base = os.path.join(self.path, key)
+        return ("%s.xml" % (base), "%s.json" % (base))
+
+    def _drop (self, xmlpath, metapath):
+        for path in (metapath, xmlpath):
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def get (self, cmid, available = False, ttl = None):
+        """Return the cached `ListResources` result for an aggregate, or `None` if there is no
+        usable entry.
+
+        Args:
+            cmid (str): Component manager ID of the aggregate
+            available (bool): Value of `geni_available` the advertisement was fetched with
+            ttl (float): Override the cache TTL for this lookup
+
+        Returns:
+            dict: `{"code" : ..., "value" : xml, "output" : ...}`, as returned by the API layer
+        """
+        (xmlpath, metapath) = self._paths(cmid, available)
+        ttl = self.ttl if ttl is None else ttl
+
+        try:
+            with open(metapath, "r", encoding = "utf-8") as metafile:
+                meta = json.load(metafile)
+            if time.time() - meta["fetched"] > ttl:
+                return None
+            with open(xmlpath, "rb") as xmlfile:
+                data = xmlfile.read()
+        except (OSError, ValueError, KeyError):
+            return None
+
+        if hashlib.sha256(data).hexdigest() != meta.get("sha256"):
+            LOG.warning("Discarding corrupt advertisement cache entry for %s", cmid)
+            self._drop(xmlpath, metapath)
+            return None
+
+        # The data file modification time tracks use, for LRU eviction
+        try:
+            os.utime(xmlpath)
+        except OSError:
+            pass
+
+        return {"code" : meta.get("code"), "value" : data.decode("utf-8"), "output" : meta.get("output")}
+
+    def put (self, cmid, available, result):
+        """Store a `ListResources` result for an aggregate, evicting old entries if the cache
+        has grown beyond `max_size`."""
+        value = result["value"]
+        if ET.iselement(value):
+            value = ET.tostring(value, encoding = "unicode")
+        data = value.encode("utf-8")
+
+        meta = {"cmid" : cmid, "available" : bool(available), "fetched" : time.time(),
+                "sha256" : hashlib.sha256(data).hexdigest(), "size" : len(data),
+                "code" : result.get("code"), "output" : result.get("output")}
+
+        (xmlpath, metapath) = self._paths(cmid, available)
+        with self._lock:
+            # Data first - a metadata record never describes a file that is not there yet
+            _write_atomic(xmlpath, data)
+            _write_atomic(metapath, json.dumps(meta).encode("utf-8"))
+            self._evict()
+
+    def invalidate (self, cmid = None, available = None):
+        """Remove the entries for `cmid` (both `available` values unless one is given), or all
+        entries if `cmid` is `None`."""
+        with self._lock:
+            if cmid is None:
+                for (xmlpath, metapath) in self._entries():
+                    self._drop(xmlpath, metapath)
+                return
+            for avail in ((False, True) if available is None else (available,)):
+                self._drop(*self._paths(cmid, avail))
+
+    def _entries (self):
+        for fname in os.listdir(self.path):
+            if fname.endswith(".json"):
+                base = os.path.join(self.path, fname[:-5])
+                yield ("%s.xml" % (base), "%s.json" % (base))
+
+    def _evict (self):
+        entries = []
+        total = 0
+        for (xmlpath, metapath) in self._entries():
+            try:
+                stat = os.stat(xmlpath)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, xmlpath, metapath))
+            total += stat.st_size
+
+        entries.sort()
+        while total > self.max_size and entries:
+            (_, size, xmlpath, metapath) = entries.pop(0)
+            self._drop(xmlpath, metapath)
+            total -= size
+
+    @property
+    def size (self):
+        """Total size in bytes of the cached advertisements."""
+        total = 0
+        for (xmlpath, _) in self._entries():
+            try:
+                total += os.path.getsize(xmlpath)
+            except OSError:
+                pass
+        return total
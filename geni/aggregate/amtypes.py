@@ -6,10 +6,17 @@
 
 import abc
 import six
+from lxml import etree as ET
 
 from .core import AMTypeRegistry
 from ..rspec import pgad, pgmanifest, vtsmanifest, vtsad
 
+def _rspec_args (value):
+    # Streamed responses (minigcf.config.HTTP.STREAM_RSPECS) carry an already parsed root element
+    if ET.iselement(value):
+        return {"root" : value}
+    return {"xml" : value}
+
 class AMType:
     __metaclass__ = abc.ABCMeta
 
@@ -30,10 +37,10 @@ class ExoGENI(AMType):
         super().__init__(name)
 
     def parse_advertisement (self, data):
-        return pgad.Advertisement(xml=data["value"])
+        return pgad.Advertisement(**_rspec_args(data["value"]))
 
     def parse_manifest (self, data):
-        return pgmanifest.Manifest(xml = data["value"])
+        return pgmanifest.Manifest(**_rspec_args(data["value"]))
 
 
 class ProtoGENI(AMType):
@@ -41,7 +48,7 @@ class ProtoGENI(AMType):
         super().__init__(name)
 
     def parse_advertisement(self, data):
-        adv = pgad.Advertisement(xml=data["value"])
+        adv = pgad.Advertisement(**_rspec_args(data["value"]))
         adv.error_url = data["code"]["protogeni_error_url"]
         return adv
 
@@ -49,7 +56,7 @@ class ProtoGENI(AMType):
         if isinstance(data, (six.string_types)):
             manifest = pgmanifest.Manifest(xml = data)
         else:
-            manifest = pgmanifest.Manifest(xml = data["value"])
+            manifest = pgmanifest.Manifest(**_rspec_args(data["value"]))
             manifest.error_url = data["code"]["protogeni_error_url"]
         return manifest
 
@@ -59,10 +66,10 @@ class OpenGENI(AMType):
         super().__init__(name)
 
     def parse_advertisement(self, data):
-        return pgad.Advertisement(xml=data["value"])
+        return pgad.Advertisement(**_rspec_args(data["value"]))
 
     def parse_manifest(self, data):
-        return pgmanifest.Manifest(xml = data["value"])
+        return pgmanifest.Manifest(**_rspec_args(data["value"]))
 
 
 class VTS(AMType):
@@ -70,13 +77,13 @@ class VTS(AMType):
         super().__init__(name)
 
     def parse_advertisement(self, data):
-        return vtsad.Advertisement(xml=data["value"])
+        return vtsad.Advertisement(**_rspec_args(data["value"]))
 
     def parse_manifest (self, data):
         if isinstance(data, (six.string_types)):
             manifest = vtsmanifest.Manifest(xml = data)
         else:
-            manifest = vtsmanifest.Manifest(xml = data["value"])
+            manifest = vtsmanifest.Manifest(**_rspec_args(data["value"]))
         return manifest
 
 AMTypeRegistry.register("opengeni", OpenGENI())
@@ -6,7 +6,13 @@
 
 # pylint: disable=too-many-arguments,fixme
 
+import asyncio
 import logging
+import random
+import threading
+import time
+
+from requests import exceptions as RequestsExceptions
 
 from .frameworks import ClearinghouseError
 from .core import APIRegistry
@@ -14,6 +20,9 @@ from .exceptions import AMError
 from . import pgutil as ProtoGENI
 from ..minigcf import amapi2 as AM2
 from ..minigcf import amapi3 as AM3
+from ..minigcf.aio import amapi2 as AAM2
+from ..minigcf.aio import amapi3 as AAM3
+from ..minigcf.aio import HTTPError as AsyncHTTPError
 
 # pylint: disable=multiple-statements
 class AllocateError(AMError): pass
@@ -25,10 +34,216 @@ class ProvisionError(AMError): pass
 class RenewSliverError(AMError): pass
 class SliverStatusError(AMError): pass
 class POAError(AMError): pass
+class CircuitOpenError(AMError): pass
 # pylint: enable=multiple-statements
 
 LOG = logging.getLogger("geni.aggregate.apis")
 
+
+class RetryPolicy:
+    """Retry and circuit breaker settings for calls made through :py:class:`geni.aggregate.core.AM`.
+
+    Busy aggregates (:py:class:`geni.aggregate.pgutil.ResourceBusyError`) are retried for every
+    call, as the aggregate rejected the request without acting on it.  Transient failures
+    (connection errors, timeouts and HTTP 5xx responses) are only retried for idempotent calls.
+    Delays grow exponentially from `base_delay` up to `max_delay`, with full jitter.
+
+    After `failure_threshold` consecutive transient failures the circuit breaker for that
+    aggregate URL opens, and further calls fail immediately with :py:class:`CircuitOpenError`
+    until `reset_timeout` seconds have passed and a trial call succeeds.
+
+    Args:
+        max_attempts (int): Total number of attempts per call (including the first)
+        base_delay (float): Delay before the first retry, in seconds
+        max_delay (float): Upper bound for any single delay, in seconds
+        multiplier (float): Growth factor of the delay between attempts
+        jitter (bool): Randomize each delay uniformly between 0 and its computed value
+        retry_busy (bool): Retry calls the aggregate rejected as busy
+        retry_transient (bool): Retry idempotent calls that failed with a transient error
+        failure_threshold (int): Consecutive transient failures that open the circuit (`None` to disable)
+        reset_timeout (float): Seconds an open circuit waits before letting a trial call through
+    """
+
+    def __init__ (self, max_attempts = 4, base_delay = 1.0, max_delay = 30.0, multiplier = 2.0,
+                  jitter = True, retry_busy = True, retry_transient = True,
+                  failure_threshold = 5, reset_timeout = 60.0):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.multiplier = multiplier
+        self.jitter = jitter
+        self.retry_busy = retry_busy
+        self.retry_transient = retry_transient
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+    def delay (self, attempt):
+        """Seconds to wait after the given (0-based) failed attempt."""
+        delay = min(self.max_delay, self.base_delay * (self.multiplier ** attempt))
+        if self.jitter:
+            return random.uniform(0, delay)
+        return delay
+
+    def should_retry (self, exc, idempotent):
+        if isinstance(exc, ProtoGENI.ResourceBusyError):
+            return self.retry_busy
+        return self.retry_transient and idempotent and _is_transient(exc)
+
+
+def _is_transient (exc):
+    if isinstance(exc, (RequestsExceptions.ConnectionError, RequestsExceptions.Timeout,
+                        ConnectionError, TimeoutError, asyncio.TimeoutError)):
+        return True
+    if isinstance(exc, RequestsExceptions.HTTPError):
+        return exc.response is not None and exc.response.status_code >= 500
+    if isinstance(exc, AsyncHTTPError):
+        return exc.status >= 500
+    return False
+
+
+class CircuitBreaker:
+    """Per-aggregate circuit breaker, see :py:class:`RetryPolicy`."""
+
+    def __init__ (self, url, failure_threshold, reset_timeout):
+        self.url = url
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self._probing = False
+
+    @property
+    def state (self):
+        if self._opened_at is None:
+            return "closed"
+        if self._probing or time.monotonic() - self._opened_at >= self.reset_timeout:
+            return "half-open"
+        return "open"
+
+    def check (self):
+        """Raise :py:class:`CircuitOpenError` if calls to this aggregate should fail fast."""
+        with self._lock:
+            if self._opened_at is None:
+                return
+            if not self._probing and time.monotonic() - self._opened_at >= self.reset_timeout:
+                # Let a single trial call through
+                self._probing = True
+                return
+            raise CircuitOpenError(f"Circuit open for {self.url} after {self._failures} consecutive failures")
+
+    def success (self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            self._probing = False
+
+    def failure (self):
+        with self._lock:
+            self._failures += 1
+            if self._probing or (self.failure_threshold is not None and self._failures >= self.failure_threshold):
+                self._opened_at = time.monotonic()
+            self._probing = False
+
+    def abandon (self):
+        """Release a trial call that ended without an answer either way (cancelled or
+        interrupted), so the next call can probe the aggregate again."""
+        with self._lock:
+            self._probing = False
+
+
+_POLICIES = {}
+_BREAKERS = {}
+_BREAKER_LOCK = threading.Lock()
+
+def set_retry_policy (policy, amtype = None):
+    """Set the :py:class:`RetryPolicy` used for aggregates of the given type name (as registered
+    in :py:data:`geni.aggregate.core.AMTypeRegistry`), or the default for all types if `amtype`
+    is `None`.  A policy of `None` disables retries (the default)."""
+    _POLICIES[amtype] = policy
+
+def get_retry_policy (amtype = None):
+    if amtype in _POLICIES:
+        return _POLICIES[amtype]
+    return _POLICIES.get(None)
+
+def get_breaker (url, policy):
+    """Return the breaker for `url`, using the thresholds of the given policy.  Breaker state
+    is shared by every call to the same aggregate, whichever policy made it."""
+    with _BREAKER_LOCK:
+        breaker = _BREAKERS.get(url)
+        if breaker is None:
+            breaker = _BREAKERS[url] = CircuitBreaker(url, policy.failure_threshold, policy.reset_timeout)
+        else:
+            breaker.failure_threshold = policy.failure_threshold
+            breaker.reset_timeout = policy.reset_timeout
+        return breaker
+
+def reset_breakers ():
+    with _BREAKER_LOCK:
+        _BREAKERS.clear()
+
+def _outcome (breaker, exc):
+    if _is_transient(exc):
+        breaker.failure()
+    else:
+        # The aggregate answered, even if with an error
+        breaker.success()
+
+def call (policy, url, func, *args, idempotent = True, **kwargs):
+    """Invoke `func(*args, **kwargs)` against the aggregate at `url` under the given policy."""
+    if policy is None:
+        return func(*args, **kwargs)
+
+    breaker = get_breaker(url, policy)
+    attempt = 0
+    while True:
+        breaker.check()
+        try:
+            res = func(*args, **kwargs)
+        except Exception as e:
+            _outcome(breaker, e)
+            if attempt + 1 >= policy.max_attempts or not policy.should_retry(e, idempotent):
+                raise
+            delay = policy.delay(attempt)
+            LOG.info("Retrying %s at %s in %.1fs after %s", func.__name__, url, delay, type(e).__name__)
+            time.sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            # Cancelled or interrupted: says nothing about the aggregate
+            breaker.abandon()
+            raise
+        breaker.success()
+        return res
+
+async def acall (policy, url, func, *args, idempotent = True, **kwargs):
+    """Awaitable version of :py:func:`call`, for coroutine functions."""
+    if policy is None:
+        return await func(*args, **kwargs)
+
+    breaker = get_breaker(url, policy)
+    attempt = 0
+    while True:
+        breaker.check()
+        try:
+            res = await func(*args, **kwargs)
+        except Exception as e:
+            _outcome(breaker, e)
+            if attempt + 1 >= policy.max_attempts or not policy.should_retry(e, idempotent):
+                raise
+            delay = policy.delay(attempt)
+            LOG.info("Retrying %s at %s in %.1fs after %s", func.__name__, url, delay, type(e).__name__)
+            await asyncio.sleep(delay)
+            attempt += 1
+            continue
+        except BaseException:
+            # Cancelled or interrupted: says nothing about the aggregate
+            breaker.abandon()
+            raise
+        breaker.success()
+        return res
+
 class AMAPIv3:
     @staticmethod
     def poa(context, url, sname, action, urns=None, options=None):
@@ -104,6 +319,80 @@ class AMAPIv3:
                 ProtoGENI.raiseError(res)
         raise ProvisionError(res["output"], res)
 
+    @staticmethod
+    async def apoa(context, url, sname, action, urns=None, options=None):
+        sinfo = context.get_slice_info(sname)
+        if not urns:
+            urns = [sinfo.urn]
+
+        res = await AAM3.poa(url, False, context.cf.cert, context.cf.key, [sinfo], urns, action, options)
+        if res["code"]["geni_code"] == 0:
+            return res["value"]
+
+        if "am_type" in res["code"]:
+            if res["code"]["am_type"] == "protogeni":
+                ProtoGENI.raiseError(res)
+
+        raise POAError(res["output"], res)
+
+    @staticmethod
+    async def apaa (context, url, action, options = None):
+        res = await AAM3.paa(url, False, context.cf.cert, context.cf.key, action, options)
+        if res["code"]["geni_code"] == 0:
+            return res["value"]
+
+        raise POAError(res["output"], res)
+
+    @staticmethod
+    async def aallocate(context, url, sname, rspec, options=None):
+        if options is None:
+            options = {}
+        sinfo = context.get_slice_info(sname)
+
+        res = await AAM3.allocate(url, False, context.cf.cert, context.cf.key, [sinfo], sinfo.urn, rspec, options)
+        if res["code"]["geni_code"] == 0:
+            return res
+        if "am_type" in res["code"]:
+            if res["code"]["am_type"] == "protogeni":
+                ProtoGENI.raiseError(res)
+        raise AllocateError(res["output"], res)
+
+    @staticmethod
+    async def aprovision(context, url, sname, urns = None, options=None):
+        if options is None:
+            options = {}
+        if urns is not None and not isinstance(urns, list):
+            urns = [urns]
+
+        sinfo = context.get_slice_info(sname)
+        if not urns:
+            urns = [sinfo.urn]
+
+        res = await AAM3.provision(url, False, context.cf.cert, context.cf.key, [sinfo], urns, options)
+        if res["code"]["geni_code"] == 0:
+            return res
+        if "am_type" in res["code"]:
+            if res["code"]["am_type"] == "protogeni":
+                ProtoGENI.raiseError(res)
+        raise ProvisionError(res["output"], res)
+
+    @staticmethod
+    async def adelete(context, url, sname, urns, options=None):
+        if options is None:
+            options = {}
+        if not isinstance(urns, list):
+            urns = [urns]
+
+        sinfo = context.get_slice_info(sname)
+
+        res = await AAM3.delete(url, False, context.cf.cert, context.cf.key, [sinfo], urns, options)
+        if res["code"]["geni_code"] == 0:
+            return res
+        if "am_type" in res["code"]:
+            if res["code"]["am_type"] == "protogeni":
+                ProtoGENI.raiseError(res)
+        raise ProvisionError(res["output"], res)
+
 
 class AMAPIv2:
     @staticmethod
@@ -204,5 +493,103 @@ class AMAPIv2:
             return res["value"]
         raise GetVersionError(res["output"], res)
 
+    @staticmethod
+    async def alist_resources(context, url, sname, options=None):
+        if options is None:
+            options = {}
+        creds = []
+
+        surn = None
+        if sname:
+            sinfo = context.get_slice_info(sname)
+            surn = sinfo.urn
+            creds.append(open(sinfo.path, "r", encoding="utf-8").read())
+
+        creds.append(open(context.usercred_path, "r", encoding="utf-8").read())
+
+        res = await AAM2.list_resources(url, False, context.cf.cert, context.cf.key,
+                creds, options, surn)
+        if res["code"]["geni_code"] == 0:
+            return res
+        if "am_type" in res["code"]:
+            if res["code"]["am_type"] == "protogeni":
+                ProtoGENI.raiseError(res)
+
+        raise ListResourcesError(res["output"], res)
+
+    @staticmethod
+    async def acreate_sliver(context, url, sname, rspec):
+        sinfo = context.get_slice_info(sname, create=True)
+        cred_data = open(sinfo.path, "r", encoding="utf-8").read()
+
+        LOG.debug("Creating slice with info %s", str(sinfo))
+
+        udata = []
+        for user in context.users:
+            data = {"urn" : user.urn, "keys" : [open(x, "r", encoding="utf-8").read() for x in user.keys]}
+            udata.append(data)
+
+        res = await AAM2.create_sliver(url, False, context.cf.cert, context.cf.key, [cred_data], sinfo.urn, rspec, udata)
+        if res["code"]["geni_code"] == 0:
+            return res
+        if "am_type" in res["code"]:
+            if res["code"]["am_type"] == "protogeni":
+                ProtoGENI.raiseError(res)
+        raise CreateSliverError(res["output"], res)
+
+    @staticmethod
+    async def asliver_status(context, url, sname):
+        sinfo = context.get_slice_info(sname)
+        cred_data = open(sinfo.path, "r", encoding="utf-8").read()
+
+        res = await AAM2.sliver_status(url, False, context.cf.cert, context.cf.key,
+                [cred_data], sinfo.urn)
+        if res["code"]["geni_code"] == 0:
+            return res["value"]
+        if "am_type" in res["code"]:
+            if res["code"]["am_type"] == "protogeni":
+                ProtoGENI.raiseError(res)
+        raise SliverStatusError(res["output"], res)
+
+    @staticmethod
+    async def arenew_sliver(context, url, sname, date):
+        sinfo = context.get_slice_info(sname)
+        cred_data = open(sinfo.path, "r", encoding="utf-8").read()
+
+        res = await AAM2.renew_sliver(url, False, context.cf.cert, context.cf.key,
+                [cred_data], sinfo.urn, date)
+        if res["code"]["geni_code"] == 0:
+            return res["value"]
+        raise RenewSliverError(res["output"], res)
+
+    @staticmethod
+    async def adelete_sliver(context, url, sname):
+        try:
+            sinfo = context.get_slice_info(sname)
+            path = sinfo.path
+        except ClearinghouseError as _:
+            LOG.warning("Failed to get slice. Might have already expired.")
+
+            # Slice is already gone. Delete local files, if any.
+            context.delete_slice(sname, force=True)
+            return 0
+
+        cred_data = open(path, "r", encoding="utf-8").read()
+
+        res = await AAM2.delete_sliver(url, False, context.cf.cert, context.cf.key,
+                [cred_data], sinfo.urn)
+        if res["code"]["geni_code"] != 0:
+            raise DeleteSliverError(res["output"], res)
+
+        context.delete_slice(sname)
+        return res["value"]
+
+    @staticmethod
+    async def aget_version(context, url):
+        res = await AAM2.get_version(url, False, context.cf.cert, context.cf.key)
+        if res["code"]["geni_code"] == 0:
+            return res["value"]
+        raise GetVersionError(res["output"], res)
+
 APIRegistry.register("amapiv2", AMAPIv2())
 APIRegistry.register("amapiv3", AMAPIv3())
@@ -10,13 +10,23 @@ import datetime
 import os
 import os.path
 import logging
+import threading
 import lxml.etree as ET
 
 from ..aggregate.frameworks import ClearinghouseError
+from . import adcache
 
 LOG = logging.getLogger("geni.aggregate.context")
 RENEW_WINDOW = 3
 
+def _write_cred(path, cred):
+    # Write to a private file and rename it into place, so that other threads never see
+    # a partially written credential
+    tmppath = "%s.%d.%d" % (path, os.getpid(), threading.get_ident())
+    with open(tmppath, "wb+") as outfile:
+        outfile.write(bytes(cred, 'utf-8'))
+    os.replace(tmppath, path)
+
 class SlicecredProxy:
     def __init__(self, context):
         self._context = context
@@ -83,8 +93,7 @@ class SliceCredInfo:
         if not cred:
             cred = self.context.cf.get_slice_credentials(self.context, self.slicename)
 
-        with open(self._path, "wb+") as outfile:
-            outfile.write(bytes(cred, 'utf-8'))
+        _write_cred(self._path, cred)
 
         self._parse_info()
 
@@ -147,6 +156,7 @@ class Context:
         self._cf = None
         self._usercred_info = None    # (path, expires, urn, type, version)
         self._slicecreds = {}
+        self._ad_cache = None
         self.debug = False
         self.uname = None
         self.path = None
@@ -254,6 +264,34 @@ class Context:
             os.makedirs(nval)
         self._data_dir = nval
 
+    @property
+    def ad_cache(self):
+        """The :py:class:`geni.aggregate.adcache.AdCache` used by `list_resources`, or `None` if
+        advertisement caching is not enabled."""
+        return self._ad_cache
+
+    @ad_cache.setter
+    def ad_cache(self, val):
+        self._ad_cache = val
+
+    def enable_ad_cache(self, ttl = None, max_size = None):
+        """Cache advertisements fetched with this context in the `adcache` directory under `datadir`.
+
+        Args:
+            ttl (float): Maximum age in seconds of a cached advertisement (default one hour)
+            max_size (int): Maximum total size in bytes of the cache (default 256MB)
+
+        Returns:
+            geni.aggregate.adcache.AdCache: The cache
+        """
+        kwargs = {}
+        if ttl is not None:
+            kwargs["ttl"] = ttl
+        if max_size is not None:
+            kwargs["max_size"] = max_size
+        self._ad_cache = adcache.AdCache(os.path.join(self.datadir, "adcache"), **kwargs)
+        return self._ad_cache
+
     ### TODO: User credentials need to belong to Users, or fix up this profile nonsense
     @property
     def _ucred_info(self):
@@ -262,8 +300,7 @@ class Context:
             if not os.path.exists(ucpath):
                 cred = self.cf.getUserCredentials(self.userurn)
 
-                with open(ucpath, "wb+") as outfile:
-                    outfile.write(bytes(cred, 'utf-8'))
+                _write_cred(ucpath, cred)
 
             (expires, urn, typ, version) = Context._get_cred_info(ucpath)
             self._usercred_info = (ucpath, expires, urn, typ, version)
@@ -271,8 +308,7 @@ class Context:
         if self._usercred_info[1] < datetime.datetime.now():
             cred = self.cf.getUserCredentials(self.userurn)
 
-            with open(ucpath, "wb+") as outfile:
-                outfile.write(bytes(cred, 'utf-8'))
+            _write_cred(ucpath, cred)
 
             (expires, urn, typ, version) = Context._get_cred_info(ucpath)
             self._usercred_info = (ucpath, expires, urn, typ, version)
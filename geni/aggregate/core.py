@@ -6,12 +6,16 @@
 
 # pylint: disable=too-many-arguments,too-many-instance-attributes,too-many-branches
 
+import asyncio
 import os
 import os.path
 import logging
+import threading
+import weakref
 import six
 
 from .spec import AMSpec, AMTYPE, fixCert
+from ..minigcf import config as GCFConfig
 
 LOG = logging.getLogger("geni.aggregate.core")
 
@@ -28,6 +32,78 @@ class _Registry:
 
         return self._data[name]
 
+class _InFlight:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+class _AInFlight:
+    def __init__(self, task):
+        self.task = task
+        self.waiters = 0
+
+class _SingleFlight:
+    """Coalesces concurrent identical calls, so that only the first caller performs the call
+    and everyone waiting on the same key shares its result (or exception)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+        self._acalls = weakref.WeakKeyDictionary()
+
+    def do(self, key, func, *args):
+        with self._lock:
+            entry = self._calls.get(key)
+            leader = entry is None
+            if leader:
+                entry = self._calls[key] = _InFlight()
+
+        if not leader:
+            entry.event.wait()
+            if entry.error is not None:
+                raise entry.error
+            return entry.result
+
+        try:
+            entry.result = func(*args)
+            return entry.result
+        except BaseException as e:
+            entry.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            entry.event.set()
+
+    async def ado(self, key, func, *args):
+        loop = asyncio.get_running_loop()
+        calls = self._acalls.setdefault(loop, {})
+        entry = calls.get(key)
+        if entry is None:
+            # The call runs in its own task, so a cancelled caller does not cancel it for the
+            # others sharing its result
+            entry = calls[key] = _AInFlight(asyncio.ensure_future(func(*args)))
+            entry.task.add_done_callback(lambda t: self._afinished(calls, key, entry))
+
+        entry.waiters += 1
+        try:
+            return await asyncio.shield(entry.task)
+        finally:
+            entry.waiters -= 1
+            if not entry.waiters and not entry.task.done():
+                # Everyone waiting on the call has gone away
+                self._afinished(calls, key, entry)
+                entry.task.cancel()
+
+    @staticmethod
+    def _afinished(calls, key, entry):
+        if calls.get(key) is entry:
+            del calls[key]
+        # Nobody may be left waiting on the task - don't warn about unretrieved exceptions
+        if entry.task.done() and not entry.task.cancelled():
+            entry.task.exception()
+
 def convertCH2AggregateSpecs(ch2info):
     typemap = {
         "ui_instageni_am" : AMTYPE.IG,
@@ -100,7 +176,19 @@ def load_from_registry(context):
     return ammap
 
 class AM:
-    """Base class wrapping GENI AM APIv2 and AM APIv3 functionality."""
+    """Base class wrapping GENI AM APIv2 and AM APIv3 functionality.
+
+    Calls are subject to the retry and circuit breaker policy configured for the aggregate
+    type with :py:func:`geni.aggregate.apis.set_retry_policy` (none by default).
+
+    Concurrent identical calls to :py:meth:`get_version` and to :py:meth:`list_resources` for
+    an advertisement (from several threads, or several tasks on one event loop) are coalesced
+    into a single request when :py:attr:`coalesce` is set, and all callers receive the same
+    result object."""
+
+    coalesce = True
+    """Share in-flight `get_version` and advertisement `list_resources` calls between callers
+    with the same url, options and credentials."""
 
     class UnspecifiedComponentManagerError(Exception):
         def __str__ (self):
@@ -145,7 +233,28 @@ class AM:
             self._type = AMTypeRegistry.get(self._typestr)
         return self._type
 
-    def list_resources(self, context, sname = None, available = False):
+    def _call(self, func, *args, idempotent = True):
+        # apis imports this module, so it can only be imported at call time
+        # pylint: disable=import-outside-toplevel
+        from . import apis
+        return apis.call(apis.get_retry_policy(self._typestr), self.url, func, *args, idempotent = idempotent)
+
+    async def _acall(self, func, *args, idempotent = True):
+        # pylint: disable=import-outside-toplevel
+        from . import apis
+        return await apis.acall(apis.get_retry_policy(self._typestr), self.url, func, *args, idempotent = idempotent)
+
+    def _flight_key(self, context, method, options = None):
+        if options is not None:
+            options = tuple(sorted(options.items()))
+        return (method, self.url, self._apistr, self._typestr, options, context.cf.cert, context.cf.key)
+
+    def _list_options(self, available, compressed):
+        if compressed is None:
+            compressed = GCFConfig.HTTP.COMPRESSED_RSPECS
+        return {"geni_available" : available, "geni_compressed" : bool(compressed)}
+
+    def list_resources(self, context, sname = None, available = False, compressed = None, refresh = False):
         """GENI AM APIv2 method to get available resources from an aggregate, or resources allocated to
         a specific sliver.
 
@@ -153,6 +262,10 @@ class AM:
             context: geni-lib context
             sname (str): Slice name (optional)
             available (bool): Only list available resources
+            compressed (bool): Request a `geni_compressed` rspec, which is decompressed before parsing
+                (defaults to :py:attr:`geni.minigcf.config.HTTP.COMPRESSED_RSPECS`)
+            refresh (bool): Fetch the advertisement from the aggregate even if the context has
+                a fresh copy in its advertisement cache (see :py:meth:`Context.enable_ad_cache`)
 
         Returns:
             geni.rspec.RSpec:
@@ -160,13 +273,41 @@ class AM:
                 `listresources` will return the advertisement rspec for the given aggregate.
         """
 
-        rspec_data = self.api.list_resources(context, self.url, sname,
-                {"geni_available" : available})
+        options = self._list_options(available, compressed)
         if sname is None:
-            return self.amtype.parse_advertisement(rspec_data)
-
+            cached = self._cached_advertisement(context, available, refresh)
+            if cached is not None:
+                return cached
+            if self.coalesce:
+                return _FLIGHTS.do(self._flight_key(context, "ListResources", options),
+                                   self._list_advertisement, context, options)
+            return self._list_advertisement(context, options)
+
+        rspec_data = self._call(self.api.list_resources, context, self.url, sname, options)
         return self.amtype.parse_manifest(rspec_data)
 
+    def _cache_key(self):
+        return self._cmid or self.url
+
+    def _cached_advertisement(self, context, available, refresh):
+        cache = getattr(context, "ad_cache", None)
+        if cache is None or refresh:
+            return None
+        rspec_data = cache.get(self._cache_key(), available)
+        if rspec_data is None:
+            return None
+        return self.amtype.parse_advertisement(rspec_data)
+
+    def _store_advertisement(self, context, options, rspec_data):
+        cache = getattr(context, "ad_cache", None)
+        if cache is not None:
+            cache.put(self._cache_key(), options["geni_available"], rspec_data)
+
+    def _list_advertisement(self, context, options):
+        rspec_data = self._call(self.api.list_resources, context, self.url, None, options)
+        self._store_advertisement(context, options, rspec_data)
+        return self.amtype.parse_advertisement(rspec_data)
+
     def sliver_status(self, context, sname):
         """GENI AM APIv2 method to get the status of a current sliver at the given aggregate.
 
@@ -179,7 +320,7 @@ class AM:
                 Mapping of key/value pairs for status information the aggregate supports.
         """
 
-        return self.api.sliver_status(context, self.url, sname)
+        return self._call(self.api.sliver_status, context, self.url, sname)
 
     def renew_sliver(self, context, sname, date):
         """GENI AM APIv2 method to renew a sliver until the given datetime.
@@ -195,7 +336,7 @@ class AM:
             error in such cases, or success with a sooner future date.
         """
 
-        return self.api.renew_sliver(context, self.url, sname, date)
+        return self._call(self.api.renew_sliver, context, self.url, sname, date)
 
     def delete_sliver(self, context, sname):
         """GENI AM APIv2 method to delete a resource reservation at this aggregate.
@@ -204,7 +345,7 @@ class AM:
             context: geni-lib context
             sname (str): Slice name
         """
-        return self.api.delete_sliver(context, self.url, sname)
+        return self._call(self.api.delete_sliver, context, self.url, sname, idempotent = False)
 
     def create_sliver(self, context, sname, rspec):
         """GENI AM APIv2 method to reserve resources at this aggregate.
@@ -220,10 +361,11 @@ class AM:
                 raise AM.InvalidRSpecPathError(rspec)
             rspec_data = open(rspec, "r", encoding="utf-8").read()
         else:
-            LOG.debug("Creating slice with RSpec: \n%s", rspec.to_xml_string(pretty_print=True))
-            rspec_data = rspec.to_xml_string(pretty_print=False)
+            if LOG.isEnabledFor(logging.DEBUG):
+                LOG.debug("Creating slice with RSpec: \n%s", rspec.to_xml_string(pretty_print=True))
+            rspec_data = "".join(rspec.iter_xml(pretty_print=False))
 
-        res = self.api.create_sliver(context, self.url, sname, rspec_data)
+        res = self._call(self.api.create_sliver, context, self.url, sname, rspec_data, idempotent = False)
         return self.amtype.parse_manifest(res)
 
     def get_version(self, context):
@@ -236,8 +378,73 @@ class AM:
             dict: Dictionary of key/value pairs with version information from this aggregate.
         """
 
-        return self.api.get_version(context, self.url)
+        if self.coalesce:
+            return _FLIGHTS.do(self._flight_key(context, "GetVersion"), self._call, self.api.get_version, context, self.url)
+        return self._call(self.api.get_version, context, self.url)
+
+    async def alist_resources(self, context, sname = None, available = False, compressed = None, refresh = False):
+        """Awaitable version of :py:meth:`list_resources`.
+
+        The returned RSpec is parsed in the default executor so that large advertisements
+        do not stall the event loop."""
+
+        options = self._list_options(available, compressed)
+        if sname is None:
+            if getattr(context, "ad_cache", None) is not None and not refresh:
+                loop = asyncio.get_running_loop()
+                cached = await loop.run_in_executor(None, self._cached_advertisement, context, available, refresh)
+                if cached is not None:
+                    return cached
+            if self.coalesce:
+                return await _FLIGHTS.ado(self._flight_key(context, "ListResources", options),
+                                          self._alist_advertisement, context, options)
+            return await self._alist_advertisement(context, options)
+
+        rspec_data = await self._acall(self.api.alist_resources, context, self.url, sname, options)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, self.amtype.parse_manifest, rspec_data)
+
+    async def _alist_advertisement(self, context, options):
+        rspec_data = await self._acall(self.api.alist_resources, context, self.url, None, options)
+        loop = asyncio.get_running_loop()
+        if getattr(context, "ad_cache", None) is not None:
+            await loop.run_in_executor(None, self._store_advertisement, context, options, rspec_data)
+        return await loop.run_in_executor(None, self.amtype.parse_advertisement, rspec_data)
+
+    async def asliver_status(self, context, sname):
+        """Awaitable version of :py:meth:`sliver_status`."""
+        return await self._acall(self.api.asliver_status, context, self.url, sname)
+
+    async def arenew_sliver(self, context, sname, date):
+        """Awaitable version of :py:meth:`renew_sliver`."""
+        return await self._acall(self.api.arenew_sliver, context, self.url, sname, date)
+
+    async def adelete_sliver(self, context, sname):
+        """Awaitable version of :py:meth:`delete_sliver`."""
+        return await self._acall(self.api.adelete_sliver, context, self.url, sname, idempotent = False)
+
+    async def acreate_sliver(self, context, sname, rspec):
+        """Awaitable version of :py:meth:`create_sliver`."""
+        if isinstance(rspec, (six.string_types)):
+            rspec = os.path.normpath(os.path.expanduser(rspec))
+            if not os.path.exists(rspec):
+                raise AM.InvalidRSpecPathError(rspec)
+            rspec_data = open(rspec, "r", encoding="utf-8").read()
+        else:
+            rspec_data = "".join(rspec.iter_xml(pretty_print=False))
+
+        res = await self._acall(self.api.acreate_sliver, context, self.url, sname, rspec_data, idempotent = False)
+        return self.amtype.parse_manifest(res)
+
+    async def aget_version(self, context):
+        """Awaitable version of :py:meth:`get_version`."""
+        if self.coalesce:
+            return await _FLIGHTS.ado(self._flight_key(context, "GetVersion"), self._acall, self.api.aget_version,
+                                      context, self.url)
+        return await self._acall(self.api.aget_version, context, self.url)
+
 
+_FLIGHTS = _SingleFlight()
 
 APIRegistry = _Registry()
 AMTypeRegistry = _Registry()
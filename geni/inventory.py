@@ -0,0 +1,223 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Federation-wide resource inventory.
+
+An :py:class:`Inventory` harvests the advertisements of a set of aggregates in parallel
+and keeps them, indexed, in memory.  Queries span every site at once and are answered
+from the per-site indexes (see :py:class:`geni.rspec.pgad.AdIndex`) without contacting
+any aggregate::
+
+  import geni.aggregate.instageni as IG
+  import geni.aggregate.cloudlab as CL
+  from geni.inventory import Inventory
+
+  inv = Inventory(context, list(IG.aggregates()) + list(CL.aggregates()))
+  inv.refresh()
+  for (am, node) in inv.query(hardware_type = "d430", available = True):
+    ...
+
+:py:meth:`Inventory.start` keeps the inventory up to date from a background thread.
+"""
+
+import functools
+import logging
+import threading
+import time
+
+from .util import _iter_bounded
+
+LOG = logging.getLogger("geni.inventory")
+
+
+class SiteState(object):
+    """Harvest state of one aggregate.
+
+    Attributes:
+        am: The aggregate
+        advertisement: Most recent advertisement, `None` if no harvest has succeeded yet
+        fetched (float): `time.time()` of the most recent successful harvest, or `None`
+        error (Exception): Error of the most recent harvest if it failed, otherwise `None`
+        error_time (float): `time.time()` of the most recent failure, or `None`
+    """
+
+    def __init__ (self, am):
+        self.am = am
+        self.advertisement = None
+        self.fetched = None
+        self.error = None
+        self.error_time = None
+
+    @property
+    def name (self):
+        return self.am.name
+
+    @property
+    def age (self):
+        """Seconds since the last successful harvest, `None` if there has not been one."""
+        if self.fetched is None:
+            return None
+        return time.time() - self.fetched
+
+
+class Inventory(object):
+    """In-memory inventory of the resources advertised by a set of aggregates.
+
+    Args:
+        context: geni-lib context used for harvesting
+        ams (list): Aggregates to harvest
+        max_workers (int): Maximum number of concurrent `ListResources` calls
+        timeout (float): Seconds after which an aggregate that has not answered is given up on
+            (its call no longer counts against `max_workers`)
+        available (bool): Harvest with `geni_available` set (only available resources)
+        catalog (ImageCatalog): :py:class:`geni.model.images.ImageCatalog` to update with every
+            advertisement harvested
+    """
+
+    def __init__ (self, context, ams, max_workers = None, timeout = None, available = False,
+                  catalog = None):
+        self.context = context
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.available = available
+        self.catalog = catalog
+        self._sites = {am.name : SiteState(am) for am in ams}
+        self._lock = threading.Lock()
+        self._thread = None
+        self._stop = threading.Event()
+
+    def _fetch (self, am):
+        ad = am.list_resources(self.context, available = self.available, refresh = True)
+        # Build the index in the harvesting thread, so queries never pay for it
+        ad.index()
+        if self.catalog is not None:
+            self.catalog.add_advertisement(am.name, ad)
+        return ad
+
+    def refresh (self, sites = None):
+        """Harvest advertisements from every aggregate (or only the named `sites`) in parallel.
+        Sites that fail keep their previous advertisement.
+
+        Returns:
+            dict: Mapping of `{ site_name : exception }` for the sites that failed
+        """
+        with self._lock:
+            states = [state for (name, state) in self._sites.items() if sites is None or name in sites]
+
+        failed = {}
+        tasks = [(state, functools.partial(self._fetch, state.am)) for state in states]
+        for (state, ad) in _iter_bounded(tasks, self.max_workers, self.timeout):
+            now = time.time()
+            with self._lock:
+                if isinstance(ad, Exception):
+                    LOG.warning("Failed to harvest advertisement from %s: %s", state.name, ad)
+                    (state.error, state.error_time) = (ad, now)
+                    failed[state.name] = ad
+                else:
+                    (state.advertisement, state.fetched, state.error) = (ad, now, None)
+        return failed
+
+    def add (self, am):
+        """Add an aggregate to the inventory.  It is harvested on the next :py:meth:`refresh`."""
+        with self._lock:
+            if am.name not in self._sites:
+                self._sites[am.name] = SiteState(am)
+
+    def remove (self, name):
+        """Remove the named site (and its resources) from the inventory."""
+        with self._lock:
+            self._sites.pop(name, None)
+
+    @property
+    def sites (self):
+        """Mapping of `{ site_name : SiteState }`."""
+        with self._lock:
+            return dict(self._sites)
+
+    def freshness (self):
+        """Return a mapping of `{ site_name : seconds_since_last_successful_harvest }` (`None` for
+        sites that have never been harvested)."""
+        return {name : state.age for (name, state) in self.sites.items()}
+
+    def _indexed (self, site):
+        out = []
+        for (name, state) in self.sites.items():
+            if state.advertisement is None:
+                continue
+            if site is not None:
+                if isinstance(site, str):
+                    if name != site:
+                        continue
+                elif name not in site:
+                    continue
+            out.append((state.am, state.advertisement.index()))
+        return out
+
+    def query (self, site = None, **kwargs):
+        """Find nodes across the inventory.
+
+        Args:
+            site: Site name, or an iterable of names, to restrict the query to
+            **kwargs: Filters for :py:meth:`geni.rspec.pgad.AdIndex.query` (`hardware_type`,
+                `sliver_type`, `image`, `available`, `exclusive`, `near`)
+
+        Returns:
+            list: `(am, AdNode)` tuples, grouped by site
+        """
+        out = []
+        for (am, index) in self._indexed(site):
+            out.extend([(am, node) for node in index.query(**kwargs)])
+        return out
+
+    def count (self, site = None, **kwargs):
+        """Return a mapping of `{ site_name : matching_node_count }` for a :py:meth:`query`."""
+        return {am.name : len(index.query(**kwargs)) for (am, index) in self._indexed(site)}
+
+    def available_raw_pcs (self, site = None, hardware_type = None):
+        """Federation-wide equivalent of :py:func:`geni.util.checkavailrawpc`."""
+        return self.query(site = site, hardware_type = hardware_type, sliver_type = "raw-pc",
+                          exclusive = True, available = True)
+
+    def get_node (self, component_id):
+        """Return `(am, AdNode)` for a component ID, or `None` if no site advertises it."""
+        for (am, index) in self._indexed(None):
+            node = index.by_component_id.get(component_id)
+            if node is not None:
+                return (am, node)
+        return None
+
+    def hardware_types (self, site = None):
+        """Set of every hardware type name advertised in the inventory."""
+        out = set()
+        for (_, index) in self._indexed(site):
+            out |= index.hardware_types
+        return out
+
+    def start (self, interval = 300):
+        """Refresh the inventory every `interval` seconds from a background (daemon) thread,
+        starting immediately."""
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target = self._run, args = (interval,), name = "geni-inventory", daemon = True)
+        self._thread.start()
+
+    def stop (self, wait = True):
+        """Stop background refreshes started with :py:meth:`start`."""
+        self._stop.set()
+        if wait and self._thread is not None:
+            self._thread.join()
+        self._thread = None
+
+    def _run (self, interval):
+        while not self._stop.is_set():
+            start = time.monotonic()
+            try:
+                self.refresh()
+            except Exception:  # pylint: disable=broad-except
+                LOG.exception("Inventory refresh failed")
+            self._stop.wait(max(0, interval - (time.monotonic() - start)))
@@ -0,0 +1,30 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+#    This Source Code Form is subject to the terms of the Mozilla Public
+#    License, v. 2.0. If a copy of the MPL was not distributed with this
+#    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Awaitable versions of the MiniGCF AM API v2/v3 and CH API v2 calls.
+
+Every function in :py:mod:`geni.minigcf.aio.amapi2`, :py:mod:`geni.minigcf.aio.amapi3` and
+:py:mod:`geni.minigcf.aio.chapi2` takes the same arguments as its blocking counterpart and
+returns the same data.  All calls made from one event loop share a single keep-alive
+connection pool.
+"""
+
+import asyncio
+
+from .util import HTTPError, get_pool
+
+async def bounded_gather (aws, limit, return_exceptions = False):
+    """Await all of the awaitables in `aws` with at most `limit` of them running at once.
+
+    Results are returned in the same order as `aws`, as with :py:func:`asyncio.gather`."""
+    sem = asyncio.Semaphore(limit)
+
+    async def _run (aw):
+        async with sem:
+            return await aw
+
+    return await asyncio.gather(*[_run(aw) for aw in aws], return_exceptions = return_exceptions)
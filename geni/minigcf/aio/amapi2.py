@@ -0,0 +1,80 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+#    This Source Code Form is subject to the terms of the Mozilla Public
+#    License, v. 2.0. If a copy of the MPL was not distributed with this
+#    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Awaitable implementation of xmlrpc calls to AM API v2-compliant aggregates
+# Mirrors geni.minigcf.amapi2, using the asyncio transport in geni.minigcf.aio.util
+
+# pylint: disable=too-many-arguments
+
+from six.moves import xmlrpc_client as xmlrpclib
+
+from ..decode import decompress_rspec
+from .util import _rpcpost
+
+async def get_version(url, root_bundle, cert, key, options=None):
+    if options is None:
+        options = {}
+
+    req_data = xmlrpclib.dumps((options,), methodname="GetVersion")
+    return await _rpcpost(url, req_data, (cert, key), root_bundle)
+
+async def list_resources(url, root_bundle, cert, key, cred_strings, options=None, sliceurn=None):
+    if options is None:
+        options = {}
+
+    opts = {"geni_rspec_version" : {"version" : "3", "type" : "GENI"},
+                    "geni_available" : False,
+                    "geni_compressed" : False}
+
+    if sliceurn:
+        opts["geni_slice_urn"] = sliceurn
+
+    # Allow all options to be overridden by the caller
+    opts.update(options)
+
+    req_data = xmlrpclib.dumps((cred_strings, opts), methodname="ListResources")
+    res = await _rpcpost(url, req_data, (cert, key), root_bundle, stream_value=True)
+    if opts["geni_compressed"] and isinstance(res, dict) and "value" in res:
+        res["value"] = decompress_rspec(res["value"])
+    return res
+
+async def delete_sliver(url, root_bundle, cert, key, creds, slice_urn, options=None):
+    if options is None:
+        options = {}
+
+    req_data = xmlrpclib.dumps((slice_urn, creds, options), methodname="DeleteSliver")
+    return await _rpcpost(url, req_data, (cert, key), root_bundle)
+
+async def sliver_status(url, root_bundle, cert, key, creds, slice_urn, options=None):
+    if options is None:
+        options = {}
+
+    req_data = xmlrpclib.dumps((slice_urn, creds, options), methodname="SliverStatus")
+    return await _rpcpost(url, req_data, (cert, key), root_bundle)
+
+async def renew_sliver(url, root_bundle, cert, key, creds, slice_urn, date, options=None):
+    if options is None:
+        options = {}
+
+    date_fmt = "%Y-%m-%dT%H:%M:%S+00:00"
+    req_data = xmlrpclib.dumps((slice_urn, creds, date.strftime(date_fmt), options),
+            methodname="RenewSliver")
+    return await _rpcpost(url, req_data, (cert, key), root_bundle)
+
+async def list_images(url, root_bundle, cert, key, cred_strings, owner_urn, options=None):
+    if options is None:
+        options = {}
+
+    req_data = xmlrpclib.dumps((owner_urn, cred_strings, options), methodname="ListImages")
+    return await _rpcpost(url, req_data, (cert, key), root_bundle)
+
+async def create_sliver(url, root_bundle, cert, key, creds, slice_urn, rspec, users, options=None):
+    if options is None:
+        options = {}
+
+    req_data = xmlrpclib.dumps((slice_urn, creds, rspec, users, options),
+            methodname="CreateSliver")
+    return await _rpcpost(url, req_data, (cert, key), root_bundle, stream_value=True)
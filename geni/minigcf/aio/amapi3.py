@@ -0,0 +1,84 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+#    This Source Code Form is subject to the terms of the Mozilla Public
+#    License, v. 2.0. If a copy of the MPL was not distributed with this
+#    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Awaitable implementation of xmlrpc calls to AM API v3-compliant aggregates
+# Mirrors geni.minigcf.amapi3, using the asyncio transport in geni.minigcf.aio.util
+
+# pylint: disable=too-many-arguments
+
+from six.moves import xmlrpc_client as xmlrpclib
+
+from .util import _rpcpost
+
+async def get_version(url, root_bundle, cert, key, options=None):
+    if options is None:
+        options={}
+
+    req_data = xmlrpclib.dumps(options, methodname="GetVersion")
+    return await _rpcpost(url, req_data, (cert, key), root_bundle)
+
+async def poa(url, root_bundle, cert, key, creds, urns, action, options=None):
+    if options is None:
+        options = {}
+    if not isinstance(urns, list):
+        urns = [urns]
+
+    cred_list = []
+    for cred in creds:
+        cred_list.append({"geni_value" : open(cred.path, "rb").read(),
+            "geni_type" : cred.type, "geni_version" : cred.version})
+
+    req_data = xmlrpclib.dumps((urns, cred_list, action, options),
+                                 methodname="PerformOperationalAction")
+    return await _rpcpost(url, req_data, (cert, key), root_bundle)
+
+async def paa (url, root_bundle, cert, key, action, options=None):
+    if options is None:
+        options = {}
+
+    req_data = xmlrpclib.dumps((action, options), methodname="PerformAggregateAction")
+    return await _rpcpost(url, req_data, (cert, key), root_bundle)
+
+async def allocate(url, root_bundle, cert, key, creds, slice_urn, rspec, options=None):
+    if options is None:
+        options = {}
+
+    cred_list = []
+    for cred in creds:
+        cred_list.append({"geni_value" : open(cred.path, "rb").read(),
+            "geni_type" : cred.type, "geni_version" : cred.version})
+
+    req_data = xmlrpclib.dumps((slice_urn, cred_list, rspec, options), methodname="Allocate")
+    return await _rpcpost(url, req_data, (cert, key), root_bundle)
+
+async def provision(url, root_bundle, cert, key, creds, urns, options=None):
+    if options is None:
+        options = {}
+    if not isinstance(urns, list):
+        urns = [urns]
+
+    cred_list = []
+    for cred in creds:
+        cred_list.append({"geni_value" : open(cred.path, "rb").read(),
+            "geni_type" : cred.type, "geni_version" : cred.version})
+
+    req_data = xmlrpclib.dumps((urns, cred_list, options), methodname="Provision")
+    return await _rpcpost(url, req_data, (cert, key), root_bundle)
+
+async def delete(url, root_bundle, cert, key, creds, urns, options=None):
+    if options is None:
+        options = {}
+
+    if not isinstance(urns, list):
+        urns = [urns]
+
+    cred_list = []
+    for cred in creds:
+        cred_list.append({"geni_value" : open(cred.path, "rb").read(),
+            "geni_type" : cred.type, "geni_version" : cred.version})
+
+    req_data = xmlrpclib.dumps((urns, cred_list, options), methodname="Delete")
+    return await _rpcpost(url, req_data, (cert, key), root_bundle)
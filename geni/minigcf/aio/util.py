@@ -0,0 +1,353 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+#    This Source Code Form is subject to the terms of the Mozilla Public
+#    License, v. 2.0. If a copy of the MPL was not distributed with this
+#    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# Minimal asyncio HTTP/1.1 transport for XML-RPC calls, using only the standard library.
+# Connections are kept alive and pooled per event loop, following the same
+# KEEPALIVE / POOL_* options in minigcf.config.HTTP as the blocking client.
+
+import asyncio
+import collections
+import ssl
+import time
+import weakref
+import zlib
+
+from six.moves import xmlrpc_client as xmlrpclib
+from six.moves.urllib.parse import urlsplit, urljoin
+
+from ... import _coreutil as GCU
+from .. import config
+from .. import decode
+from .. import metrics
+from ..util import _streaming
+
+MAX_REDIRECTS = 5
+
+class HTTPError(Exception):
+    def __init__ (self, url, status, reason):
+        super().__init__()
+        self.url = url
+        self.status = status
+        self.reason = reason
+
+    def __str__ (self):
+        return "%d %s for url: %s" % (self.status, self.reason, self.url)
+
+# pylint: disable=multiple-statements
+class _StaleConnectionError(Exception): pass
+# pylint: enable=multiple-statements
+
+
+class _Connection(object):
+    def __init__ (self, reader, writer):
+        self.reader = reader
+        self.writer = writer
+        self.last_used = time.monotonic()
+        self.connect_time = 0.0
+
+    def close (self):
+        self.writer.close()
+
+
+class _Endpoint(object):
+    def __init__ (self, url):
+        parts = urlsplit(url)
+        self.scheme = parts.scheme
+        self.host = parts.hostname
+        self.port = parts.port or (443 if parts.scheme == "https" else 80)
+        self.netloc = parts.netloc
+        self.path = parts.path or "/"
+        if parts.query:
+            self.path = "%s?%s" % (self.path, parts.query)
+
+
+class ConnectionPool(object):
+    """Keep-alive connection pool bound to a single event loop.
+
+    Each `(scheme, host, port, client cert, root bundle)` key holds at most
+    `config.HTTP.POOL_CONNECTIONS` open connections; additional callers wait for a free slot."""
+
+    def __init__ (self):
+        self._idle = {}
+        self._slots = {}
+        self._contexts = {}
+
+    def _key (self, ep, cert, root_bundle):
+        if isinstance(cert, list):
+            cert = tuple(cert)
+        return (ep.scheme, ep.host, ep.port, cert, root_bundle)
+
+    def _ssl_context (self, cert, root_bundle):
+        ckey = (cert, root_bundle)
+        if ckey not in self._contexts:
+            if root_bundle:
+                ctx = ssl.create_default_context(cafile = root_bundle)
+            else:
+                ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_CLIENT)
+                ctx.check_hostname = False
+                ctx.verify_mode = ssl.CERT_NONE
+            if cert and cert[0]:
+                ctx.load_cert_chain(cert[0], cert[1])
+            self._contexts[ckey] = ctx
+        return self._contexts[ckey]
+
+    def slot (self, ep, cert, root_bundle):
+        key = self._key(ep, cert, root_bundle)
+        if key not in self._slots:
+            self._slots[key] = asyncio.Semaphore(max(1, config.HTTP.POOL_CONNECTIONS))
+        return self._slots[key]
+
+    async def acquire (self, ep, cert, root_bundle):
+        """Return `(connection, reused)` for the endpoint, opening a new connection if no idle one is available."""
+        key = self._key(ep, cert, root_bundle)
+        idle = self._idle.get(key)
+        now = time.monotonic()
+        while idle:
+            conn = idle.pop()
+            if (config.HTTP.POOL_IDLE_TIMEOUT is not None
+                    and now - conn.last_used > config.HTTP.POOL_IDLE_TIMEOUT):
+                conn.close()
+                continue
+            if conn.reader.at_eof():
+                conn.close()
+                continue
+            return (conn, True)
+
+        start = time.perf_counter()
+        sslctx = None
+        server_hostname = None
+        if ep.scheme == "https":
+            sslctx = self._ssl_context(cert, root_bundle)
+            server_hostname = ep.host
+        (reader, writer) = await asyncio.wait_for(
+            asyncio.open_connection(ep.host, ep.port, ssl = sslctx, server_hostname = server_hostname),
+            config.HTTP.TIMEOUT)
+        conn = _Connection(reader, writer)
+        conn.connect_time = time.perf_counter() - start
+        return (conn, False)
+
+    def release (self, ep, cert, root_bundle, conn):
+        if not config.HTTP.KEEPALIVE:
+            conn.close()
+            return
+        conn.last_used = time.monotonic()
+        self._idle.setdefault(self._key(ep, cert, root_bundle), collections.deque()).append(conn)
+
+    def close (self):
+        """Close every idle connection in this pool."""
+        for conns in self._idle.values():
+            for conn in conns:
+                conn.close()
+        self._idle.clear()
+
+
+_POOLS = weakref.WeakKeyDictionary()
+
+def get_pool ():
+    """Return the connection pool for the running event loop."""
+    loop = asyncio.get_running_loop()
+    if loop not in _POOLS:
+        _POOLS[loop] = ConnectionPool()
+    return _POOLS[loop]
+
+
+def _build_request (ep, req_data):
+    if isinstance(req_data, str):
+        req_data = req_data.encode("utf-8")
+
+    hdrs = GCU.defaultHeaders()
+    hdrs["Host"] = ep.netloc
+    hdrs["Content-Type"] = "text/xml"
+    hdrs["Content-Length"] = str(len(req_data))
+    hdrs["Accept-Encoding"] = "gzip" if config.HTTP.ACCEPT_GZIP else "identity"
+    hdrs["Connection"] = "keep-alive" if config.HTTP.KEEPALIVE else "close"
+
+    lines = ["POST %s HTTP/1.1" % (ep.path)]
+    lines.extend(["%s: %s" % (k, v) for (k, v) in hdrs.items()])
+    head = "\r\n".join(lines) + "\r\n\r\n"
+    return head.encode("latin-1") + req_data
+
+
+async def _read_head (reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise _StaleConnectionError()
+    (version, status, reason) = (status_line.decode("latin-1").rstrip("\r\n").split(" ", 2) + [""])[:3]
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        (name, value) = line.decode("latin-1").split(":", 1)
+        headers[name.strip().lower()] = value.strip()
+    return (version, int(status), reason, headers)
+
+
+async def _timed (aw):
+    # Like the blocking client's read timeout: each read must make progress within
+    # config.HTTP.TIMEOUT, however long the whole body takes
+    return await asyncio.wait_for(aw, config.HTTP.TIMEOUT)
+
+
+async def iter_body (reader, headers):
+    """Asynchronously yield the (transfer-decoded) body of a response as byte chunks.  Each
+    read from `reader` times out after `config.HTTP.TIMEOUT` seconds."""
+    if "chunked" in headers.get("transfer-encoding", "").lower():
+        while True:
+            size = int((await _timed(reader.readline())).split(b";", 1)[0].strip(), 16)
+            if size == 0:
+                # Discard trailers
+                while (await _timed(reader.readline())) not in (b"\r\n", b"\n", b""):
+                    pass
+                return
+            yield await _timed(reader.readexactly(size))
+            await _timed(reader.readexactly(2))
+    elif "content-length" in headers:
+        remaining = int(headers["content-length"])
+        while remaining:
+            chunk = await _timed(reader.read(min(remaining, 65536)))
+            if not chunk:
+                raise asyncio.IncompleteReadError(b"", remaining)
+            remaining -= len(chunk)
+            yield chunk
+    else:
+        while True:
+            chunk = await _timed(reader.read(65536))
+            if not chunk:
+                return
+            yield chunk
+
+
+async def _gunzip (body):
+    decomp = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    async for chunk in body:
+        out = decomp.decompress(chunk)
+        if out:
+            yield out
+    out = decomp.flush()
+    if out:
+        yield out
+
+
+def _content (reader, headers):
+    body = iter_body(reader, headers)
+    if headers.get("content-encoding", "").lower() in ("gzip", "x-gzip"):
+        body = _gunzip(body)
+    return body
+
+
+def _reusable (version, headers):
+    if headers.get("connection", "").lower() == "close":
+        return False
+    if version != "HTTP/1.1":
+        return False
+    return ("content-length" in headers) or ("chunked" in headers.get("transfer-encoding", "").lower())
+
+
+async def _collect (body, call):
+    chunks = []
+    async for chunk in body:
+        call.response_bytes += len(chunk)
+        chunks.append(chunk)
+    return b"".join(chunks)
+
+
+async def _decode (body, decoder, call):
+    async for chunk in body:
+        call.response_bytes += len(chunk)
+        decoder.feed(chunk)
+    return decoder.close()
+
+
+async def _send (conn, ep, req_data):
+    conn.writer.write(_build_request(ep, req_data))
+    await conn.writer.drain()
+    return await _read_head(conn.reader)
+
+
+async def _exchange (pool, ep, cert, root_bundle, req_data, call, decoder = None):
+    """Send one request and read the response body, retrying once if a pooled connection
+    turns out to have been closed by the server.  If a `decoder` is supplied a successful
+    response body is fed to it as it arrives and the decoded value is returned instead."""
+    for attempt in range(2):
+        (conn, reused) = await pool.acquire(ep, cert, root_bundle)
+        if not reused:
+            call.connect_time += conn.connect_time
+        try:
+            (version, status, reason, headers) = await asyncio.wait_for(_send(conn, ep, req_data),
+                                                                        config.HTTP.TIMEOUT)
+        except (_StaleConnectionError, ConnectionError):
+            conn.close()
+            if reused and attempt == 0:
+                continue
+            raise
+        except BaseException:
+            conn.close()
+            raise
+
+        try:
+            if decoder is not None and status == 200:
+                result = (status, reason, headers, await _decode(_content(conn.reader, headers), decoder, call))
+            else:
+                result = (status, reason, headers, await _collect(_content(conn.reader, headers), call))
+        except BaseException:
+            conn.close()
+            raise
+
+        if _reusable(version, headers):
+            pool.release(ep, cert, root_bundle, conn)
+        else:
+            conn.close()
+        return result
+
+
+# pylint: disable=unsubscriptable-object
+async def _rpcpost (url, req_data, cert, root_bundle, stream_value = False):
+    """Asynchronous equivalent of :py:func:`geni.minigcf.util._rpcpost`."""
+
+    call = metrics.Call(url, req_data)
+    try:
+        result = await _post(url, req_data, cert, root_bundle, stream_value, call)
+    except Exception as e:
+        call.finish(error = e)
+        raise
+    call.finish(result)
+    return result
+
+
+async def _post (url, req_data, cert, root_bundle, stream_value, call):
+    if isinstance(config.HTTP.LOG_RAW_REQUESTS, tuple):
+        config.HTTP.LOG_RAW_REQUESTS[0].log(config.HTTP.LOG_RAW_REQUESTS[1], req_data)
+
+    stream = _streaming(stream_value)
+    pool = get_pool()
+    for _ in range(MAX_REDIRECTS + 1):
+        if isinstance(config.HTTP.LOG_URLS, tuple):
+            config.HTTP.LOG_URLS[0].log(config.HTTP.LOG_URLS[1], f"POST: {url}")
+
+        ep = _Endpoint(url)
+        async with pool.slot(ep, cert, root_bundle):
+            decoder = decode.StreamingDecoder() if stream else None
+            (status, reason, headers, body) = await _exchange(pool, ep, cert, root_bundle, req_data, call, decoder)
+        call.status = status
+
+        if status in (301, 302, 307, 308) and config.HTTP.ALLOW_REDIRECTS and "location" in headers:
+            url = urljoin(url, headers["location"])
+            continue
+        if status != 200:
+            raise HTTPError(url, status, reason)
+        break
+    else:
+        raise HTTPError(url, status, "Too many redirects")
+
+    if stream:
+        return body
+
+    if isinstance(config.HTTP.LOG_RAW_RESPONSES, tuple):
+        config.HTTP.LOG_RAW_RESPONSES[0].log(config.HTTP.LOG_RAW_RESPONSES[1], body)
+
+    return xmlrpclib.loads(body, use_datetime=True)[0][0]
@@ -11,6 +11,7 @@
 
 from six.moves import xmlrpc_client as xmlrpclib
 
+from .decode import decompress_rspec
 from .util import _rpcpost
 
 def get_version(url, root_bundle, cert, key, options=None):
@@ -35,7 +36,10 @@ def list_resources(url, root_bundle, cert, key, cred_strings, options=None, slic
     opts.update(options)
 
     req_data = xmlrpclib.dumps((cred_strings, opts), methodname="ListResources")
-    return _rpcpost(url, req_data, (cert, key), root_bundle)
+    res = _rpcpost(url, req_data, (cert, key), root_bundle, stream_value=True)
+    if opts["geni_compressed"] and isinstance(res, dict) and "value" in res:
+        res["value"] = decompress_rspec(res["value"])
+    return res
 
 def delete_sliver(url, root_bundle, cert, key, creds, slice_urn, options=None):
     if options is None:
@@ -73,4 +77,4 @@ def create_sliver(url, root_bundle, cert, key, creds, slice_urn, rspec, users, o
 
     req_data = xmlrpclib.dumps((slice_urn, creds, rspec, users, options),
             methodname="CreateSliver")
-    return _rpcpost(url, req_data, (cert, key), root_bundle)
+    return _rpcpost(url, req_data, (cert, key), root_bundle, stream_value=True)
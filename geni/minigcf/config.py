@@ -24,3 +24,41 @@ class HTTP(object):
 
   LOG_URLS = False
   """If set to a valid `(log_handle, log_level)` tuple, will log all URLs as they are used."""
+
+  KEEPALIVE = True
+  """Reuse pooled HTTPS sessions (and their open connections) across calls to the same
+  endpoint.  Sessions are keyed by `(scheme://host:port, client cert, root bundle)`.  If set
+  to `False` every call builds (and tears down) a fresh session, as in older releases."""
+
+  POOL_SESSIONS = 32
+  """Maximum number of distinct sessions kept in the pool.  The least recently used session
+  is closed when this limit is exceeded."""
+
+  POOL_CONNECTIONS = 4
+  """Maximum number of open connections each pooled session keeps to its endpoint."""
+
+  POOL_IDLE_TIMEOUT = 120
+  """Seconds a pooled session may sit unused before it is closed and evicted.  Set to `None`
+  to keep sessions until they are pushed out by `POOL_SESSIONS`."""
+
+  METRICS = None
+  """Sink for per-call metrics - set to :py:data:`geni.minigcf.metrics.REGISTRY` (or any object with a
+  `record(call)` method) to collect latency, connection setup time, byte counts and outcomes of every
+  XML-RPC call.  See :py:mod:`geni.minigcf.metrics`."""
+
+  ACCEPT_GZIP = True
+  """Ask servers for a gzip `Content-Encoding` on responses.  Responses are decompressed
+  transparently; set to False to request uncompressed (identity) bodies."""
+
+  COMPRESSED_RSPECS = False
+  """Default for the `compressed` argument of
+  :py:meth:`geni.aggregate.core.AM.list_resources` - request advertisements with the
+  `geni_compressed` option.  The base64 encoded zlib payload is decompressed before it is
+  handed to the rspec parsers."""
+
+  STREAM_RSPECS = False
+  """Decode `ListResources` and `CreateSliver` responses as they are received, parsing the
+  returned rspec directly into an lxml tree instead of buffering the response body and the
+  decoded rspec string.  When enabled the `value` member of those responses is an lxml
+  element rather than a string (the parsers in :py:mod:`geni.aggregate.amtypes` accept
+  either).  Ignored while `LOG_RAW_RESPONSES` is set."""
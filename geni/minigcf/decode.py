@@ -0,0 +1,183 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+#    This Source Code Form is subject to the terms of the Mozilla Public
+#    License, v. 2.0. If a copy of the MPL was not distributed with this
+#    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Incremental XML-RPC response decoding.
+
+:py:class:`StreamingDecoder` is fed the HTTP response body chunk by chunk.  The `value`
+member of the top-level response struct (the rspec for `ListResources` and `CreateSliver`)
+is not collected into a Python string - its character data is handed straight to an lxml
+incremental parser (decompressing `geni_compressed` payloads on the way), and the decoded
+result holds the parsed root element instead.
+"""
+
+import base64
+import binascii
+import zlib
+from xml.parsers import expat
+
+from lxml import etree as ET
+import six
+from six.moves import xmlrpc_client as xmlrpclib
+
+CHUNK_SIZE = 65536
+
+
+class _RSpecSink(object):
+    """Receives the character data of a single XML-RPC string value.
+
+    An XML document is parsed incrementally as it arrives.  A `geni_compressed` value
+    (base64 encoded zlib data) is decoded and decompressed on the fly into the same
+    parser.  Anything else (error text, empty values) is collected and returned as a
+    plain string."""
+
+    def __init__ (self):
+        self._mode = None
+        self._parser = None
+        self._text = []
+        self._b64 = ""
+        self._zlib = None
+
+    def _start_compressed (self):
+        self._mode = "zlib"
+        self._zlib = zlib.decompressobj()
+        self._parser = ET.XMLParser()
+
+    def _feed_compressed (self, text, final = False):
+        self._b64 += "".join(text.split())
+        usable = len(self._b64) if final else len(self._b64) - (len(self._b64) % 4)
+        raw = base64.b64decode(self._b64[:usable], validate = True)
+        self._b64 = self._b64[usable:]
+        out = self._zlib.decompress(raw)
+        if final:
+            out += self._zlib.flush()
+        if out:
+            self._parser.feed(out)
+            # Past the point of no return, no need to keep the raw text around
+            self._text = None
+
+    def feed (self, text):
+        if self._mode == "xml":
+            self._parser.feed(text)
+            return
+
+        if self._text is not None:
+            self._text.append(text)
+
+        if self._mode == "plain":
+            return
+
+        if self._mode == "zlib":
+            self._try_compressed(text)
+            return
+
+        stripped = "".join(self._text).lstrip()
+        if stripped:
+            if stripped[0] == "<":
+                self._mode = "xml"
+                self._parser = ET.XMLParser()
+                self._parser.feed(stripped)
+                self._text = None
+            else:
+                self._start_compressed()
+                self._try_compressed(stripped)
+
+    def _try_compressed (self, text, final = False):
+        if self._text is None:
+            self._feed_compressed(text, final)
+            return
+
+        try:
+            self._feed_compressed(text, final)
+        except (binascii.Error, zlib.error, ValueError):
+            # Not a compressed rspec either - stop inspecting and just collect it
+            self._mode = "plain"
+
+    def close (self):
+        if self._mode == "xml":
+            return self._parser.close()
+        if self._mode == "zlib":
+            self._try_compressed("", True)
+            if self._text is None:
+                return self._parser.close()
+        return "".join(self._text)
+
+
+def decompress_rspec (value):
+    """Decompress a `geni_compressed` (base64 encoded zlib) rspec value.  Values that are
+    not compressed are returned unchanged."""
+    if not isinstance(value, six.string_types) or value.lstrip()[:1] in ("<", ""):
+        return value
+    try:
+        return zlib.decompress(base64.b64decode(value)).decode("utf-8")
+    except (binascii.Error, zlib.error, ValueError):
+        return value
+
+
+class RSpecUnmarshaller(xmlrpclib.Unmarshaller):
+    """XML-RPC unmarshaller that routes the top-level `value` struct member into an
+    :py:class:`_RSpecSink` instead of buffering it."""
+
+    def __init__ (self, use_datetime = False):
+        super().__init__(use_datetime = use_datetime)
+        self._expect_rspec = False
+        self._sink = None
+
+    def start (self, tag, attrs):
+        if self._sink is not None:
+            if tag == "string":
+                return
+            # Not a string value after all - decode normally
+            self._sink = None
+
+        super().start(tag, attrs)
+
+        if self._expect_rspec and tag == "value":
+            self._sink = _RSpecSink()
+        self._expect_rspec = False
+
+    def data (self, text):
+        if self._sink is not None:
+            self._sink.feed(text)
+        else:
+            super().data(text)
+
+    def end (self, tag):
+        if self._sink is not None and tag in ("string", "value"):
+            sink = self._sink
+            self._sink = None
+            self.append(sink.close())
+            self._value = 0
+            self._data = []
+            return None
+
+        if tag == "name" and len(self._marks) == 1 and "".join(self._data) == "value":
+            self._expect_rspec = True
+
+        return super().end(tag)
+
+
+class StreamingDecoder(object):
+    """Decode an XML-RPC response incrementally with :py:meth:`feed`, returning the first
+    response parameter from :py:meth:`close`."""
+
+    def __init__ (self):
+        self._target = RSpecUnmarshaller(use_datetime = True)
+        # Expat hands us already decoded text
+        self._target.xml(None, None)
+        self._parser = expat.ParserCreate(None, None)
+        self._parser.buffer_text = True
+        self._parser.buffer_size = CHUNK_SIZE
+        self._parser.StartElementHandler = self._target.start
+        self._parser.EndElementHandler = self._target.end
+        self._parser.CharacterDataHandler = self._target.data
+
+    def feed (self, data):
+        self._parser.Parse(data, False)
+
+    def close (self):
+        self._parser.Parse(b"", True)
+        return self._target.close()[0]
@@ -0,0 +1,276 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+#    This Source Code Form is subject to the terms of the Mozilla Public
+#    License, v. 2.0. If a copy of the MPL was not distributed with this
+#    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Per-call metrics for MiniGCF XML-RPC calls.
+
+Every call made through `_rpcpost` (blocking or asyncio) is described by a :py:class:`Call`,
+which is handed to the sink configured in :py:attr:`geni.minigcf.config.HTTP.METRICS` when
+the call completes.  :py:class:`Registry` is the bundled sink - it keeps per-endpoint and
+per-method histograms in memory, and can be queried at runtime or exported as JSON or in
+the Prometheus text exposition format::
+
+  from geni.minigcf import config, metrics
+  config.HTTP.METRICS = metrics.REGISTRY
+  ...
+  print(metrics.REGISTRY.to_prometheus())
+
+Any object with a `record(call)` method can be used as a sink instead.
+"""
+
+import collections
+import json
+import math
+import re
+import threading
+import time
+
+from six.moves.urllib.parse import urlsplit
+
+from . import config
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, math.inf)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216, 67108864, math.inf)
+
+_METHOD_RE = re.compile(r"<methodName>\s*([^<\s]+)\s*</methodName>")
+
+_LOCAL = threading.local()
+
+
+def reset_connect_time ():
+    """Reset the connection setup time accumulated by the current thread."""
+    _LOCAL.connect_time = 0.0
+
+def add_connect_time (seconds):
+    """Add time spent establishing a connection (TCP connect and TLS handshake) by the current thread."""
+    _LOCAL.connect_time = getattr(_LOCAL, "connect_time", 0.0) + seconds
+
+def connect_time ():
+    """Return the connection setup time accumulated by the current thread since the last reset."""
+    return getattr(_LOCAL, "connect_time", 0.0)
+
+
+def _endpoint (url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/"
+
+def _method (req_data):
+    if isinstance(req_data, bytes):
+        req_data = req_data[:1024].decode("utf-8", "replace")
+    match = _METHOD_RE.search(req_data[:1024])
+    if match:
+        return match.group(1)
+    return "unknown"
+
+def _geni_code (result):
+    if not isinstance(result, dict):
+        return None
+    code = result.get("code")
+    if isinstance(code, dict):
+        code = code.get("geni_code")
+    return code
+
+
+class Call(object):
+    """Description of a single XML-RPC call.
+
+    Attributes:
+      url (str): URL the call was posted to
+      endpoint (str): `scheme://host:port/` part of the URL
+      method (str): XML-RPC method name
+      elapsed (float): Wall time of the call in seconds
+      connect_time (float): Time spent setting up new connections, 0 if a pooled one was reused
+      request_bytes (int): Size of the request body, in bytes as sent (UTF-8)
+      response_bytes (int): Size of the (content-decoded) response body
+      status (int): HTTP status of the last response, if one was received
+      geni_code: `geni_code` (or CH API `code`) of the result, if any
+      error (str): Exception class name if the call failed, otherwise `None`
+    """
+
+    def __init__ (self, url, req_data):
+        self.url = url
+        self._req_data = req_data
+        self._start = time.perf_counter()
+        self.elapsed = None
+        self.connect_time = 0.0
+        self.request_bytes = len(req_data.encode("utf-8") if isinstance(req_data, str) else req_data)
+        self.response_bytes = 0
+        self.status = None
+        self.geni_code = None
+        self.error = None
+
+    @property
+    def endpoint (self):
+        return _endpoint(self.url)
+
+    @property
+    def method (self):
+        return _method(self._req_data)
+
+    def finish (self, result = None, error = None):
+        """Complete the call and hand it to the configured sink, if there is one."""
+        sink = config.HTTP.METRICS
+        if sink is None:
+            return
+        self.elapsed = time.perf_counter() - self._start
+        if error is not None:
+            self.error = type(error).__name__
+            self.status = getattr(getattr(error, "response", None), "status_code", self.status)
+            self.status = getattr(error, "status", self.status)
+        else:
+            self.geni_code = _geni_code(result)
+        sink.record(self)
+
+
+class Histogram(object):
+    """Fixed-bucket histogram, following the Prometheus model (cumulative `le` buckets)."""
+
+    def __init__ (self, buckets):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * len(self.buckets)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe (self, value):
+        self.count += 1
+        self.sum += value
+        for idx, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[idx] += 1
+                break
+
+    def cumulative (self):
+        total = 0
+        out = []
+        for (bound, count) in zip(self.buckets, self.counts):
+            total += count
+            out.append((bound, total))
+        return out
+
+    def to_dict (self):
+        return {"count" : self.count, "sum" : self.sum,
+                "buckets" : [["+Inf" if math.isinf(b) else b, c] for (b, c) in self.cumulative()]}
+
+
+class CallStats(object):
+    """Aggregated metrics for one `(endpoint, method)` pair."""
+
+    def __init__ (self):
+        self.calls = 0
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.connect = Histogram(LATENCY_BUCKETS)
+        self.request_bytes = Histogram(SIZE_BUCKETS)
+        self.response_bytes = Histogram(SIZE_BUCKETS)
+        self.codes = collections.Counter()
+        self.errors = collections.Counter()
+
+    def observe (self, call):
+        self.calls += 1
+        self.latency.observe(call.elapsed)
+        if call.connect_time:
+            self.connect.observe(call.connect_time)
+        self.request_bytes.observe(call.request_bytes)
+        if call.error is not None:
+            self.errors[call.error] += 1
+        else:
+            self.response_bytes.observe(call.response_bytes)
+            self.codes[str(call.geni_code)] += 1
+
+    def to_dict (self):
+        return {"calls" : self.calls,
+                "latency_seconds" : self.latency.to_dict(),
+                "connect_seconds" : self.connect.to_dict(),
+                "request_bytes" : self.request_bytes.to_dict(),
+                "response_bytes" : self.response_bytes.to_dict(),
+                "geni_codes" : dict(self.codes),
+                "errors" : dict(self.errors)}
+
+
+def _label (value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+def _num (value):
+    if isinstance(value, float) and math.isinf(value):
+        return "+Inf"
+    return repr(value) if isinstance(value, float) else str(value)
+
+
+class Registry(object):
+    """Thread-safe in-process store of :py:class:`CallStats`, keyed by endpoint and method."""
+
+    PREFIX = "geni_minigcf"
+
+    _HISTOGRAMS = (("latency", "call_duration_seconds", "Wall time of XML-RPC calls"),
+                   ("connect", "connect_duration_seconds", "Connection setup (TCP connect and TLS handshake) time"),
+                   ("request_bytes", "request_bytes", "Size of XML-RPC request bodies"),
+                   ("response_bytes", "response_bytes", "Size of XML-RPC response bodies"))
+
+    def __init__ (self):
+        self._lock = threading.Lock()
+        self._stats = {}
+
+    def record (self, call):
+        key = (call.endpoint, call.method)
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = CallStats()
+            stats.observe(call)
+
+    def reset (self):
+        with self._lock:
+            self._stats.clear()
+
+    def snapshot (self, endpoint = None, method = None):
+        """Return a list of dicts with the stats for every endpoint and method, optionally
+        restricted to a single `endpoint` (URL or `scheme://host:port/`) and/or `method`."""
+        if endpoint is not None:
+            endpoint = _endpoint(endpoint)
+        out = []
+        with self._lock:
+            for ((ep, meth), stats) in sorted(self._stats.items()):
+                if endpoint is not None and ep != endpoint:
+                    continue
+                if method is not None and meth != method:
+                    continue
+                entry = {"endpoint" : ep, "method" : meth}
+                entry.update(stats.to_dict())
+                out.append(entry)
+        return out
+
+    def to_json (self, **kwargs):
+        return json.dumps(self.snapshot(), **kwargs)
+
+    def to_prometheus (self):
+        """Render all stats in the Prometheus text exposition format."""
+        with self._lock:
+            items = sorted(self._stats.items())
+            lines = []
+            for (attr, name, helptext) in self._HISTOGRAMS:
+                metric = f"{self.PREFIX}_{name}"
+                lines.append(f"# HELP {metric} {helptext}")
+                lines.append(f"# TYPE {metric} histogram")
+                for ((ep, meth), stats) in items:
+                    hist = getattr(stats, attr)
+                    labels = f"endpoint=\"{_label(ep)}\",method=\"{_label(meth)}\""
+                    for (bound, count) in hist.cumulative():
+                        lines.append(f"{metric}_bucket{{{labels},le=\"{_num(bound)}\"}} {count}")
+                    lines.append(f"{metric}_sum{{{labels}}} {_num(hist.sum)}")
+                    lines.append(f"{metric}_count{{{labels}}} {hist.count}")
+
+            for (attr, name, label, helptext) in (("codes", "calls_total", "geni_code", "Completed calls by geni_code"),
+                                                  ("errors", "errors_total", "error", "Failed calls by exception type")):
+                metric = f"{self.PREFIX}_{name}"
+                lines.append(f"# HELP {metric} {helptext}")
+                lines.append(f"# TYPE {metric} counter")
+                for ((ep, meth), stats) in items:
+                    for (value, count) in sorted(getattr(stats, attr).items()):
+                        lines.append(f"{metric}{{endpoint=\"{_label(ep)}\",method=\"{_label(meth)}\","
+                                     f"{label}=\"{_label(value)}\"}} {count}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
@@ -0,0 +1,138 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+#    This Source Code Form is subject to the terms of the Mozilla Public
+#    License, v. 2.0. If a copy of the MPL was not distributed with this
+#    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Pool of persistent `requests` sessions shared by all MiniGCF calls.
+
+Sessions are keyed by endpoint (scheme, host and port), client certificate and root
+bundle, so repeated calls to the same aggregate reuse an already established TLS
+connection instead of paying a full handshake on every call.  Behaviour is controlled
+by the `KEEPALIVE` and `POOL_*` options in :py:class:`geni.minigcf.config.HTTP`.
+"""
+
+import collections
+import os
+import threading
+import time
+
+from six.moves.urllib.parse import urlsplit
+
+import requests
+from requests.packages.urllib3.connection import HTTPConnection, HTTPSConnection
+from requests.packages.urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+from .. import _coreutil as GCU
+from . import config
+from . import metrics
+
+
+def _endpoint(url):
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}/"
+
+
+class _TimedConnectMixin(object):
+    # Report connection setup time to the metrics accumulator of the calling thread
+    def connect (self):
+        start = time.perf_counter()
+        try:
+            super().connect()
+        finally:
+            metrics.add_connect_time(time.perf_counter() - start)
+
+class _TimedHTTPConnection(_TimedConnectMixin, HTTPConnection):
+    pass
+
+class _TimedHTTPSConnection(_TimedConnectMixin, HTTPSConnection):
+    pass
+
+class _TimedHTTPConnectionPool(HTTPConnectionPool):
+    ConnectionCls = _TimedHTTPConnection
+
+class _TimedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _TimedHTTPSConnection
+
+
+def new_session(url):
+    """Build a new session with the MiniGCF TLS adapter mounted for the endpoint of `url`."""
+    session = requests.Session()
+    size = max(1, config.HTTP.POOL_CONNECTIONS)
+    adapter = GCU.TLSHttpAdapter(pool_connections=1, pool_maxsize=size)
+    adapter.poolmanager.pool_classes_by_scheme = {"http" : _TimedHTTPConnectionPool,
+                                                  "https" : _TimedHTTPSConnectionPool}
+    session.mount(_endpoint(url), adapter)
+    return session
+
+
+class SessionPool(object):
+    """LRU pool of `requests.Session` objects with idle eviction.
+
+    The pool is safe to use from multiple threads.  After a `fork()` the child discards
+    (without closing) every session inherited from the parent, so the two processes never
+    share a socket."""
+
+    def __init__ (self):
+        self._lock = threading.Lock()
+        self._sessions = collections.OrderedDict()
+        self._pid = os.getpid()
+
+    def __len__ (self):
+        return len(self._sessions)
+
+    def _key (self, url, cert, root_bundle):
+        if isinstance(cert, list):
+            cert = tuple(cert)
+        return (_endpoint(url), cert, root_bundle)
+
+    def _check_fork (self):
+        if self._pid != os.getpid():
+            # Connections belong to the parent - drop them without shutting them down
+            self._sessions = collections.OrderedDict()
+            self._lock = threading.Lock()
+            self._pid = os.getpid()
+
+    def _evict (self, now):
+        expired = []
+        idle = config.HTTP.POOL_IDLE_TIMEOUT
+        if idle is not None:
+            for key, (_, last_used) in self._sessions.items():
+                if now - last_used > idle:
+                    expired.append(key)
+        for key in expired:
+            self._sessions.pop(key)[0].close()
+        while len(self._sessions) > max(config.HTTP.POOL_SESSIONS, 1):
+            (_, (session, _)) = self._sessions.popitem(last=False)
+            session.close()
+
+    def get (self, url, cert, root_bundle):
+        """Return a session for the given endpoint and identity, creating one if needed."""
+        self._check_fork()
+        key = self._key(url, cert, root_bundle)
+        now = time.monotonic()
+        with self._lock:
+            self._evict(now)
+            try:
+                session = self._sessions.pop(key)[0]
+            except KeyError:
+                session = new_session(url)
+            self._sessions[key] = (session, now)
+            self._evict(now)
+        return session
+
+    def clear (self):
+        """Close and forget every pooled session."""
+        self._check_fork()
+        with self._lock:
+            for (session, _) in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+
+
+SESSIONS = SessionPool()
+
+def clear ():
+    """Close all sessions in the process-wide pool."""
+    SESSIONS.clear()
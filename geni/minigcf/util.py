@@ -6,33 +6,76 @@
 
 from six.moves import xmlrpc_client as xmlrpclib
 
-import requests
-
 from .. import _coreutil as GCU
 from . import config
+from . import decode
+from . import metrics
+from . import pool
 
 GCU.disableUrllibWarnings()
 
 def headers():
-    return GCU.defaultHeaders()
+    hdrs = GCU.defaultHeaders()
+    hdrs["Accept-Encoding"] = "gzip" if config.HTTP.ACCEPT_GZIP else "identity"
+    return hdrs
+
+def _streaming (stream_value):
+    return (stream_value and config.HTTP.STREAM_RSPECS
+            and not isinstance(config.HTTP.LOG_RAW_RESPONSES, tuple))
 
 # pylint: disable=unsubscriptable-object
-def _rpcpost (url, req_data, cert, root_bundle):
+def _rpcpost (url, req_data, cert, root_bundle, stream_value = False):
+    """POST an XML-RPC request and return the unmarshalled response.
+
+    If `stream_value` is set (the response `value` member is an rspec) and
+    :py:attr:`geni.minigcf.config.HTTP.STREAM_RSPECS` is enabled, the body is decoded
+    as it arrives and that member is returned as a parsed lxml element."""
+
+    call = metrics.Call(url, req_data)
+    try:
+        result = _post(url, req_data, cert, root_bundle, stream_value, call)
+    except Exception as e:
+        call.finish(error = e)
+        raise
+    call.finish(result)
+    return result
+
+def _post (url, req_data, cert, root_bundle, stream_value, call):
     if isinstance(config.HTTP.LOG_URLS, tuple):
         config.HTTP.LOG_URLS[0].log(config.HTTP.LOG_URLS[1], f"POST: {url}")
 
-    session = requests.Session()
-    session.mount(url, GCU.TLSHttpAdapter())
+    if config.HTTP.KEEPALIVE:
+        session = pool.SESSIONS.get(url, cert, root_bundle)
+    else:
+        session = pool.new_session(url)
 
     if isinstance(config.HTTP.LOG_RAW_REQUESTS, tuple):
         config.HTTP.LOG_RAW_REQUESTS[0].log(config.HTTP.LOG_RAW_REQUESTS[1], req_data)
 
-    resp = session.post(url, req_data, cert=cert, verify=root_bundle, headers=headers(),
-            timeout=config.HTTP.TIMEOUT, allow_redirects=config.HTTP.ALLOW_REDIRECTS)
+    stream = _streaming(stream_value)
+    try:
+        metrics.reset_connect_time()
+        resp = session.post(url, req_data, cert=cert, verify=root_bundle, headers=headers(),
+                timeout=config.HTTP.TIMEOUT, allow_redirects=config.HTTP.ALLOW_REDIRECTS,
+                stream=stream)
+        call.connect_time = metrics.connect_time()
+        call.status = resp.status_code
+
+        if resp.status_code != 200:
+            resp.raise_for_status()
 
-    if resp.status_code != 200:
-        resp.raise_for_status()
+        if stream:
+            with resp:
+                decoder = decode.StreamingDecoder()
+                for chunk in resp.iter_content(decode.CHUNK_SIZE):
+                    call.response_bytes += len(chunk)
+                    decoder.feed(chunk)
+                return decoder.close()
+    finally:
+        if not config.HTTP.KEEPALIVE:
+            session.close()
 
+    call.response_bytes = len(resp.content)
     if isinstance(config.HTTP.LOG_RAW_RESPONSES, tuple):
         config.HTTP.LOG_RAW_RESPONSES[0].log(config.HTTP.LOG_RAW_RESPONSES[1], resp.content)
 
@@ -0,0 +1,243 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Deduplicated catalog of the disk images advertised across many aggregates.
+
+An :py:class:`ImageCatalog` interns :py:class:`geni.rspec.pgad.Image` objects by
+`(name, version)` and records, for each image, the aggregates and hardware types that
+offer it, so cross-site questions are dictionary lookups::
+
+  catalog = ImageCatalog.for_cache(context.ad_cache)
+  for (name, ad) in ads:
+    catalog.add_advertisement(name, ad)
+  catalog.save()
+
+  catalog.where("urn:publicid:IDN+emulab.net+image+emulab-ops:UBUNTU22-64-STD", "d430")
+
+Adding an advertisement replaces everything previously recorded for that aggregate.
+"""
+
+from __future__ import absolute_import
+
+import json
+import os
+import os.path
+import threading
+
+CATALOG_FILE = "images.json"
+FORMAT_VERSION = 1
+
+
+def _copy_image (image):
+  # Detached copy, so the catalog never keeps an advertisement tree alive
+  from ..rspec import pgad  # pylint: disable=import-outside-toplevel
+  out = pgad.Image()
+  (out.name, out.os, out.version, out.description, out.url) = (image.name, image.os, image.version,
+                                                               image.description, image.url)
+  return out
+
+
+class ImageCatalog(object):
+  """Interned disk images and where they can be used.
+
+  Args:
+    path (str): File used by :py:meth:`save` and :py:meth:`load` (optional)
+  """
+
+  def __init__ (self, path = None):
+    self.path = path
+    self._lock = threading.RLock()
+    self._images = {}      # (name, version) -> pgad.Image
+    self._by_name = {}     # name -> set((name, version))
+    self._support = {}     # (name, version) -> { aggregate : set(hardware_type) }
+    self._by_hardware = {} # hardware_type -> { (name, version) : set(aggregate) }
+    self._aggregates = {}  # aggregate -> set((name, version, hardware_type))
+
+  @classmethod
+  def for_cache (cls, cache):
+    """Return the catalog kept alongside an :py:class:`geni.aggregate.adcache.AdCache`,
+    loading it if it has been saved before."""
+    catalog = cls(os.path.join(cache.path, CATALOG_FILE))
+    if os.path.exists(catalog.path):
+      catalog.load()
+    return catalog
+
+  def __len__ (self):
+    return len(self._images)
+
+  def __contains__ (self, name):
+    return name in self._by_name
+
+  def __iter__ (self):
+    with self._lock:
+      return iter(list(self._images.values()))
+
+  @property
+  def aggregates (self):
+    """Set of aggregates that have been added to the catalog."""
+    return set(self._aggregates)
+
+  def intern (self, image):
+    """Return the catalog's canonical :py:class:`geni.rspec.pgad.Image` for `image`."""
+    key = (image.name, image.version)
+    with self._lock:
+      try:
+        return self._images[key]
+      except KeyError:
+        canonical = self._images[key] = _copy_image(image)
+        self._by_name.setdefault(image.name, set()).add(key)
+        return canonical
+
+  def _record (self, aggregate, key, hardware_type):
+    self._support.setdefault(key, {}).setdefault(aggregate, set()).add(hardware_type)
+    self._by_hardware.setdefault(hardware_type, {}).setdefault(key, set()).add(aggregate)
+    self._aggregates.setdefault(aggregate, set()).add(key + (hardware_type,))
+
+  def _forget (self, aggregate):
+    for (name, version, htype) in self._aggregates.pop(aggregate, ()):
+      key = (name, version)
+      sites = self._support.get(key, {})
+      sites.pop(aggregate, None)
+      keys = self._by_hardware.get(htype, {})
+      aggs = keys.get(key)
+      if aggs is not None:
+        aggs.discard(aggregate)
+        if not aggs:
+          del keys[key]
+      if not keys:
+        self._by_hardware.pop(htype, None)
+      if not sites:
+        self._support.pop(key, None)
+        self._images.pop(key, None)
+        names = self._by_name.get(name)
+        if names is not None:
+          names.discard(key)
+          if not names:
+            del self._by_name[name]
+
+  def add_advertisement (self, aggregate, ad):
+    """Record the images offered by an advertisement, replacing anything previously recorded
+    for `aggregate` (a string identifying the aggregate - its name, URN or component manager ID).
+
+    Every image of every node is recorded against each of that node's hardware types.
+    """
+    pairs = []
+    for node in ad.nodes:
+      htypes = list(node.hardware_types)
+      if not htypes:
+        continue
+      for image_list in node.images.values():
+        for image in image_list:
+          pairs.append((image, htypes))
+
+    with self._lock:
+      self._forget(aggregate)
+      for (image, htypes) in pairs:
+        key = (image.name, image.version)
+        self.intern(image)
+        for htype in htypes:
+          self._record(aggregate, key, htype)
+
+  def remove_aggregate (self, aggregate):
+    """Remove everything recorded for `aggregate`."""
+    with self._lock:
+      self._forget(aggregate)
+
+  def _keys (self, name, version):
+    if version is not None:
+      return [(name, version)] if (name, version) in self._images else []
+    return list(self._by_name.get(name, ()))
+
+  def lookup (self, name, version = None):
+    """Return the interned images named `name` (all versions unless `version` is given)."""
+    with self._lock:
+      return [self._images[key] for key in self._keys(name, version)]
+
+  def where (self, name, hardware_type = None, version = None):
+    """Return the set of aggregates that offer image `name` (optionally only on `hardware_type`,
+    and only at `version`)."""
+    out = set()
+    with self._lock:
+      for key in self._keys(name, version):
+        if hardware_type is None:
+          out.update(self._support.get(key, {}))
+        else:
+          out.update(self._by_hardware.get(hardware_type, {}).get(key, ()))
+    return out
+
+  def hardware_types (self, name, aggregate = None, version = None):
+    """Return the set of hardware types image `name` is offered on (optionally only at
+    `aggregate`)."""
+    out = set()
+    with self._lock:
+      for key in self._keys(name, version):
+        for (agg, htypes) in self._support.get(key, {}).items():
+          if aggregate is None or agg == aggregate:
+            out |= htypes
+    return out
+
+  def support (self, name, version = None):
+    """Return a mapping of `{ aggregate : set(hardware_type) }` for image `name`."""
+    out = {}
+    with self._lock:
+      for key in self._keys(name, version):
+        for (agg, htypes) in self._support.get(key, {}).items():
+          out.setdefault(agg, set()).update(htypes)
+    return out
+
+  def images_for (self, hardware_type, aggregate = None):
+    """Return the interned images offered on `hardware_type` (optionally only at `aggregate`)."""
+    with self._lock:
+      return [self._images[key] for (key, aggs) in self._by_hardware.get(hardware_type, {}).items()
+              if aggregate is None or aggregate in aggs]
+
+  def to_dict (self):
+    with self._lock:
+      images = []
+      for (key, image) in self._images.items():
+        images.append({"name" : image.name, "version" : image.version, "os" : image.os,
+                       "description" : image.description, "url" : image.url,
+                       "support" : {str(agg) : sorted(htypes) for (agg, htypes) in self._support.get(key, {}).items()}})
+      return {"version" : FORMAT_VERSION, "images" : images}
+
+  @classmethod
+  def from_dict (cls, data, path = None):
+    from ..rspec import pgad  # pylint: disable=import-outside-toplevel
+    catalog = cls(path)
+    if data.get("version") != FORMAT_VERSION:
+      return catalog
+    for info in data.get("images", []):
+      image = pgad.Image()
+      (image.name, image.os, image.version, image.description, image.url) = (info["name"], info.get("os"),
+                                                                             info.get("version"),
+                                                                             info.get("description"),
+                                                                             info.get("url"))
+      key = (image.name, image.version)
+      catalog.intern(image)
+      for (agg, htypes) in info.get("support", {}).items():
+        for htype in htypes:
+          catalog._record(agg, key, htype)
+    return catalog
+
+  def save (self, path = None):
+    """Write the catalog as JSON to `path` (default: the catalog path)."""
+    path = path or self.path
+    data = json.dumps(self.to_dict()).encode("utf-8")
+    tmppath = "%s.%d.%d" % (path, os.getpid(), threading.get_ident())
+    with open(tmppath, "wb") as outfile:
+      outfile.write(data)
+    os.replace(tmppath, path)
+
+  def load (self, path = None):
+    """Replace the catalog contents with those saved at `path` (default: the catalog path).
+    A file written by an incompatible version leaves the catalog empty."""
+    path = path or self.path
+    with open(path, "r", encoding = "utf-8") as infile:
+      loaded = ImageCatalog.from_dict(json.load(infile))
+    with self._lock:
+      (self._images, self._by_name, self._support, self._by_hardware, self._aggregates) = (
+        loaded._images, loaded._by_name, loaded._support, loaded._by_hardware, loaded._aggregates)
@@ -0,0 +1,270 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Columnar node tables for analysing advertisements in bulk.
+
+A :py:class:`NodeTable` holds one NumPy array per node attribute (availability,
+exclusivity, CPU, RAM, hardware and sliver types, location), so that capacity and
+placement questions across many advertisements become vectorized operations::
+
+  table = NodeTable.concat([ad.to_table() for ad in ads])
+  hits = table.filter(available = True, sliver_type = "raw-pc", min_ram = 64 * 1024,
+                      near = (40.76, -111.85, 500))
+  print(hits.component_ids)
+
+NumPy is an optional dependency and is only imported when a table is built.
+"""
+
+from __future__ import absolute_import
+
+import math
+
+EARTH_RADIUS_KM = 6371.0
+
+
+def _np ():
+  import numpy
+  return numpy
+
+
+def _names (value):
+  if isinstance(value, str):
+    return [value]
+  return list(value)
+
+
+class NodeTable(object):
+  """Column-oriented view of the nodes of one or more advertisements.
+
+  Hardware and sliver types are stored as boolean membership matrices with one column
+  per distinct type name (see `hardware_types` and `sliver_types` for the column order).
+  Missing values are `0` for `cpu` and `ram` and `NaN` for `latitude` and `longitude`.
+
+  Attributes:
+    component_id (numpy.ndarray): Component ID URNs (object array)
+    manager (numpy.ndarray): Index into `managers` for each node
+    managers (list): Component manager URNs
+    available (numpy.ndarray): `bool` column
+    exclusive (numpy.ndarray): `bool` column
+    shared (numpy.ndarray): `bool` column
+    cpu (numpy.ndarray): Per-core CPU speed in MHz (`int64`)
+    ram (numpy.ndarray): RAM in megabytes (`int64`)
+    latitude (numpy.ndarray): `float64` column
+    longitude (numpy.ndarray): `float64` column
+    hardware_types (list): Hardware type names, in column order of `hardware`
+    hardware (numpy.ndarray): `(nodes, len(hardware_types))` boolean matrix
+    sliver_types (list): Sliver type names, in column order of `slivers`
+    slivers (numpy.ndarray): `(nodes, len(sliver_types))` boolean matrix
+  """
+
+  COLUMNS = ("component_id", "manager", "available", "exclusive", "shared", "cpu", "ram",
+             "latitude", "longitude", "hardware", "slivers")
+
+  def __init__ (self, columns, managers, hardware_types, sliver_types):
+    for name in NodeTable.COLUMNS:
+      setattr(self, name, columns[name])
+    self.managers = list(managers)
+    self.hardware_types = list(hardware_types)
+    self.sliver_types = list(sliver_types)
+
+  @classmethod
+  def from_nodes (cls, nodes):
+    """Build a table from an iterable of :py:class:`geni.rspec.pgad.AdNode` objects."""
+    np = _np()
+
+    nodes = list(nodes)
+    count = len(nodes)
+    (managers, hwtypes, stypes) = ({}, {}, {})
+    hw_pairs = []
+    st_pairs = []
+
+    cid = np.empty(count, dtype = object)
+    manager = np.empty(count, dtype = np.int32)
+    available = np.zeros(count, dtype = bool)
+    exclusive = np.zeros(count, dtype = bool)
+    shared = np.zeros(count, dtype = bool)
+    cpu = np.zeros(count, dtype = np.int64)
+    ram = np.zeros(count, dtype = np.int64)
+    lat = np.full(count, np.nan)
+    lon = np.full(count, np.nan)
+
+    for (idx, node) in enumerate(nodes):
+      cid[idx] = node.component_id
+      manager[idx] = managers.setdefault(node.component_manager_id, len(managers))
+      available[idx] = node.available
+      exclusive[idx] = node.exclusive
+      shared[idx] = node.shared
+      if node.cpu is not None:
+        cpu[idx] = node.cpu
+      if node.ram is not None:
+        ram[idx] = node.ram
+      if node.location is not None:
+        if node.location.latitude is not None:
+          lat[idx] = node.location.latitude
+        if node.location.longitude is not None:
+          lon[idx] = node.location.longitude
+      for name in node.hardware_types:
+        hw_pairs.append((idx, hwtypes.setdefault(name, len(hwtypes))))
+      for name in node.sliver_types:
+        st_pairs.append((idx, stypes.setdefault(name, len(stypes))))
+
+    columns = {"component_id" : cid, "manager" : manager, "available" : available, "exclusive" : exclusive,
+               "shared" : shared, "cpu" : cpu, "ram" : ram, "latitude" : lat, "longitude" : lon,
+               "hardware" : _membership(np, count, len(hwtypes), hw_pairs),
+               "slivers" : _membership(np, count, len(stypes), st_pairs)}
+    return cls(columns, managers, hwtypes, stypes)
+
+  @classmethod
+  def from_advertisement (cls, ad):
+    """Build a table from a :py:class:`geni.rspec.pgad.Advertisement`."""
+    return cls.from_nodes(ad.nodes)
+
+  @classmethod
+  def concat (cls, tables):
+    """Concatenate several tables (typically one per aggregate) into one, merging the
+    manager, hardware type and sliver type vocabularies."""
+    np = _np()
+
+    tables = list(tables)
+    managers = _union([t.managers for t in tables])
+    hwtypes = _union([t.hardware_types for t in tables])
+    stypes = _union([t.sliver_types for t in tables])
+
+    columns = {}
+    for name in ("component_id", "available", "exclusive", "shared", "cpu", "ram", "latitude", "longitude"):
+      columns[name] = np.concatenate([getattr(t, name) for t in tables]) if tables else np.empty(0)
+
+    mgr = []
+    hw = []
+    st = []
+    for table in tables:
+      mgr.append(np.asarray([managers[m] for m in table.managers], dtype = np.int32)[table.manager]
+                 if len(table) else np.empty(0, dtype = np.int32))
+      hw.append(_widen(np, table.hardware, [hwtypes[h] for h in table.hardware_types], len(hwtypes)))
+      st.append(_widen(np, table.slivers, [stypes[s] for s in table.sliver_types], len(stypes)))
+    columns["manager"] = np.concatenate(mgr) if mgr else np.empty(0, dtype = np.int32)
+    columns["hardware"] = np.concatenate(hw) if hw else np.zeros((0, len(hwtypes)), dtype = bool)
+    columns["slivers"] = np.concatenate(st) if st else np.zeros((0, len(stypes)), dtype = bool)
+    return cls(columns, managers, hwtypes, stypes)
+
+  def __len__ (self):
+    return len(self.component_id)
+
+  @property
+  def component_ids (self):
+    """Component ID URNs of all rows, as a list."""
+    return self.component_id.tolist()
+
+  def manager_ids (self):
+    """Component manager URN of every row, as a list."""
+    return [self.managers[idx] for idx in self.manager.tolist()]
+
+  def has_hardware_type (self, names):
+    """Boolean mask of rows advertising any of the given hardware type name(s)."""
+    return _any_column(_np(), self.hardware, self.hardware_types, names)
+
+  def has_sliver_type (self, names):
+    """Boolean mask of rows supporting any of the given sliver type name(s)."""
+    return _any_column(_np(), self.slivers, self.sliver_types, names)
+
+  def distance_km (self, lat, lon):
+    """Great-circle distance in kilometers from `(lat, lon)` to every row (`NaN` where the
+    location is unknown)."""
+    np = _np()
+    (p1, p2) = (math.radians(lat), np.radians(self.latitude))
+    dl = np.radians(self.longitude - lon)
+    a = np.sin((p2 - p1) / 2) ** 2 + math.cos(p1) * np.cos(p2) * np.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+  def within (self, lat, lon, radius_km):
+    """Boolean mask of rows within `radius_km` of `(lat, lon)`."""
+    dist = self.distance_km(lat, lon)
+    # NaN compares false, so rows without a location never match
+    return dist <= radius_km
+
+  def mask (self, available = None, exclusive = None, shared = None, hardware_type = None, sliver_type = None,
+            min_cpu = None, min_ram = None, near = None):
+    """Boolean mask of rows matching every given filter.
+
+    Args:
+      available (bool): Node availability
+      exclusive (bool): Whether the node can be reserved exclusively
+      shared (bool): Whether the node is currently in use as a shared host
+      hardware_type: Hardware type name, or an iterable of names (any of them matches)
+      sliver_type: Sliver type name, or an iterable of names
+      min_cpu (int): Minimum per-core CPU speed in MHz
+      min_ram (int): Minimum RAM in megabytes
+      near (tuple): `(latitude, longitude, radius_km)`
+    """
+    np = _np()
+    out = np.ones(len(self), dtype = bool)
+    if available is not None:
+      out &= (self.available == bool(available))
+    if exclusive is not None:
+      out &= (self.exclusive == bool(exclusive))
+    if shared is not None:
+      out &= (self.shared == bool(shared))
+    if hardware_type is not None:
+      out &= self.has_hardware_type(hardware_type)
+    if sliver_type is not None:
+      out &= self.has_sliver_type(sliver_type)
+    if min_cpu is not None:
+      out &= (self.cpu >= min_cpu)
+    if min_ram is not None:
+      out &= (self.ram >= min_ram)
+    if near is not None:
+      out &= self.within(*near)
+    return out
+
+  def select (self, mask):
+    """Return a new table with only the rows selected by `mask` (a boolean mask or index array)."""
+    columns = {name : getattr(self, name)[mask] for name in NodeTable.COLUMNS}
+    return NodeTable(columns, self.managers, self.hardware_types, self.sliver_types)
+
+  def filter (self, **kwargs):
+    """Return a new table with the rows matching :py:meth:`mask` called with the same arguments."""
+    return self.select(self.mask(**kwargs))
+
+  def count_by_hardware_type (self, mask = None):
+    """Return a mapping of `{ hardware_type : row_count }`, optionally restricted to `mask`."""
+    hw = self.hardware if mask is None else self.hardware[mask]
+    return dict(zip(self.hardware_types, hw.sum(axis = 0).tolist()))
+
+
+def _membership (np, rows, cols, pairs):
+  out = np.zeros((rows, cols), dtype = bool)
+  if pairs:
+    idx = np.asarray(pairs, dtype = np.int64)
+    out[idx[:, 0], idx[:, 1]] = True
+  return out
+
+
+def _union (vocabs):
+  out = {}
+  for vocab in vocabs:
+    for name in vocab:
+      out.setdefault(name, len(out))
+  return out
+
+
+def _widen (np, matrix, colmap, width):
+  out = np.zeros((matrix.shape[0], width), dtype = bool)
+  if colmap:
+    out[:, colmap] = matrix
+  return out
+
+
+def _any_column (np, matrix, vocab, names):
+  cols = [vocab.index(name) for name in _names(names) if name in vocab]
+  if not cols:
+    return np.zeros(matrix.shape[0], dtype = bool)
+  return matrix[:, cols].any(axis = 1)
+
+
+def concat (tables):
+  """Concatenate several :py:class:`NodeTable` objects.  See :py:meth:`NodeTable.concat`."""
+  return NodeTable.concat(tables)
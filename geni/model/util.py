@@ -15,3 +15,37 @@ class XPathXRange(object):
     return len(self._data)
   def __getitem__ (self, idx):
     return self._klass._fromdom(self._data[idx])
+
+
+def lazy_slots (*names):
+  """Return the `__slots__` entries needed by the :py:class:`LazyAttribute` descriptors named in `names`."""
+  return tuple("_lazy_%s" % (name) for name in names)
+
+
+class LazyAttribute(object):
+  """Descriptor for `__slots__` classes that computes an attribute on first access and caches it.
+
+  The decorated method is called once per instance and its result is stored in the
+  `_lazy_<name>` slot (see :py:func:`lazy_slots`).  Assigning to the attribute replaces
+  the cached value without calling the method."""
+
+  def __init__ (self, func):
+    self._func = func
+    self._member = None
+    self.__doc__ = func.__doc__
+
+  def __set_name__ (self, owner, name):
+    self._member = owner.__dict__["_lazy_%s" % (name)]
+
+  def __get__ (self, obj, objtype = None):
+    if obj is None:
+      return self
+    try:
+      return self._member.__get__(obj, objtype)
+    except AttributeError:
+      value = self._func(obj)
+      self._member.__set__(obj, value)
+      return value
+
+  def __set__ (self, obj, value):
+    self._member.__set__(obj, value)
@@ -34,6 +34,11 @@ class RSpec:
         rspec = self.get_dom()
         return ET.tostring(rspec, pretty_print=pretty_print).decode()
 
+    def iter_xml (self, pretty_print = False):
+        """Generate the XML for this rspec as a sequence of string chunks whose concatenation
+        is identical to :py:meth:`to_xml_string`."""
+        yield self.to_xml_string(pretty_print = pretty_print)
+
     def get_dom(self):
         rspec = ET.Element("rspec", nsmap=self._ns_map)
         rspec.attrib["{%s}schemaLocation" % (GNS.XSNS.name)] = " ".join(self._loclist)
@@ -95,6 +95,7 @@ class setForceShaping:
     system.
     """
     __ONCEONLY__ = True
+    __slots__ = ("_enabled", "__dict__")
 
     def __init__(self):
         self._enabled = True
@@ -114,6 +115,7 @@ class setNoBandwidthShaping:
     is ignored if the link must be shaped for other reason (delay, loss).
     """
     __ONCEONLY__ = True
+    __slots__ = ("_enabled", "__dict__")
 
     def __init__(self):
         self._enabled = True
@@ -135,6 +137,7 @@ class setNoInterSwitchLinks:
     topology be attached to the same switch(es).
     """
     __ONCEONLY__ = True
+    __slots__ = ("_enabled", "__dict__")
 
     def __init__(self):
         self._enabled = True
@@ -153,6 +156,7 @@ class setJumboFrames:
     on the link (9000 byte MTU). Not all clusters support this option.
     """
     __ONCEONLY__ = True
+    __slots__ = ("_enabled", "__dict__")
 
     def __init__(self):
         self._enabled = True
@@ -171,6 +175,7 @@ class createSharedVlan:
     vlan that can be shared between independent experiments. 
     """
     __ONCEONLY__ = True
+    __slots__ = ("_enabled", "_name", "__dict__")
 
     def __init__(self, name):
         self._enabled = True
@@ -198,6 +203,7 @@ class setProperties:
 
     """
     __ONCEONLY__ = True
+    __slots__ = ("_bandwidth", "_latency", "_plr", "__dict__")
 
     def __init__(self, bandwidth=None, latency=None, plr=None):
         self._bandwidth = bandwidth
@@ -226,6 +232,7 @@ class setUseTypeDefaultImage:
     run a special image.
     """
     __ONCEONLY__ = True
+    __slots__ = ("_enabled", "__dict__")
 
     def __init__(self):
         self._enabled = True
@@ -245,6 +252,7 @@ class setFailureAction:
     ignore errors booting this node when starting an experiment. This allows
     the experiment to proceed so that the user has time to debug."""
     __ONCEONLY__ = True
+    __slots__ = ("action", "_enabled", "__dict__")
 
     def __init__(self, action):
         self.action = action
@@ -269,6 +277,8 @@ class ProgramAgent(Service):
     command when the experiment starts (time=0 in event speak). This is
     different than the Execute service, which runs every time the node boots.
     """
+    __slots__ = ("name", "command", "directory", "onexpstart")
+
     def __init__ (self, name, command, directory = None, onexpstart = False):
         super(ProgramAgent, self).__init__()
         self.name = name
@@ -303,6 +313,7 @@ class InstantiateOn:
                 return "%s is not a Raw PC" % (self.parent.name)
 
     __ONCEONLY__ = True
+    __slots__ = ("_parent", "__dict__")
 
     def __init__(self, parent):
         if isinstance(parent, Node):
@@ -465,6 +476,7 @@ class installRootKeys:
             # Install just the public key on node2
             node2.installRootKeys(False, True)
     """
+    __slots__ = ("_include", "_private", "_public", "__dict__")
 
     def __init__(self, private = True, public = True):
         self._include = True
@@ -523,6 +535,8 @@ Request.EXTENSIONS.append(("skipVlans", skipVlans))
 class Attribute:
     """Added to a node, this Emulab extension becomes a node_attribute.
     """
+    __slots__ = ("key", "value", "__dict__")
+
     def __init__ (self, key, value):
         self.key = key
         self.value = value
@@ -539,6 +553,8 @@ Node.EXTENSIONS.append(("Attribute", Attribute))
 class wirelessSite:
     """A simple extension to mark a node as being part of a given wireless aggregate.
     """
+    __slots__ = ("id", "type", "urn", "__dict__")
+
     def __init__(self, id, type, urn):
         self.id = id
         self.type = type
@@ -559,6 +575,7 @@ class ExperimentFirewall(Node):
     to the control network. You may supply optional rules in iptables syntax.
     """
     __ONCEONLY__ = True
+    __slots__ = ("style", "rules")
 
     class Style:
         OPEN     = "open"
@@ -586,12 +603,16 @@ class ExperimentFirewall(Node):
 Request.EXTENSIONS.append(("ExperimentFirewall", ExperimentFirewall))
 
 class L1Link(Link):
+    __slots__ = ()
+
     def __init__ (self, name = None):
         super().__init__(name, "layer1")
 
 Request.EXTENSIONS.append(("L1Link", L1Link))
 
 class Switch(Node):
+    __slots__ = ()
+
     def __init__ (self, name, component_id = None):
         super().__init__(name, NodeType.RAW_PC.value,
                     component_id = component_id, exclusive = True)
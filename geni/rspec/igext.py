@@ -27,6 +27,7 @@ Add to link objects using the Link.addChild() method.
     This will have no effect if a trivial link is created by the aggregate.
     You need to make sure that a VLAN will be provisioned (typically by making sure
     that at least two interfaces on the link are on different physical hosts)."""
+    __slots__ = ("host", "port", "__dict__")
 
     def __init__ (self, host, port=6633):
         self.host = host
@@ -52,6 +53,8 @@ class XenVM(Node):
         disk (int): Amount of disk space in gigabytes
         xen_ptype (str): Physical node type on which to instantiate the VM. Types are AM-specific.
     """
+    __slots__ = ("cores", "ram", "disk", "xen_ptype")
+
     def __init__ (self, client_id, component_id = None, exclusive = False):
         super().__init__(client_id, "emulab-xen", component_id = component_id, exclusive = exclusive)
         self.cores = None
@@ -102,6 +105,11 @@ class DockerContainer(Node):
         docker_env (str): either a newline-separated list of variable assignments, or one or more variable assignments on a single line.    If the former, we do not support escaped newlines, unlike the Docker ENV instruction.
         docker_privileged (bool): if True, this container should be privileged; defaults to False (unprivileged).
     """
+    __slots__ = ("cores", "ram", "docker_ptype", "docker_extimage", "docker_dockerfile",
+                 "docker_tbaugmentation", "docker_tbaugmentation_update", "docker_ssh_style",
+                 "docker_exec_shell", "docker_entrypoint", "docker_cmd", "docker_env",
+                 "docker_privileged")
+
     def __init__ (self, client_id, component_id = None, exclusive = False):
         super().__init__(client_id, "emulab-docker", component_id = component_id, exclusive = exclusive)
         self.cores = None
@@ -197,6 +205,9 @@ pg.Request.EXTENSIONS.append(("AddressPool", AddressPool))
 
 
 class Blockstore:
+    __slots__ = ("name", "mount", "_size", "where", "readonly", "placement", "dataset", "rwclone",
+                 "__dict__")
+
     def __init__ (self, name, mount = None):
         """Creates a BlockStore object with the given name (arbitrary) and mountpoint."""
         self.name = name
@@ -244,6 +255,8 @@ pg.Node.EXTENSIONS.append(("Blockstore", Blockstore))
 
 
 class RemoteBlockstore(pg.Node):
+    __slots__ = ("_bs", "_interface")
+
     def __init__ (self, name, mount = None, ifacename = "if0"):
         super(RemoteBlockstore, self).__init__(name, "emulab-blockstore")
         bs = Blockstore(self.name, mount)
@@ -254,6 +267,9 @@ class RemoteBlockstore(pg.Node):
     def _write (self, element):
         return self._bs._write(super(RemoteBlockstore, self)._write(element));
 
+    def _fragment_deps (self):
+        return super(RemoteBlockstore, self)._fragment_deps() + [self._bs]
+
     @property
     def interface (self):
         return self._interface
@@ -309,7 +325,11 @@ class RemoteBlockstore(pg.Node):
 pg.Request.EXTENSIONS.append(("RemoteBlockstore", RemoteBlockstore))
 
 class Bridge(pg.Node):
+    __slots__ = ("iface0", "pipe0", "iface1", "pipe1")
+
     class Pipe:
+        __slots__ = ("bandwidth", "latency", "lossrate", "__dict__")
+
         def __init__ (self):
             self.bandwidth = 0
             self.latency     = 0
@@ -342,6 +362,9 @@ class Bridge(pg.Node):
         pipe1.attrib["lossrate"]    = str(self.pipe1.lossrate)
         return nd;
 
+    def _fragment_deps (self):
+        return super(Bridge, self)._fragment_deps() + [self.pipe0, self.pipe1]
+
     # pipe0 goes with iface0, and pipe1 goes with iface1
     def getPipe (self, interface):
         if self.iface0.name is interface: 
@@ -361,6 +384,8 @@ class Firewall:
         INCOMING = "incoming"
         OUTGOING = "outgoing"
 
+    __slots__ = ("style", "exceptions", "__dict__")
+
     def __init__ (self, style):
         self.style = style
         self.exceptions = []
@@ -525,6 +550,8 @@ pg.Request.EXTENSIONS.append(("ParameterData", ParameterData))
 
 
 class Site:
+    __slots__ = ("id", "__dict__")
+
     def __init__ (self, id):
         self.id = id
 
@@ -538,6 +565,8 @@ pg.Link.EXTENSIONS.append(("Site", Site))
 
 
 class Desire:
+    __slots__ = ("name", "weight", "__dict__")
+
     def __init__ (self, name, weight):
         self.name = name
         self.weight = weight
@@ -9,11 +9,9 @@ from __future__ import absolute_import
 from lxml import etree as ET
 import six
 
-from .. import namespaces as GNS
-from .pg import Namespaces as PGNS
 from . import stitching
+from . import xpath
 
-_XPNS = {'g' : GNS.REQUEST.name, 'e' : PGNS.EMULAB.name, 't' : stitching.STITCHNS.name}
 
 class Advertisement(object):
   def __init__ (self, path = None, xml = None):
@@ -29,7 +27,7 @@ class Advertisement(object):
   def stitchinfo (self):
     """Reference to the stitching info in the manifest, if present."""
     try:
-      elem = self._root.xpath('/g:rspec/t:stitching', namespaces=_XPNS)[0]
+      elem = xpath.PG_STITCHING(self._root)[0]
       return stitching.AdInfo(elem)
     except IndexError:
       return None
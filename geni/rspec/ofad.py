@@ -9,11 +9,10 @@ import six
 
 import geni.namespaces as GNS
 from .pgad import Location
+from . import xpath
 
 TOPO = GNS.Namespace("topo", "http://geni.bssoftworks.com/rspec/ext/topo/1")
 
-XPNS = {'g' : GNS.REQUEST.name, 'o' : GNS.OFv3.name, 't' : TOPO.name}
-
 class Attachment(object):
     def __init__ (self):
         self.description = None
@@ -47,7 +46,7 @@ class Port(object):
         p = Port()
         p.name = elem.get("name")
         p.number = elem.get("number")
-        for ofa in elem.xpath('t:geni-of', namespaces = XPNS):
+        for ofa in xpath.OF_GENI_OF(elem):
             p.topo.append(OFAttachment._fromdom(ofa))
         return p
 
@@ -65,11 +64,11 @@ class Datapath(object):
         d.dpid = elem.get("dpid")
         d.component_id = elem.get("component_id")
 
-        ports = elem.xpath('o:port', namespaces = XPNS)
+        ports = xpath.OF_PORT(elem)
         for pelem in ports:
             d.ports.append(Port._fromdom(pelem))
 
-        lelem = elem.xpath('o:location', namespaces = XPNS)
+        lelem = xpath.OF_LOCATION(elem)
         if lelem:
             d.location = Location._fromdom(lelem[0])
 
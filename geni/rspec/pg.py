@@ -6,9 +6,10 @@
 
 # pylint: disable=too-many-instance-attributes,c-extension-no-member
 
-import itertools
+import re
 import sys
 import functools
+import weakref
 from enum import Enum
 
 from lxml import etree as ET
@@ -31,10 +32,222 @@ class DuplicateExtensionError(Exception):
     def __str__(self):
         return "Extension (%s) can only be added to a parent object once" % self.klass.__name__
 
+# This exception gets thrown if a node, link or interface is added to a request
+# that already holds a different object with the same client_id
+class DuplicateClientIdError(Exception):
+    def __init__(self, client_id):
+        super().__init__()
+        self.client_id = client_id
+
+    def __str__(self):
+        return "Duplicate client_id (%s) in request" % self.client_id
+
+# Number of live requests with `cache_fragments` set.  While there are none, attribute
+# assignments skip looking for a fragment cache to report to.
+_CACHING_REQUESTS = 0
+
+def _caching_stopped():
+    global _CACHING_REQUESTS  # pylint: disable=global-statement
+    _CACHING_REQUESTS -= 1
+
+class _Tracked:
+    """Base for request objects whose changes invalidate cached XML fragments
+    (see `Request.cache_fragments`).
+
+    Changes are reported to the fragment cache of the request the object belongs to,
+    found through `_owner` (the node, link or interface the object was added to)."""
+    __slots__ = ("_owner",)
+
+    def __setattr__(self, name, value):
+        object.__setattr__(self, name, value)
+        if _CACHING_REQUESTS:
+            cache = self._cache()
+            if cache is not None:
+                cache.changed[id(self)] = self
+
+    def _cache(self):
+        # The fragment cache of the request this object belongs to, if it has one
+        try:
+            owner = self._owner
+        except AttributeError:
+            return None
+        return None if owner is None else owner._cache()
+
+    def _list(self, slot):
+        # Child containers are only allocated once something is added to them
+        value = getattr(self, slot)
+        if value is None:
+            value = []
+            setattr(self, slot, value)
+        return value
+
+    def mark_dirty(self):
+        """Force this object to be re-rendered by the next serialization of a request with
+        fragment caching enabled.  Only needed after changes that are not plain attribute
+        assignments or library method calls, such as editing a list attribute or a nested
+        extension object in place."""
+        cache = self._cache()
+        if cache is not None:
+            cache.changed[id(self)] = self
+
+    def _fragment_deps(self):
+        return [self]
+
+
+def _freeze(value):
+    if isinstance(value, list):
+        return tuple(value)
+    if isinstance(value, dict):
+        return tuple(value.items())
+    if isinstance(value, set):
+        return frozenset(value)
+    return value
+
+
+# Slot names of each class, including inherited ones
+_SLOT_NAMES = {}
+
+def _slot_names(cls):
+    try:
+        return _SLOT_NAMES[cls]
+    except KeyError:
+        names = []
+        for klass in cls.__mro__:
+            slots = klass.__dict__.get("__slots__", ())
+            if isinstance(slots, str):
+                slots = (slots,)
+            names.extend([name for name in slots if name not in ("__dict__", "__weakref__")])
+        names = _SLOT_NAMES[cls] = tuple(names)
+        return names
+
+
+_UNSET = object()
+
+def _snapshot(obj):
+    names = _slot_names(type(obj))
+    attrs = getattr(obj, "__dict__", None)
+    if attrs is None and not names:
+        # Raw lxml elements can't be compared, and are never considered unchanged
+        return object()
+    items = [(name, getattr(obj, name, _UNSET)) for name in names]
+    if attrs:
+        items.extend(attrs.items())
+    return (type(obj), tuple([(key, _freeze(val)) for (key, val) in items]))
+
+
+_PROBE_NS = "urn:geni-lib:prefix-probe"
+
+def _next_prefix(root):
+    # Number of the next ns0, ns1, ... prefix lxml will make up for an undeclared namespace
+    # in root's document.  Finding it out uses the number up, so only probe scratch documents.
+    return int(ET.SubElement(root, "{%s}probe" % (_PROBE_NS)).prefix[2:])
+
+def _skip_prefixes(root, count):
+    # Use up `count` prefix numbers in root's (childless) document
+    for _ in range(count):
+        ET.SubElement(root, "{%s}skip" % (_PROBE_NS))
+    del root[:]
+
+
+class _Fragment:
+    __slots__ = ("obj", "pretty_print", "chunk", "counter", "prefixes", "tracked", "untracked",
+                 "snapshots")
+
+    def __init__(self, obj, pretty_print, chunk, counter, prefixes, deps):
+        self.obj = obj
+        self.pretty_print = pretty_print
+        self.chunk = chunk
+        self.counter = counter
+        self.prefixes = prefixes
+        self.tracked = [dep for dep in deps if isinstance(dep, _Tracked)]
+        self.untracked = [dep for dep in deps if not isinstance(dep, _Tracked)]
+        self.snapshots = [_snapshot(dep) for dep in self.untracked]
+
+
+class _FragmentCache:
+    """Rendered XML of the top-level objects of a request.
+
+    Tracked objects report their own changes (see `_Tracked`), so finding what needs to be
+    re-rendered costs time proportional to the number of changes.  Untracked dependencies
+    (extension objects) are compared against a snapshot of their attributes.
+
+    lxml numbers the prefixes it makes up for undeclared namespaces (ns0, ns1, ...) across
+    the whole document, so a fragment that uses such prefixes is only reused at the same
+    point of the numbering, and reusing it moves the numbering on as rendering it would."""
+
+    def __init__(self):
+        self.head = None    # Serialized <rspec> start tag the fragments were rendered under
+        self.changed = {}   # id -> tracked object changed since the last render
+        self.entries = {}   # id(top-level object) -> _Fragment
+        self.owners = {}    # id(tracked dependency) -> set(id(top-level object))
+
+    def take_dirty(self):
+        (changed, self.changed) = (self.changed, {})
+        dirty = set()
+        for key in changed:
+            dirty.update(self.owners.get(key, ()))
+        return dirty
+
+    def lookup(self, obj, pretty_print, dirty, counter):
+        key = id(obj)
+        entry = self.entries.get(key)
+        if entry is None or key in dirty or entry.pretty_print != pretty_print:
+            return None
+        if entry.prefixes and entry.counter != counter:
+            return None
+        if entry.untracked and [_snapshot(dep) for dep in entry.untracked] != entry.snapshots:
+            return None
+        return entry
+
+    def store(self, obj, pretty_print, chunk, counter, prefixes):
+        key = id(obj)
+        self.forget(key)
+        entry = self.entries[key] = _Fragment(obj, pretty_print, chunk, counter, prefixes,
+                                              obj._fragment_deps())
+        for dep in entry.tracked:
+            self.owners.setdefault(id(dep), set()).add(key)
+
+    def forget(self, key):
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return
+        for dep in entry.tracked:
+            owners = self.owners.get(id(dep))
+            if owners is not None:
+                owners.discard(key)
+                if not owners:
+                    del self.owners[id(dep)]
+
+    def prune(self, keep):
+        for key in [key for key in self.entries if key not in keep]:
+            self.forget(key)
+
+    def clear(self):
+        self.entries.clear()
+        self.owners.clear()
+
+def _client_id_items(obj):
+    # An object and its interfaces, the things a request indexes by client_id
+    if isinstance(obj, (Node, Link)):
+        interfaces = obj._interfaces
+    else:
+        interfaces = getattr(obj, "interfaces", None)
+    items = [obj] + list(interfaces or [])
+    return [item for item in items if getattr(item, "client_id", None) is not None]
+
 ################################################
 # Base Request - Must be at top for EXTENSIONS #
 ################################################
 class Request(geni.rspec.RSpec):
+    """A request RSpec.
+
+    Attributes:
+        cache_fragments (bool): Keep the XML rendered for each resource and reuse it in later
+            serializations until the resource changes.  Useful when a large request is edited
+            and re-rendered repeatedly.  Changes the library can't see (in-place edits of list
+            attributes, nested objects or raw elements) need a call to the resource's
+            `mark_dirty()`.
+    """
     EXTENSIONS = []
 
     def __init__(self):
@@ -42,6 +255,8 @@ class Request(geni.rspec.RSpec):
         self._resources = []
         self.tour = None
         self._raw_elements = []
+        self._fragment_cache = None
+        self._client_ids = {}
 
         self.add_namespace(GNS.REQUEST, None)
         self.add_namespace(Namespaces.CLIENT)
@@ -59,15 +274,50 @@ class Request(geni.rspec.RSpec):
             instance = klass(*args, **kw)
             if getattr(klass, "__WANTPARENT__", False):
                 instance._parent = self
+            self._register(instance)
             self._ext_children.append(instance)
             return instance
         setattr(self, name, wrap)
 
     def add_resource(self, rsrc):
-        for nspace in rsrc.namespaces:
+        self._register(rsrc)
+        nspaces = rsrc._namespaces if isinstance(rsrc, Resource) else rsrc.namespaces
+        for nspace in nspaces or ():
             self.add_namespace(nspace)
         self._resources.append(rsrc)
 
+    def _register(self, obj):
+        # Index a resource and its interfaces by client_id, checking for duplicates
+        # before anything is added
+        new = {}
+        for item in _client_id_items(obj):
+            client_id = item.client_id
+            current = new.get(client_id) or self._client_ids.get(client_id)
+            if current is not None and current is not item and current.client_id == client_id:
+                raise DuplicateClientIdError(client_id)
+            new[client_id] = item
+        self._client_ids.update(new)
+        if isinstance(obj, Resource):
+            obj._request = self
+
+    def get(self, client_id, default=None):
+        """Return the node, link, interface or other resource with the given `client_id`,
+        or `default` if the request has none."""
+        obj = self._client_ids.get(client_id)
+        if obj is not None and obj.client_id != client_id:
+            # Renamed since it was added
+            self.reindex()
+            obj = self._client_ids.get(client_id)
+        return default if obj is None else obj
+
+    def reindex(self):
+        """Rebuild the client_id index, picking up client_ids changed after their objects
+        were added to the request."""
+        self._client_ids = {}
+        for obj in self._resources + self._ext_children:
+            for item in _client_id_items(obj):
+                self._client_ids.setdefault(item.client_id, item)
+
     @property
     def resources(self):
         return self._resources + self._ext_children
@@ -87,18 +337,152 @@ class Request(geni.rspec.RSpec):
         """Write the current request contents as an XML file that represents an rspec
         in the GENIv3 format."""
 
-        buf = self.to_xml_string(pretty_print=True)
-
         if path is None:
-            sys.stdout.write(buf)
+            for chunk in self.iter_xml(pretty_print=True):
+                sys.stdout.write(chunk)
         else:
             with open(path, "w+", encoding='utf-8') as outfile:
-                outfile.write(buf)
+                for chunk in self.iter_xml(pretty_print=True):
+                    outfile.write(chunk)
+
+    @property
+    def cache_fragments(self):
+        return self._fragment_cache is not None
+
+    @cache_fragments.setter
+    def cache_fragments(self, value):
+        global _CACHING_REQUESTS  # pylint: disable=global-statement
+        if value and self._fragment_cache is None:
+            self._fragment_cache = _FragmentCache()
+            _CACHING_REQUESTS += 1
+            self._caching_finalizer = weakref.finalize(self, _caching_stopped)
+        elif not value and self._fragment_cache is not None:
+            self._fragment_cache = None
+            self._caching_finalizer()
+
+    def _cache(self):
+        return self._fragment_cache
+
+    def mark_dirty(self):
+        """Drop every cached fragment (see `cache_fragments`)."""
+        if self._fragment_cache is not None:
+            self._fragment_cache.clear()
+
+    def _top_level_writers(self):
+        if self.tour:
+            yield (None, self.tour._write)
+        for resource in self._resources:
+            yield (resource, resource._write)
+        for obj in self._ext_children:
+            yield (obj, obj._write)
+        for elem in self._raw_elements:
+            yield (None, functools.partial(_append_raw, elem))
+
+    def iter_xml(self, pretty_print=False):
+        """Generate the request XML one top-level element at a time.
+
+        The concatenated chunks are identical to :py:meth:`to_xml_string`, but only one
+        resource subtree is held as a DOM at any time, so very large requests can be
+        written out without building (and copying) the whole document in memory.
+
+        If `cache_fragments` is set, the text rendered for each node, link and other
+        resource is kept, and reused until the resource, its interfaces, services or
+        extensions change, so re-serializing after an edit only renders what was edited."""
+
+        if pretty_print and any(elem.tail for elem in self._raw_elements):
+            # Tail text disables indentation for the whole document, which can't be
+            # reproduced one element at a time
+            yield self.to_xml_string(pretty_print=True)
+            return
+
+        rspec = self.get_dom()
+
+        # Everything up to the first child is the same for every chunk
+        marker = ET.SubElement(rspec, "marker")
+        head = ET.tostring(rspec).decode()
+        head = head[:head.index("<marker", 1)]
+        rspec.remove(marker)
+        close = "\n</rspec>\n" if pretty_print else "</rspec>"
+        sink = self.get_dom()
+
+        cache = self._fragment_cache
+        if cache is not None and re.search(r"xmlns:ns\d", head):
+            # Made-up prefixes could clash with the declared ones, which lxml resolves in
+            # ways that can't be followed from here
+            cache = None
+        if cache is not None:
+            if cache.head != head:
+                cache.clear()
+                cache.head = head
+            dirty = cache.take_dirty()
+            seen = set()
+            # Prefix numbering of the document, see _FragmentCache
+            base = _next_prefix(self.get_dom())
+            counter = base
+
+        started = False
+        for (obj, write) in self._top_level_writers():
+            if cache is None:
+                chunk = self._render(rspec, sink, write, head, close, pretty_print)
+            else:
+                entry = None
+                if isinstance(obj, _Tracked):
+                    seen.add(id(obj))
+                    entry = cache.lookup(obj, pretty_print, dirty, counter)
+                if entry is not None:
+                    (chunk, prefixes) = (entry.chunk, entry.prefixes)
+                    _skip_prefixes(rspec, prefixes)
+                else:
+                    chunk = self._render(rspec, sink, write, head, close, pretty_print)
+                    prefixes = self._prefixes_used(write, chunk, base)
+                    if isinstance(obj, _Tracked):
+                        cache.store(obj, pretty_print, chunk, counter, prefixes)
+                counter += prefixes
+
+            if chunk:
+                if not started:
+                    yield head
+                    started = True
+                yield chunk
+
+        if cache is not None:
+            cache.prune(seen)
+
+        if started:
+            yield close
+        else:
+            yield ET.tostring(rspec, pretty_print=pretty_print).decode()
+
+    def _prefixes_used(self, write, chunk, base):
+        # How many made-up prefixes a top-level write takes, found by repeating it in a
+        # scratch document.  Every one of them is declared in the output.
+        if "xmlns:ns" not in chunk:
+            return 0
+        scratch = self.get_dom()
+        write(scratch)
+        return _next_prefix(scratch) - base
+
+    @staticmethod
+    def _render(rspec, sink, write, head, close, pretty_print):
+        write(rspec)
+        if len(rspec) == 0:
+            return ""
+        data = ET.tostring(rspec, pretty_print=pretty_print).decode()
+        # Dropping a subtree that still holds elements referenced from Python (raw elements)
+        # declares the root namespaces on it again, using up made-up prefix numbers of its
+        # document.  Move it to another document first, so rspec's numbering stays the same
+        # as a single to_xml_string() document's.
+        sink.extend(list(rspec))
+        del sink[:]
+        return data[len(head):-len(close)]
 
     def to_xml_string(self, pretty_print=False):
         """Return the current request contents as an XML string that represents an rspec
         in the GENIv3 format."""
 
+        if self.cache_fragments:
+            return "".join(self.iter_xml(pretty_print=pretty_print))
+
         rspec = self.get_dom()
 
         if self.tour:
@@ -116,27 +500,102 @@ class Request(geni.rspec.RSpec):
         return ET.tostring(rspec, pretty_print=pretty_print).decode()
 
 
-class Resource:
+def _append_raw(elem, rspec):
+    rspec.append(elem)
+
+
+# class -> (lengths of its EXTENSIONS lists, { name : extension class })
+_EXTENSION_MAPS = {}
+
+def _extension_map(cls):
+    # The extensions available on instances of `cls`, from the EXTENSIONS lists of the
+    # class and its bases.  A subclass entry overrides a base class entry of the same name,
+    # and a later entry an earlier one.
+    lists = [klass.__dict__["EXTENSIONS"] for klass in reversed(cls.__mro__) if "EXTENSIONS" in klass.__dict__]
+    sizes = tuple([len(exts) for exts in lists])
+    cached = _EXTENSION_MAPS.get(cls)
+    if cached is not None and cached[0] == sizes:
+        return cached[1]
+    extmap = {}
+    for exts in lists:
+        extmap.update(exts)
+    _EXTENSION_MAPS[cls] = (sizes, extmap)
+    return extmap
+
+
+class _Extensible(_Tracked):
+    """Base for request objects that take extensions.
+
+    Each `(name, class)` entry in the `EXTENSIONS` list of the object's class (or a base
+    class) makes `obj.name(...)` create an instance of `class` and add it to the object.
+    The methods are looked up on use rather than stored on every object."""
+    __slots__ = ()
+
+    def __getattr__(self, name):
+        # Only reached for names that are not regular attributes (or unset slots)
+        klass = None if name.startswith("_") else _extension_map(type(self)).get(name)
+        if klass is None:
+            raise AttributeError("'%s' object has no attribute '%s'" % (type(self).__name__, name))
+
+        @functools.wraps(klass.__init__)
+        def wrap(*args, **kw):
+            return self._add_extension(klass, args, kw)
+        return wrap
+
+    def __dir__(self):
+        return sorted(set(super().__dir__()) | set(_extension_map(type(self))))
+
+    def _add_extension(self, klass, args, kw):
+        if getattr(klass, "__ONCEONLY__", False):
+            if any(map(lambda x: isinstance(x,klass),self._ext_children or ())):
+                raise DuplicateExtensionError(klass)
+        instance = klass(*args, **kw)
+        if getattr(klass, "__WANTPARENT__", False):
+            instance._parent = self
+        if isinstance(instance, _Tracked):
+            instance._owner = self
+        self._list("_ext_children").append(instance)
+        self.mark_dirty()
+        return instance
+
+
+class Resource(_Extensible):
+    # Attributes that aren't declared in the slots of a class still work, but are kept
+    # in a __dict__ that is only allocated when one is set.
+    __slots__ = ("_namespaces", "_ext_children", "_request", "__dict__")
+
     def __init__(self):
-        self.namespaces = []
-        self._ext_children = []
+        # The request this resource has been added to, if any
+        object.__setattr__(self, "_request", None)
+        object.__setattr__(self, "_owner", None)
+        self._namespaces = None
+        self._ext_children = None
+
+    def _cache(self):
+        try:
+            request = self._request
+        except AttributeError:
+            request = None
+        if request is not None:
+            return request._fragment_cache
+        return super()._cache()
+
+    @property
+    def namespaces(self):
+        return self._list("_namespaces")
+
+    @namespaces.setter
+    def namespaces(self, value):
+        self._namespaces = value
 
     def add_namespace(self, nspace):
         self.namespaces.append(nspace)
 
-    def _wrapext(self, name, klass):
-        @functools.wraps(klass.__init__)
-        def wrap(*args, **kw):
-            if getattr(klass, "__ONCEONLY__", False):
-                if any(map(lambda x: isinstance(x,klass),self._ext_children)):
-                    raise DuplicateExtensionError(klass)
-            instance = klass(*args, **kw)
-            self._ext_children.append(instance)
-            return instance
-        setattr(self, name, wrap)
+    def _fragment_deps(self):
+        return [self] + list(self._ext_children or ())
 
     def _write(self, element):
-        for obj in self._ext_children:
+        for obj in self._ext_children or ():
             obj._write(element)
         return element
 
@@ -160,12 +619,16 @@ class Command:
         return self.cmd % self.data
 
 
-class Service:
+class Service(_Tracked):
+    __slots__ = ("__dict__",)
+
     def __init__(self):
         pass
 
 
 class Install(Service):
+    __slots__ = ("url", "path")
+
     def __init__(self, url, path):
         super().__init__()
         self.url = url
@@ -179,6 +642,8 @@ class Install(Service):
 
 
 class Execute(Service):
+    __slots__ = ("shell", "_command")
+
     def __init__(self, shell, command):
         super().__init__()
         self.shell = shell
@@ -198,12 +663,16 @@ class Execute(Service):
         return exc
 
 
-class Address:
+class Address(_Tracked):
+    __slots__ = ("type", "__dict__")
+
     def __init__(self, atype):
         self.type = atype
 
 
 class IPv4Address(Address):
+    __slots__ = ("address", "netmask")
+
     def __init__(self, address, netmask):
         super().__init__("ipv4")
         self.address = address
@@ -217,8 +686,10 @@ class IPv4Address(Address):
         return ip
 
 
-class Interface:
+class Interface(_Extensible):
     EXTENSIONS = []
+    # bandwidth, latency and plr stay in __dict__: profiles set them through it
+    __slots__ = ("client_id", "node", "_addresses", "component_id", "_ext_children", "__dict__")
 
     class InvalidAddressTypeError(Exception):
         def __init__ (self, addr):
@@ -228,44 +699,42 @@ class Interface:
             return "Type (%s) is invalid for interface addresses." % (type(self.addr))
 
     def __init__(self, name, node, address = None):
+        object.__setattr__(self, "_owner", node)
         self.client_id = name
         self.node = node
-        self.addresses = []
+        self._addresses = None
         self.component_id = None
         self.bandwidth = None
         self.latency = None
         self.plr = None
-        self._ext_children = []
+        self._ext_children = None
 
         if address:
             self.add_address(address)
 
-        for iname, ext in Interface.EXTENSIONS:
-            self._wrapext(iname, ext)
-
-    def _wrapext(self, name, klass):
-        @functools.wraps(klass.__init__)
-        def wrap(*args, **kw):
-            if getattr(klass, "__ONCEONLY__", False):
-                if any(map(lambda x: isinstance(x,klass),self._ext_children)):
-                    raise DuplicateExtensionError(klass)
-            instance = klass(*args, **kw)
-            if getattr(klass, "__WANTPARENT__", False):
-                instance._parent = self
-            self._ext_children.append(instance)
-            return instance
-        setattr(self, name, wrap)
-
     @property
     def name(self):
         return self.client_id
 
+    @property
+    def addresses(self):
+        return self._list("_addresses")
+
+    @addresses.setter
+    def addresses(self, value):
+        self._addresses = value
+
     def add_address(self, address):
         if isinstance(address, Address):
+            address._owner = self
             self.addresses.append(address)
+            self.mark_dirty()
         else:
             raise Interface.InvalidAddressTypeError(address)
 
+    def _fragment_deps(self):
+        return [self] + list(self._addresses or ()) + list(self._ext_children or ())
+
     def _write(self, element):
         intf = ET.SubElement(element, "{%s}interface" % (GNS.REQUEST.name))
         intf.attrib["client_id"] = self.client_id
@@ -274,19 +743,34 @@ class Interface:
                 intf.attrib["component_id"] = str(self.component_id)
             else:
                 intf.attrib["component_id"] = self.component_id
-        for addr in self.addresses:
+        for addr in self._addresses or ():
             addr._write(intf)
-        for obj in self._ext_children:
+        for obj in self._ext_children or ():
             obj._write(intf)
         return intf
 
 
 class Link(Resource):
+    """A link between two or more interfaces.
+
+    Attributes:
+        compact_properties (bool): For shaped links with more than two members, emit one
+            `<property>` per member, from the member to the link and carrying that member's
+            shaping (the form :py:class:`LAN` uses), instead of one per ordered pair of
+            members.  This is O(n) elements instead of O(n^2).  Off by default, since it
+            changes the request text.
+    """
     EXTENSIONS = []
     LNKID = 0
     DEFAULT_BW = -1
     DEFAULT_LAT = 0
     DEFAULT_PLR = 0.0
+    # bandwidth, latency and plr stay in __dict__, as on Interface
+    __slots__ = ("_client_id", "_interfaces", "type", "shared_vlan", "_mac_learning", "_vlan_tagging",
+                 "_trivial_ok", "_link_multiplexing", "_best_effort", "_raw_elements",
+                 "_component_managers", "protocol")
+
+    compact_properties = False
 
     def __init__(self, name = None, ltype = "", members = None):
         super().__init__()
@@ -296,7 +780,7 @@ class Link(Resource):
         else:
             self._client_id = name
 
-        self.interfaces = []
+        self._interfaces = None
 
         if members is not None:
             for member in members:
@@ -312,9 +796,8 @@ class Link(Resource):
         self._trivial_ok = None
         self._link_multiplexing = False
         self._best_effort = False
-        self._ext_children = []
-        self._raw_elements = []
-        self._component_managers = []
+        self._raw_elements = None
+        self._component_managers = None
         self.protocol = None
 
         # If you try to set bandwidth higher than a gigabit, PG probably won't like you
@@ -322,24 +805,17 @@ class Link(Resource):
         self.latency = Link.DEFAULT_LAT
         self.plr = Link.DEFAULT_PLR
 
-        for iname,ext in Link.EXTENSIONS:
-            self._wrapext(iname,ext)
+    @property
+    def interfaces(self):
+        return self._list("_interfaces")
 
-    def _wrapext(self, name, klass):
-        @functools.wraps(klass.__init__)
-        def wrap(*args, **kw):
-            if getattr(klass, "__ONCEONLY__", False):
-                if any(map(lambda x: isinstance(x,klass),self._ext_children)):
-                    raise DuplicateExtensionError(klass)
-            instance = klass(*args, **kw)
-            if getattr(klass, "__WANTPARENT__", False):
-                instance._parent = self
-            self._ext_children.append(instance)
-            return instance
-        setattr(self, name, wrap)
+    @interfaces.setter
+    def interfaces(self, value):
+        self._interfaces = value
 
     def add_raw_element(self, elem):
-        self._raw_elements.append(elem)
+        self._list("_raw_elements").append(elem)
+        self.mark_dirty()
 
     @classmethod
     def new_link_id(cls):
@@ -347,18 +823,33 @@ class Link(Resource):
         return "link-%d" % (Link.LNKID)
 
     def add_child(self, obj):
-        self._ext_children.append(obj)
+        if isinstance(obj, _Tracked):
+            obj._owner = self
+        self._list("_ext_children").append(obj)
+        self.mark_dirty()
 
     def add_interface(self, intf):
+        if self._request is not None:
+            self._request._register(intf)
+        if getattr(intf, "_owner", None) is None:
+            # Not on a node
+            intf._owner = self
         self.interfaces.append(intf)
+        self.mark_dirty()
 
     def add_node(self, node):
         interface = node.add_interface()
-        self.interfaces.append(interface)
+        self.add_interface(interface)
         return interface
 
     def add_component_manager(self, component_manager):
-        self._component_managers.append(component_manager)
+        self._list("_component_managers").append(component_manager)
+        self.mark_dirty()
+
+    def _fragment_deps(self):
+        # Only the interface attributes are rendered, not their addresses
+        return ([self] + list(self._interfaces or ()) + list(self._ext_children or ())
+                + list(self._raw_elements or ()))
 
     def connect_shared_vlan(self, arg):
         self.namespaces.append(GNS.SVLAN)
@@ -426,7 +917,7 @@ class Link(Resource):
         if self.protocol:
             lnk.attrib["protocol"] = self.protocol
 
-        for intf in self.interfaces:
+        for intf in self._interfaces or ():
             ir = ET.SubElement(lnk, "{%s}interface_ref" % (GNS.REQUEST.name))
             ir.attrib["client_id"] = intf.client_id
         if self.type != "":
@@ -468,52 +959,84 @@ class Link(Resource):
 
         # LAN shaping properties are handled by the LAN class below.
         if self.type != "lan":
-            for (intf_a, intf_b) in itertools.permutations(self.interfaces,2):
-                bandwidth = intf_a.bandwidth if intf_a.bandwidth else self.bandwidth
-                lat = intf_a.latency if intf_a.latency else self.latency
-                plr = intf_a.plr if intf_a.plr else self.plr
-                self._write_link_prop(lnk, intf_b.client_id, intf_a.client_id, bandwidth, lat, plr)
+            if self.compact_properties and len(self._interfaces or ()) > 2:
+                for (intf, attrs) in zip(self._interfaces, self._member_shaping()):
+                    self._write_shaping(lnk, intf.client_id, self.client_id, attrs)
+            else:
+                self._write_pair_props(lnk)
 
-        for obj in self._ext_children:
+        for obj in self._ext_children or ():
             obj._write(lnk)
 
-        for elem in self._raw_elements:
+        for elem in self._raw_elements or ():
             lnk.append(elem)
 
-        for manager in self._component_managers:
+        for manager in self._component_managers or ():
             comp = ET.SubElement(lnk, "{%s}component_manager" % (GNS.REQUEST.name))
             comp.attrib["name"] = manager
 
         return lnk
 
-    def _write_link_prop(self, lnk, src, dst, bw, lat, plr):
-        if bw != Link.DEFAULT_BW or lat != Link.DEFAULT_LAT or plr != Link.DEFAULT_PLR:
-            prop = ET.SubElement(lnk, "{%s}property" % (GNS.REQUEST.name))
-            prop.attrib["source_id"] = src
-            prop.attrib["dest_id"] = dst
-            if bw != Link.DEFAULT_BW:
-                prop.attrib["capacity"] = str(bw)
-            if lat != Link.DEFAULT_LAT:
-                prop.attrib["latency"] = str(lat)
-            if plr != Link.DEFAULT_PLR:
-                prop.attrib["packet_loss"] = str(plr)
+    def _member_shaping(self):
+        # The shaping attributes of each interface on this link (None when unshaped).
+        # Members with identical shaping share one attribute dict.
+        groups = {}
+        out = []
+        for intf in self._interfaces or ():
+            key = (intf.bandwidth if intf.bandwidth else self.bandwidth,
+                   intf.latency if intf.latency else self.latency,
+                   intf.plr if intf.plr else self.plr)
+            try:
+                out.append(groups[key])
+            except KeyError:
+                (bw, lat, plr) = key
+                attrs = None
+                if bw != Link.DEFAULT_BW or lat != Link.DEFAULT_LAT or plr != Link.DEFAULT_PLR:
+                    attrs = {}
+                    if bw != Link.DEFAULT_BW:
+                        attrs["capacity"] = str(bw)
+                    if lat != Link.DEFAULT_LAT:
+                        attrs["latency"] = str(lat)
+                    if plr != Link.DEFAULT_PLR:
+                        attrs["packet_loss"] = str(plr)
+                groups[key] = attrs
+                out.append(attrs)
+        return out
+
+    def _write_pair_props(self, lnk):
+        # One property per ordered pair of members, carrying the shaping of the destination.
+        # Same output as walking itertools.permutations(), without visiting the pairs of
+        # unshaped members.
+        client_ids = [intf.client_id for intf in self._interfaces or ()]
+        for (idx, attrs) in enumerate(self._member_shaping()):
+            if attrs is None:
+                continue
+            dst = client_ids[idx]
+            for (other, src) in enumerate(client_ids):
+                if other != idx:
+                    self._write_shaping(lnk, src, dst, attrs)
+
+    @staticmethod
+    def _write_shaping(lnk, src, dst, attrs):
+        if attrs is not None:
+            attrib = {"source_id" : src, "dest_id" : dst}
+            attrib.update(attrs)
+            ET.SubElement(lnk, "{%s}property" % (GNS.REQUEST.name), attrib)
 
 Request.EXTENSIONS.append(("Link", Link))
 
 
 class LAN(Link):
+    __slots__ = ()
+
     def __init__(self, name = None):
         super().__init__(name, "lan")
 
     def _write(self, element):
         lnk = super()._write(element)
 
-        for intf in self.interfaces:
-            bandwidth = intf.bandwidth if intf.bandwidth else self.bandwidth
-            latency = intf.latency if intf.latency else self.latency
-            plr = intf.plr if intf.plr else self.plr
-
-            super()._write_link_prop(lnk, intf.client_id, self.client_id, bandwidth, latency, plr)
+        for (intf, attrs) in zip(self._interfaces or (), self._member_shaping()):
+            self._write_shaping(lnk, intf.client_id, self.client_id, attrs)
 
         return lnk
 
@@ -521,12 +1044,16 @@ Request.EXTENSIONS.append(("LAN", LAN))
 
 
 class L3GRE(Link):
+    __slots__ = ()
+
     def __init__ (self, name = None):
         super().__init__(name, "gre-tunnel")
 
 Request.EXTENSIONS.append(("L3GRE", L3GRE))
 
 class L2GRE(Link):
+    __slots__ = ()
+
     def __init__ (self, name = None):
         super().__init__(name, "egre-tunnel")
 
@@ -545,16 +1072,21 @@ class StitchedLink(Link):
         def __str__ (self):
             return "Stitched Links may not be connected to more than two interfaces"
 
+    __slots__ = ()
+
     def __init__ (self, name = None):
         super().__init__(name, "")
         self.bandwidth = 20000
 
+    def _fragment_deps(self):
+        return super()._fragment_deps() + [intf.node for intf in self._interfaces or ()]
+
     def _write (self, element):
-        if len(self.interfaces) > 2:
+        if len(self._interfaces or ()) > 2:
             raise StitchedLink.TooManyInterfacesError()
 
         lnk = super()._write(element)
-        for intf in self.interfaces:
+        for intf in self._interfaces or ():
             if intf.node.component_manager_id is None:
                 raise StitchedLink.UnknownComponentManagerError(intf.client_id)
             comp = ET.SubElement(lnk, "{%s}component_manager" % (GNS.REQUEST.name))
@@ -579,6 +1111,9 @@ class Node(Resource):
         disk_image (Optional[str]): The disk image that should be loaded and run on this node.    Should be an image URN.
     """
     EXTENSIONS = []
+    __slots__ = ("client_id", "exclusive", "disk_image", "type", "hardware_type", "_interfaces",
+                 "_services", "routable_control_ip", "component_id", "component_manager_id",
+                 "_raw_elements")
 
     def __init__(self, name, ntype, component_id = None, exclusive = None):
         super().__init__()
@@ -587,40 +1122,48 @@ class Node(Resource):
         self.disk_image = None
         self.type = ntype
         self.hardware_type = None
-        self.interfaces = []
-        self.services = []
+        self._interfaces = None
+        self._services = None
         self.routable_control_ip = False
         self.component_id = component_id
         self.component_manager_id = None
-        self._ext_children = []
-
-        for iname, ext in Node.EXTENSIONS:
-            self._wrapext(iname, ext)
-
-        self._raw_elements = []
+        self._raw_elements = None
 
     class DuplicateInterfaceName(Exception):
         def __str__ (self):
             return "Duplicate interface names"
 
-    def _wrapext (self, name, klass):
-        @functools.wraps(klass.__init__)
-        def wrap(*args, **kw):
-            if getattr(klass, "__ONCEONLY__", False):
-                if any(map(lambda x: isinstance(x,klass),self._ext_children)):
-                    raise DuplicateExtensionError(klass)
-            instance = klass(*args, **kw)
-            if getattr(klass, "__WANTPARENT__", False):
-                instance._parent = self
-            self._ext_children.append(instance)
-            return instance
-
-        setattr(self, name, wrap)
-
     @property
     def name (self):
         return self.client_id
 
+    @property
+    def interfaces (self):
+        return self._list("_interfaces")
+
+    @interfaces.setter
+    def interfaces (self, value):
+        self._interfaces = value
+
+    @property
+    def services (self):
+        return self._list("_services")
+
+    @services.setter
+    def services (self, value):
+        self._services = value
+
+    def _fragment_deps(self):
+        deps = [self]
+        if self.disk_image is not None and not isinstance(self.disk_image, six.string_types):
+            deps.append(self.disk_image)
+        for intf in self._interfaces or ():
+            deps.extend(intf._fragment_deps())
+        deps.extend(self._services or ())
+        deps.extend(self._ext_children or ())
+        deps.extend(self._raw_elements or ())
+        return deps
+
     def _write(self, root):
         # pylint: disable=too-many-branches
         nd = ET.SubElement(root, "{%s}node" % (GNS.REQUEST.name))
@@ -656,28 +1199,28 @@ class Node(Resource):
             hwt = ET.SubElement(nd, "{%s}hardware_type" % (GNS.REQUEST.name))
             hwt.attrib["name"] = self.hardware_type
 
-        if self.interfaces:
-            for intf in self.interfaces:
+        if self._interfaces:
+            for intf in self._interfaces:
                 intf._write(nd)
 
-        if self.services:
+        if self._services:
             svc = ET.SubElement(nd, "{%s}services" % (GNS.REQUEST.name))
-            for service in self.services:
+            for service in self._services:
                 service._write(svc)
 
         if self.routable_control_ip:
             ET.SubElement(nd, "{%s}routable_control_ip" % (Namespaces.EMULAB.name))
 
-        for obj in self._ext_children:
+        for obj in self._ext_children or ():
             obj._write(nd)
 
-        for elem in self._raw_elements:
+        for elem in self._raw_elements or ():
             nd.append(elem)
 
         return nd
 
     def add_interface(self, name = None, address = None):
-        existingNames = [x.name for x in self.interfaces]
+        existingNames = [x.name for x in self._interfaces or ()]
         if name is not None:
             if name.find(":") > 0:
                 intfName = name
@@ -694,24 +1237,34 @@ class Node(Resource):
             raise Node.DuplicateInterfaceName()
 
         intf = Interface(intfName, self, address)
+        if self._request is not None:
+            self._request._register(intf)
         self.interfaces.append(intf)
+        self.mark_dirty()
         return intf
 
     def add_service(self, svc):
+        svc._owner = self
         self.services.append(svc)
+        self.mark_dirty()
 
     def add_raw_element(self, elem):
-        self._raw_elements.append(elem)
+        self._list("_raw_elements").append(elem)
+        self.mark_dirty()
 
 Request.EXTENSIONS.append(("Node", Node))
 
 class RawPC(Node):
+    __slots__ = ()
+
     def __init__(self, name, component_id = None):
         super().__init__(name, NodeType.RAW_PC.value, component_id=component_id, exclusive=True)
 
 Request.EXTENSIONS.append(("RawPC", RawPC))
 
 class VZContainer(Node):
+    __slots__ = ()
+
     def __init__(self, name, exclusive = False):
         super().__init__(name, "emulab-openvz", exclusive)
 
@@ -4,29 +4,33 @@
 # License, v. 2.0. If a copy of the MPL was not distributed with this
 # file, You can obtain one at http://mozilla.org/MPL/2.0/.
 
+import math
+
 from lxml import etree as ET
 import six
 
 from .. import namespaces as GNS
-from .pg import Namespaces as PGNS
 from . import pg
 from . import stitching
-from ..model.util import XPathXRange
+from . import xpath
+from ..model.util import XPathXRange, LazyAttribute, lazy_slots
 
-_XPNS = {'g' : GNS.REQUEST.name, 's' : GNS.SVLAN.name,
-                 'e' : PGNS.EMULAB.name, 't' : stitching.STITCHNS.name}
 
 class Image(object):
-    def __init__ (self):
-        self.name = None
-        self.os = None
-        self.version = None
-        self.description = None
-        self.url = None
+    __slots__ = ("_elem",) + lazy_slots("name", "os", "version", "description", "url")
+
+    def __init__ (self, elem = None):
+        self._elem = elem
+        if elem is None:
+            self.name = None
+            self.os = None
+            self.version = None
+            self.description = None
+            self.url = None
 
     def __repr__ (self):
         return "<Image: %s, os: '%s', version: '%s', description: '%s', url: '%s'>" % (self.name, self.os, self.version,
-                                                                                                                                                                     self.description, self.url)
+                                                                                     self.description, self.url)
 
     def __hash__ (self):
         return hash("%s-%s" % (self.name, self.url))
@@ -39,31 +43,61 @@ class Image(object):
 
     @classmethod
     def _fromdom (cls, elem):
-        i = Image()
-        i.name = elem.get("name")
-        if i.name is None:
-            i.name = elem.get("url")
-        i.os = elem.get("os")
-        i.version = elem.get("version")
-        i.description = elem.get("description")
-        i.url = elem.get("url")
-        return i
+        return Image(elem)
+
+    @LazyAttribute
+    def name (self):
+        name = self._elem.get("name")
+        if name is None:
+            name = self._elem.get("url")
+        return name
+
+    @LazyAttribute
+    def os (self):
+        return self._elem.get("os")
+
+    @LazyAttribute
+    def version (self):
+        return self._elem.get("version")
+
+    @LazyAttribute
+    def description (self):
+        return self._elem.get("description")
+
+    @LazyAttribute
+    def url (self):
+        return self._elem.get("url")
+
+
+def _float (value):
+    if value is None:
+        return None
+    return float(value)
 
 
 class Location(object):
-    def __init__ (self):
-        self.latitude = None
-        self.longitude = None
+    __slots__ = ("_elem",) + lazy_slots("latitude", "longitude")
+
+    def __init__ (self, elem = None):
+        self._elem = elem
+        if elem is None:
+            self.latitude = None
+            self.longitude = None
 
     def __repr__ (self):
         return "<Location: %f, %f>" % (self.latitude, self.longitude)
 
     @classmethod
     def _fromdom (cls, elem):
-        l = Location()
-        l.latitude = float(elem.get("latitude"))
-        l.longitude = float(elem.get("longitude"))
-        return l
+        return Location(elem)
+
+    @LazyAttribute
+    def latitude (self):
+        return _float(self._elem.get("latitude"))
+
+    @LazyAttribute
+    def longitude (self):
+        return _float(self._elem.get("longitude"))
 
 
 class AdInterface(pg.Interface):
@@ -75,23 +109,47 @@ class AdInterface(pg.Interface):
             "control" or "experimental").    `None` if unset.
         name (str): Friendly name for this interface, `None` if unset.
     """
-    def __init__ (self, name):
-        super(AdInterface, self).__init__(name, None)
-        self.component_id = None
-        self.role = None
+    __slots__ = ("_elem",) + lazy_slots("client_id", "component_id", "role", "addresses", "_ext_children")
+
+    # Request-only state from pg.Interface, which is never set on an advertised interface
+    node = None
+    bandwidth = None
+    latency = None
+    plr = None
+
+    def __init__ (self, name, elem = None):
+        # pylint: disable=super-init-not-called
+        self._elem = elem
+        if elem is None:
+            super(AdInterface, self).__init__(name, None)
+            self.role = None
 
     @classmethod
     def _fromdom (cls, elem):
-        eie = elem.xpath('e:interface', namespaces = _XPNS)
-        name = elem.get("component_id")
+        return AdInterface(None, elem)
+
+    @LazyAttribute
+    def client_id (self):
+        eie = xpath.EMULAB_INTERFACE(self._elem)
         if len(eie) > 0:
-            name = eie[0].get("name")
-        intf = AdInterface(name)
+            return eie[0].get("name")
+        return self._elem.get("component_id")
+
+    @LazyAttribute
+    def component_id (self):
+        return self._elem.get("component_id")
+
+    @LazyAttribute
+    def role (self):
+        return self._elem.get("role")
 
-        intf.component_id = elem.get("component_id")
-        intf.role = elem.get("role")
+    @LazyAttribute
+    def addresses (self):
+        return []
 
-        return intf
+    @LazyAttribute
+    def _ext_children (self):
+        return []
 
 
 class AdNode(object):
@@ -100,7 +158,7 @@ class AdNode(object):
     .. note::
         In general this object is created on-demand through `Advertisement` objects,
         but you can load this object from a Node XML element by using the `_fromdom`
-        classmethod.
+        classmethod.  Attributes are decoded from the XML element on first access.
 
         Attributes:
             component_id (str): Component ID URN
@@ -118,102 +176,137 @@ class AdNode(object):
             cpu (int): Maximum Per-core CPU speed in Mhz.    `None` if not available.
     """
 
-    def __init__ (self):
-        self.component_id = None
-        self.component_manager_id = None
-
-        self.name = None
-        self.exclusive = True
-        self.available = False
-        self.hardware_types = {}
-        self.sliver_types = set()
-        self.images = {}
-        self.shared = False
-        self.interfaces = []
-        self.location = None
-        self.ram = None
-        self.cpu = None
-        self._elem = None
+    __slots__ = ("_elem",) + lazy_slots("component_id", "component_manager_id", "name", "exclusive", "available",
+                                        "hardware_types", "sliver_types", "images", "shared", "interfaces",
+                                        "location", "ram", "cpu")
+
+    def __init__ (self, elem = None):
+        self._elem = elem
+        if elem is None:
+            self.component_id = None
+            self.component_manager_id = None
+
+            self.name = None
+            self.exclusive = True
+            self.available = False
+            self.hardware_types = {}
+            self.sliver_types = set()
+            self.images = {}
+            self.shared = False
+            self.interfaces = []
+            self.location = None
+            self.ram = None
+            self.cpu = None
 
     @classmethod
     def _fromdom (cls, elem):
-        node = AdNode()
-        node._elem = elem
-        node.component_id = elem.get("component_id")
-        node.name = elem.get("component_name")
-        node.component_manager_id = elem.get("component_manager_id")
-        if elem.get("exclusive") == "false":
-            node.exclusive = False
-
-        avelem = elem.xpath('g:available', namespaces = _XPNS)
-        if avelem and avelem[0].get("now") == "true":
-            node.available = True
-
-        stypes = elem.xpath('g:sliver_type', namespaces = _XPNS)
-        for stype in stypes:
-            sliver_name = stype.get("name")
-            node.sliver_types.add(sliver_name)
-            node.images[sliver_name] = []
-            ims = stype.xpath('g:disk_image', namespaces = _XPNS)
-            for im in ims:
-                node.images[sliver_name].append(Image._fromdom(im))
-
-        htypes = elem.xpath('g:hardware_type', namespaces = _XPNS)
-        for htype in htypes:
-            nts = htype.xpath('e:node_type', namespaces = _XPNS)
+        return AdNode(elem)
+
+    @LazyAttribute
+    def component_id (self):
+        return self._elem.get("component_id")
+
+    @LazyAttribute
+    def component_manager_id (self):
+        return self._elem.get("component_manager_id")
+
+    @LazyAttribute
+    def name (self):
+        return self._elem.get("component_name")
+
+    @LazyAttribute
+    def exclusive (self):
+        return self._elem.get("exclusive") != "false"
+
+    @LazyAttribute
+    def available (self):
+        avelem = xpath.PG_AVAILABLE(self._elem)
+        return bool(avelem) and avelem[0].get("now") == "true"
+
+    @LazyAttribute
+    def sliver_types (self):
+        return set([stype.get("name") for stype in xpath.PG_SLIVER_TYPE(self._elem)])
+
+    @LazyAttribute
+    def images (self):
+        images = {}
+        for stype in xpath.PG_SLIVER_TYPE(self._elem):
+            ims = xpath.PG_DISK_IMAGE(stype)
+            images[stype.get("name")] = [Image._fromdom(im) for im in ims]
+        return images
+
+    @LazyAttribute
+    def hardware_types (self):
+        hardware_types = {}
+        for htype in xpath.PG_HARDWARE_TYPE(self._elem):
+            nts = xpath.EMULAB_NODE_TYPE(htype)
             if nts:
-                node.hardware_types[htype.get("name")] = nts[0].get("type_slots")
-
-        fds = elem.xpath('e:fd', namespaces = _XPNS)
-        for fd in fds:
-            name = fd.get("name")
-            if name == 'pcshared':
-                node.shared = True
-            elif name == 'cpu':
-                node.cpu = int(fd.get("weight"))
-            elif name == 'ram':
-                node.ram = int(fd.get("weight"))
-
-        for intf in elem.xpath('g:interface', namespaces = _XPNS):
-            node.interfaces.append(AdInterface._fromdom(intf))
-
-        locelem = elem.xpath('g:location', namespaces = _XPNS)
+                hardware_types[htype.get("name")] = nts[0].get("type_slots")
+        return hardware_types
+
+    def _fd_weight (self, name):
+        fds = xpath.EMULAB_FD_BY_NAME(self._elem, name = name)
+        if fds:
+            return int(fds[-1].get("weight"))
+        return None
+
+    @LazyAttribute
+    def shared (self):
+        return bool(xpath.EMULAB_FD_BY_NAME(self._elem, name = "pcshared"))
+
+    @LazyAttribute
+    def cpu (self):
+        return self._fd_weight("cpu")
+
+    @LazyAttribute
+    def ram (self):
+        return self._fd_weight("ram")
+
+    @LazyAttribute
+    def interfaces (self):
+        return [AdInterface._fromdom(intf) for intf in xpath.PG_INTERFACE(self._elem)]
+
+    @LazyAttribute
+    def location (self):
+        locelem = xpath.PG_LOCATION(self._elem)
         if locelem:
-            node.location = Location._fromdom(locelem[0])
-
-        return node
+            return Location._fromdom(locelem[0])
+        return None
 
     @property
     def text (self):
-        return ET.tostring(self._root, pretty_print=True).decode()
+        return ET.tostring(self._elem, pretty_print=True).decode()
 
 
 class AdLink(object):
-    def __init__ (self):
-        self.component_id = None
-        self.link_types = set()
-        self._elem = None
-        self.interface_refs = []
+    __slots__ = ("_elem",) + lazy_slots("component_id", "link_types", "interface_refs")
+
+    def __init__ (self, elem = None):
+        self._elem = elem
+        if elem is None:
+            self.component_id = None
+            self.link_types = set()
+            self.interface_refs = []
 
     @classmethod
     def _fromdom (cls, elem):
-        link = AdLink()
-        link._elem = elem
-        link.component_id = elem.get("component_id")
+        return AdLink(elem)
 
-        ltypes = elem.xpath('g:link_type', namespaces = _XPNS)
-        for ltype in ltypes:
-            link.link_types.add(ltype.get("name"))
+    @LazyAttribute
+    def component_id (self):
+        return self._elem.get("component_id")
 
-        irefs = elem.xpath('g:interface_ref', namespaces = _XPNS)
-        for iref in irefs:
-            link.interface_refs.append(iref.get("component_id"))
+    @LazyAttribute
+    def link_types (self):
+        return set([ltype.get("name") for ltype in xpath.PG_LINK_TYPE(self._elem)])
 
-        return link
+    @LazyAttribute
+    def interface_refs (self):
+        return [iref.get("component_id") for iref in xpath.PG_INTERFACE_REF(self._elem)]
 
     @property
     def text (self):
-        return ET.tostring(self._root, pretty_print=True).decode()
+        return ET.tostring(self._elem, pretty_print=True).decode()
 
 
 class AdSharedVLAN(object):
@@ -240,17 +333,245 @@ class RoutableAddresses(object):
         return self.configured
 
 
+EARTH_RADIUS_KM = 6371.0
+
+def _haversine (lat1, lon1, lat2, lon2):
+    (p1, p2) = (math.radians(lat1), math.radians(lat2))
+    dp = p2 - p1
+    dl = math.radians(lon2 - lon1)
+    a = math.sin(dp / 2) ** 2 + math.cos(p1) * math.cos(p2) * math.sin(dl / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+class AdIndex(object):
+    """Lookup tables over the nodes of an :py:class:`Advertisement`, built in a single pass.
+
+    Every node is parsed once; lookups by `component_id` and name are hash lookups, and
+    :py:meth:`query` answers attribute filters by intersecting precomputed sets of node
+    positions instead of scanning (and re-parsing) every node.
+
+    Attributes:
+        nodes (list): All :py:class:`AdNode` objects, in advertisement order
+        by_component_id (dict): Mapping of `{ component_id : AdNode }`
+        by_name (dict): Mapping of `{ component_name : AdNode }`
+    """
+
+    GRID_DEGREES = 1.0
+
+    def __init__ (self, ad):
+        self.nodes = list(ad.nodes)
+        self.by_component_id = {}
+        self.by_name = {}
+        self._hardware_types = {}
+        self._sliver_types = {}
+        self._images = {}
+        self._available = {True : set(), False : set()}
+        self._exclusive = {True : set(), False : set()}
+        self._grid = {}
+
+        for (idx, node) in enumerate(self.nodes):
+            self.by_component_id[node.component_id] = node
+            if node.name is not None:
+                self.by_name[node.name] = node
+            for htype in node.hardware_types:
+                self._hardware_types.setdefault(htype, set()).add(idx)
+            for stype in node.sliver_types:
+                self._sliver_types.setdefault(stype, set()).add(idx)
+            for image_list in node.images.values():
+                for image in image_list:
+                    self._images.setdefault(image.name, set()).add(idx)
+            self._available[node.available].add(idx)
+            self._exclusive[node.exclusive].add(idx)
+            if node.location is not None:
+                self._grid.setdefault(self._cell(node.location.latitude, node.location.longitude), set()).add(idx)
+
+    def _cell (self, lat, lon):
+        return (int(math.floor(lat / self.GRID_DEGREES)), int(math.floor(lon / self.GRID_DEGREES)))
+
+    @property
+    def hardware_types (self):
+        """Set of all hardware type names in the advertisement."""
+        return set(self._hardware_types)
+
+    @property
+    def sliver_types (self):
+        """Set of all sliver type names in the advertisement."""
+        return set(self._sliver_types)
+
+    @property
+    def image_names (self):
+        """Set of all disk image names in the advertisement."""
+        return set(self._images)
+
+    @staticmethod
+    def _any_of (table, value):
+        if isinstance(value, (six.string_types, bool)):
+            return table.get(value, set())
+        out = set()
+        for val in value:
+            out |= table.get(val, set())
+        return out
+
+    def _near (self, lat, lon, radius_km):
+        dlat = radius_km / (math.pi * EARTH_RADIUS_KM / 180.0)
+        coslat = max(math.cos(math.radians(lat)), 1e-6)
+        dlon = min(180.0, dlat / coslat)
+        (lo, hi) = (self._cell(lat - dlat, lon - dlon), self._cell(lat + dlat, lon + dlon))
+        out = set()
+        for clat in range(lo[0], hi[0] + 1):
+            for clon in range(lo[1], hi[1] + 1):
+                for idx in self._grid.get((clat, clon), ()):
+                    loc = self.nodes[idx].location
+                    if _haversine(lat, lon, loc.latitude, loc.longitude) <= radius_km:
+                        out.add(idx)
+        return out
+
+    def query (self, hardware_type = None, sliver_type = None, image = None, available = None,
+               exclusive = None, near = None):
+        """Return the nodes matching every given filter, in advertisement order.
+
+        Args:
+            hardware_type: Hardware type name, or an iterable of names (any of them matches)
+            sliver_type: Sliver type name, or an iterable of names
+            image: Disk image name, or an iterable of names
+            available (bool): Node availability
+            exclusive (bool): Whether the node can be reserved exclusively
+            near (tuple): `(latitude, longitude, radius_km)` - only nodes within the radius
+
+        Returns:
+            list: :py:class:`AdNode` objects
+        """
+        sets = []
+        if hardware_type is not None:
+            sets.append(self._any_of(self._hardware_types, hardware_type))
+        if sliver_type is not None:
+            sets.append(self._any_of(self._sliver_types, sliver_type))
+        if image is not None:
+            sets.append(self._any_of(self._images, image))
+        if available is not None:
+            sets.append(self._available[bool(available)])
+        if exclusive is not None:
+            sets.append(self._exclusive[bool(exclusive)])
+        if near is not None:
+            sets.append(self._near(*near))
+
+        if not sets:
+            return list(self.nodes)
+
+        sets.sort(key = len)
+        result = set(sets[0])
+        for other in sets[1:]:
+            result &= other
+            if not result:
+                break
+        return [self.nodes[idx] for idx in sorted(result)]
+
+
+def _image_names (node):
+    return set([image.name for image_list in node.images.values() for image in image_list])
+
+
+class AdDiff(object):
+    """Changes between two advertisements from the same aggregate, as computed by :py:func:`diff`.
+
+    Attributes:
+        added (list): :py:class:`AdNode` objects only present in the new advertisement
+        removed (list): Component IDs of nodes only present in the old advertisement
+        now_available (list): Component IDs of nodes that became available
+        now_unavailable (list): Component IDs of nodes that are no longer available
+        images (dict): Mapping of `{ component_id : (added_image_names, removed_image_names) }`
+            for nodes present in both advertisements whose set of images changed
+        shared_vlans_added (list): Shared VLAN names only present in the new advertisement
+        shared_vlans_removed (list): Shared VLAN names only present in the old advertisement
+    """
+
+    def __init__ (self):
+        self.added = []
+        self.removed = []
+        self.now_available = []
+        self.now_unavailable = []
+        self.images = {}
+        self.shared_vlans_added = []
+        self.shared_vlans_removed = []
+
+    def __bool__ (self):
+        return bool(self.added or self.removed or self.now_available or self.now_unavailable or self.images
+                    or self.shared_vlans_added or self.shared_vlans_removed)
+
+    __nonzero__ = __bool__
+
+    def __repr__ (self):
+        return "<AdDiff: +%d -%d nodes, %d available, %d unavailable, %d image changes, +%d -%d shared vlans>" % (
+            len(self.added), len(self.removed), len(self.now_available), len(self.now_unavailable),
+            len(self.images), len(self.shared_vlans_added), len(self.shared_vlans_removed))
+
+    def to_dict (self):
+        """Return the changes as plain data (component IDs and names only), suitable for JSON."""
+        return {"added" : [node.component_id for node in self.added],
+                "removed" : list(self.removed),
+                "now_available" : list(self.now_available),
+                "now_unavailable" : list(self.now_unavailable),
+                "images" : {cid : {"added" : sorted(add), "removed" : sorted(rem)}
+                            for (cid, (add, rem)) in self.images.items()},
+                "shared_vlans_added" : list(self.shared_vlans_added),
+                "shared_vlans_removed" : list(self.shared_vlans_removed)}
+
+
+def diff (old, new):
+    """Compute the changes from advertisement `old` to advertisement `new`.
+
+    Nodes are matched by component ID using the advertisement indexes (see
+    :py:meth:`Advertisement.index`), so the cost is linear in the number of nodes.
+
+    Args:
+        old: Previous :py:class:`Advertisement`, or `None` to treat every node in `new` as added
+        new: Current :py:class:`Advertisement`
+
+    Returns:
+        AdDiff: The changes, in the node order of the respective advertisement
+    """
+    delta = AdDiff()
+    new_index = new.index()
+    old_nodes = old.index().by_component_id if old is not None else {}
+
+    for node in new_index.nodes:
+        prev = old_nodes.get(node.component_id)
+        if prev is None:
+            delta.added.append(node)
+            continue
+        if node.available != prev.available:
+            (delta.now_available if node.available else delta.now_unavailable).append(node.component_id)
+        (images, prev_images) = (_image_names(node), _image_names(prev))
+        if images != prev_images:
+            delta.images[node.component_id] = (images - prev_images, prev_images - images)
+
+    if old is not None:
+        for node in old.index().nodes:
+            if node.component_id not in new_index.by_component_id:
+                delta.removed.append(node.component_id)
+
+        old_vlans = [svlan.name for svlan in old.shared_vlans]
+    else:
+        old_vlans = []
+    new_vlans = [svlan.name for svlan in new.shared_vlans]
+    (old_set, new_set) = (set(old_vlans), set(new_vlans))
+    delta.shared_vlans_added = [name for name in new_vlans if name not in old_set]
+    delta.shared_vlans_removed = [name for name in old_vlans if name not in new_set]
+    return delta
+
+
 class Advertisement(object):
     """Wrapper object for a GENIv3 XML advertisement.
 
-    Only one argument can be supplied (if both are provided `path` will be used)
+    Only one argument can be supplied (if more are provided `path` will be used, then `xml`)
 
     Args:
         path (str, unicode): Path to XML file on disk containing an advertisement
         xml (str, unicode): In-memory XML byte stream containing an advertisement
+        root (lxml.etree._Element): Already parsed advertisement root element
     """
 
-    def __init__ (self, path = None, xml = None):
+    def __init__ (self, path = None, xml = None, root = None):
         if path:
             self._root = ET.parse(open(path, "rb"))
         elif xml:
@@ -258,12 +579,15 @@ class Advertisement(object):
                 self._root = ET.fromstring(bytes(xml, "utf-8"))
             else:
                 self._root = ET.fromstring(xml)
+        elif root is not None:
+            self._root = root
         self._routable_addresses = None
         self._images = set()
+        self._index = None
 
     def _parse_routable (self):
         try:
-            elem = self._root.xpath('/g:rspec/e:rspec_routable_addresses', namespaces=_XPNS)[0]
+            elem = xpath.EMULAB_ROUTABLE_ADDRESSES(self._root)[0]
             ra = RoutableAddresses()
             ra.available = int(elem.get("available"))
             ra.configured = int(elem.get("configured"))
@@ -283,6 +607,32 @@ class Advertisement(object):
         """An indexable iterator over the AdNode objects in this advertisement."""
         return XPathXRange(self._root.findall("{%s}node" % (GNS.REQUEST.name)), AdNode)
 
+    def index (self, rebuild = False):
+        """Return the :py:class:`AdIndex` for this advertisement, building it on first use.
+
+        Args:
+            rebuild (bool): Discard any previously built index (if the underlying XML has been modified)
+        """
+        if self._index is None or rebuild:
+            self._index = AdIndex(self)
+        return self._index
+
+    def query (self, **kwargs):
+        """Find nodes by attribute using the advertisement index, for example
+        `ad.query(hardware_type = "d430", available = True)`.    See :py:meth:`AdIndex.query`
+        for the supported filters."""
+        return self.index().query(**kwargs)
+
+    def to_table (self):
+        """Return the nodes of this advertisement as a columnar
+        :py:class:`geni.model.table.NodeTable` (requires NumPy)."""
+        from ..model.table import NodeTable
+        return NodeTable.from_nodes(self.index().nodes)
+
+    def get_node (self, component_id):
+        """Return the :py:class:`AdNode` with the given component ID, or `None`."""
+        return self.index().by_component_id.get(component_id)
+
     @property
     def links (self):
         """An indexable iterator over the AdLink objects in this advertisement."""
@@ -291,7 +641,7 @@ class Advertisement(object):
     @property
     def shared_vlans (self):
         """An indexable iterator of the shared vlan names found in this advertisement."""
-        return XPathXRange(self._root.xpath('/g:rspec/s:rspec_shared_vlan/s:available', namespaces=_XPNS), AdSharedVLAN)
+        return XPathXRange(xpath.PG_SHARED_VLANS(self._root), AdSharedVLAN)
 
     @property
     def images (self):
@@ -308,7 +658,7 @@ class Advertisement(object):
     def stitchinfo (self):
         """Reference to the stitching info in the manifest, if present."""
         try:
-            elem = self._root.xpath('/g:rspec/t:stitching', namespaces=_XPNS)[0]
+            elem = xpath.PG_STITCHING(self._root)[0]
             return stitching.AdInfo(elem)
         except IndexError:
             return None
@@ -324,3 +674,57 @@ class Advertisement(object):
         f = open(path, "w+")
         f.write(ET.tostring(self._root, pretty_print=True))
         f.close()
+
+
+_NODE_TAG = "{%s}node" % (GNS.REQUEST.name)
+_LINK_TAG = "{%s}link" % (GNS.REQUEST.name)
+_SVLAN_TAG = "{%s}rspec_shared_vlan" % (GNS.SVLAN.name)
+_SVLAN_AVAILABLE_TAG = "{%s}available" % (GNS.SVLAN.name)
+
+
+def iter_resources (source, nodes = True, links = True, shared_vlans = True):
+    """Stream the resources of an advertisement without building the whole document tree.
+
+    Each top-level element is detached from the document as soon as it has been parsed,
+    so memory use is bounded by the largest single resource rather than the size of the
+    advertisement.  The yielded objects own their (detached) element, and can be kept or
+    dropped independently of each other.
+
+    Args:
+        source: Path to an advertisement on disk, or a binary file-like object
+        nodes (bool): Yield :py:class:`AdNode` objects
+        links (bool): Yield :py:class:`AdLink` objects
+        shared_vlans (bool): Yield :py:class:`AdSharedVLAN` objects
+
+    Returns:
+        iterator: Resource objects, in document order
+    """
+    depth = 0
+    for (event, elem) in ET.iterparse(source, events = ("start", "end")):
+        if event == "start":
+            depth += 1
+            continue
+
+        depth -= 1
+        if depth != 1:
+            continue
+
+        # Direct child of <rspec> - take it out of the document whatever it is
+        elem.getparent().remove(elem)
+        if elem.tag == _NODE_TAG and nodes:
+            yield AdNode._fromdom(elem)
+        elif elem.tag == _LINK_TAG and links:
+            yield AdLink._fromdom(elem)
+        elif elem.tag == _SVLAN_TAG and shared_vlans:
+            for avelem in elem.iterchildren(_SVLAN_AVAILABLE_TAG):
+                yield AdSharedVLAN._fromdom(avelem)
+
+
+def iter_nodes (source):
+    """Stream the :py:class:`AdNode` objects of an advertisement.  See :py:func:`iter_resources`."""
+    return iter_resources(source, links = False, shared_vlans = False)
+
+
+def iter_links (source):
+    """Stream the :py:class:`AdLink` objects of an advertisement.  See :py:func:`iter_resources`."""
+    return iter_resources(source, nodes = False, shared_vlans = False)
@@ -12,10 +12,9 @@ import six
 from .pg import Link
 from .. import namespaces as GNS
 from .pg import Namespaces as PGNS
+from . import xpath
 from ..model.util import XPathXRange
 
-_XPNS = {'g' : GNS.REQUEST.name, 's' : GNS.SVLAN.name, 'e' : PGNS.EMULAB.name,
-                 'i' : PGNS.INFO.name, 'p' : PGNS.PARAMS.name, 'u' : GNS.USER.name}
 
 class ManifestLink(Link):
     def __init__(self):
@@ -30,15 +29,16 @@ class ManifestLink(Link):
     def _fromdom(cls, elem):
         lnk = ManifestLink()
         lnk._elem = elem
-        lnk.client_id = elem.get("client_id")
+        # Link.client_id is read-only
+        lnk._client_id = elem.get("client_id")
         lnk.sliver_id = elem.get("sliver_id")
         lnk.vlan = elem.get("vlantag", None)
 
-        refs = elem.xpath('g:interface_ref', namespaces = _XPNS)
+        refs = xpath.PG_INTERFACE_REF(elem)
         for ref in refs:
             lnk.interface_refs.append(ref.get("sliver_id"))
 
-        svlans = elem.xpath('s:link_shared_vlan', namespaces = _XPNS)
+        svlans = xpath.PG_LINK_SHARED_VLAN(elem)
         if svlans:
             # TODO: Can a link be attached to more than one shared vlan?
             # Don't believe PG supports trunks, but the rspec doesn't really forbid it
@@ -78,7 +78,7 @@ class ManifestSvcUser:
     def _fromdom(cls, elem):
         n = cls()
         n.login = elem.get("login")
-        pkelems = elem.xpath('u:public_key', namespaces = _XPNS)
+        pkelems = xpath.PG_PUBLIC_KEY(elem)
         if pkelems:
             n.public_key = pkelems[0].text.strip()
         return n
@@ -134,7 +134,9 @@ class ManifestNode:
         return self._hostipv4
 
     def _populateHostInfo(self):
-        host = self._elem.xpath('g:host', namespaces = _XPNS)
+        if self._elem is None:
+            return
+        host = xpath.PG_HOST(self._elem)
         if host:
             self._hostfqdn = host[0].get("name", None)
             self._hostipv4 = host[0].get("ipv4", None)
@@ -147,17 +149,17 @@ class ManifestNode:
         n.component_id = elem.get("component_id")
         n.sliver_id = elem.get("sliver_id")
 
-        logins = elem.xpath('g:services/g:login', namespaces = _XPNS)
+        logins = xpath.PG_SVC_LOGIN(elem)
         for lelem in logins:
             l = ManifestSvcLogin._fromdom(lelem)
             n.logins.append(l)
 
-        users = elem.xpath('g:services/u:services_user', namespaces = _XPNS)
+        users = xpath.PG_SVC_USER(elem)
         for uelem in users:
             u = ManifestSvcUser._fromdom(uelem)
             n.users.append(u)
 
-        interfaces = elem.xpath('g:interface', namespaces = _XPNS)
+        interfaces = xpath.PG_INTERFACE(elem)
         for ielem in interfaces:
             i = ManifestNode.Interface()
             i.client_id = ielem.get("client_id")
@@ -165,7 +167,7 @@ class ManifestNode:
             i.component_id = ielem.get("component_id")
             i.mac_address = ielem.get("mac_address")
             try:
-                ipelem = ielem.xpath('g:ip', namespaces = _XPNS)[0]
+                ipelem = xpath.PG_IP(ielem)[0]
                 i.address_info = (ipelem.get("address"), ipelem.get("netmask"))
             except Exception:
                 pass
@@ -213,38 +215,43 @@ class ManifestParameter:
 class Manifest:
     REQUESTV2 = "http://www.protogeni.net/resources/rspec/2"
 
-    def __init__(self, path = None, xml = None):
+    def __init__(self, path = None, xml = None, root = None):
         if path and xml:
             raise RuntimeError("Cannot specify, both, path and xml when opening manifest file")
 
-        if path:
-            with open(path, "r", encoding='utf-8') as xmlfile:
-                self._xml = xmlfile.read()
-        elif xml:
-            if six.PY3:
-                self._xml = bytes(xml, "utf-8")
-            else:
-                self._xml = xml
+        if root is not None:
+            # Already parsed (streamed) manifest - there is no serialized copy to re-parse from
+            self._xml = None
+            self._root = root
+        else:
+            if path:
+                with open(path, "r", encoding='utf-8') as xmlfile:
+                    self._xml = xmlfile.read()
+            elif xml:
+                if six.PY3:
+                    self._xml = bytes(xml, "utf-8")
+                else:
+                    self._xml = xml
 
-        self._root = ET.fromstring(self._xml)
+            self._root = ET.fromstring(self._xml)
         self._pid = os.getpid()
 
     @property
     def root(self):
-        if os.getpid() != self._pid:
+        if os.getpid() != self._pid and self._xml is not None:
             self._root = ET.fromstring(self._xml)
             self._pid = os.getpid()
         return self._root
 
     @property
     def latitude(self):
-        loc = self._root.xpath('i:site_info/i:location', namespaces = _XPNS)
+        loc = xpath.PG_SITE_LOCATION(self._root)
         if loc:
             return loc[0].get("latitude")
 
     @property
     def longitude(self):
-        loc = self._root.xpath('i:site_info/i:location', namespaces = _XPNS)
+        loc = xpath.PG_SITE_LOCATION(self._root)
         if loc:
             return loc[0].get("longitude")
 
@@ -266,7 +273,7 @@ class Manifest:
 
     @property
     def parameters(self):
-        for set_elem in self.root.findall(f"{{{PGNS.PARAMS.name}data_set"):
+        for set_elem in self.root.findall(f"{{{PGNS.PARAMS.name}}}data_set"):
             for param_elem in list(set_elem):
                 if not param_elem.tag in [f"{{{PGNS.PARAMS.name}}}data_item",
                                           f"{{{PGNS.PARAMS.name}}}data_list",
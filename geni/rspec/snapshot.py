@@ -0,0 +1,539 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Pre-parsed binary snapshots of advertisements and manifests.
+
+:py:func:`dump` writes the parsed object model of a :py:class:`geni.rspec.pgad.Advertisement`
+or :py:class:`geni.rspec.pgmanifest.Manifest` to a compact, versioned binary file, and
+:py:func:`load` memory-maps such a file and returns an object with the same interface
+(:py:class:`AdvertisementSnapshot` or :py:class:`ManifestSnapshot`).  Loading does not
+parse any XML - nodes and links are materialized one at a time when they are accessed::
+
+  snapshot.dump(am.list_resources(context), "/var/cache/site.snap")
+  ad = snapshot.load("/var/cache/site.snap")
+  nodes = ad.query(hardware_type = "d430", available = True)
+
+File layout (all integers little-endian):
+
+* Header (:py:data:`HEADER`): magic, format version, kind, record counts and section offsets
+* String table: `count + 1` u32 offsets followed by the UTF-8 data of every distinct string
+* Node records and link records: fixed size structs, one per object
+* Variable data: u32 arrays (string ids and counts) for the list attributes of each record
+* Metadata: a small JSON document for document level attributes
+
+String ids of `0xFFFFFFFF` encode `None`.
+"""
+
+import json
+import math
+import mmap
+import os
+import struct
+import threading
+
+from . import pgad
+from . import pgmanifest
+
+MAGIC = b"GLSN"
+FORMAT_VERSION = 1
+
+KIND_ADVERTISEMENT = 1
+KIND_MANIFEST = 2
+
+NONE = 0xFFFFFFFF
+
+# magic, version, kind, nodes, links, strings, strtab offset, nodes offset, links offset,
+# var offset, meta offset, meta length
+HEADER = struct.Struct("<4sHBxIIIIIIIII")
+
+# component_id, component_manager_id, name, flags, cpu, ram, latitude, longitude, var offset, var length
+AD_NODE = struct.Struct("<IIIBiqddII")
+# component_id, var offset, var length
+AD_LINK = struct.Struct("<III")
+# client_id, component_id, sliver_id, host fqdn, host ipv4, var offset, var length
+MF_NODE = struct.Struct("<IIIIIII")
+# client_id, sliver_id, vlan, var offset, var length
+MF_LINK = struct.Struct("<IIIII")
+
+_F_EXCLUSIVE = 0x01
+_F_AVAILABLE = 0x02
+_F_SHARED = 0x04
+_F_LOCATION = 0x08
+_F_CPU = 0x10
+_F_RAM = 0x20
+
+
+# pylint: disable=multiple-statements
+class SnapshotError(Exception): pass
+class SnapshotVersionError(SnapshotError): pass
+# pylint: enable=multiple-statements
+
+
+class _Writer(object):
+    def __init__ (self):
+        self._strings = {}
+        self._strlist = []
+        self.records = []
+        self.links = []
+        self.var = []
+
+    def sid (self, value):
+        if value is None:
+            return NONE
+        value = str(value)
+        sid = self._strings.get(value)
+        if sid is None:
+            sid = self._strings[value] = len(self._strlist)
+            self._strlist.append(value)
+        return sid
+
+    def add_var (self, values):
+        offset = len(self.var)
+        self.var.extend(values)
+        return (offset, len(values))
+
+    def build (self, kind, node_struct, link_struct, meta):
+        encoded = [s.encode("utf-8") for s in self._strlist]
+        offsets = [0]
+        for data in encoded:
+            offsets.append(offsets[-1] + len(data))
+        strtab = struct.pack("<%dI" % (len(offsets)), *offsets) + b"".join(encoded)
+
+        nodes = b"".join([node_struct.pack(*rec) for rec in self.records])
+        links = b"".join([link_struct.pack(*rec) for rec in self.links])
+        var = struct.pack("<%dI" % (len(self.var)), *self.var)
+        metadata = json.dumps(meta).encode("utf-8")
+
+        strtab_off = HEADER.size
+        nodes_off = strtab_off + len(strtab)
+        links_off = nodes_off + len(nodes)
+        var_off = links_off + len(links)
+        meta_off = var_off + len(var)
+
+        header = HEADER.pack(MAGIC, FORMAT_VERSION, kind, len(self.records), len(self.links), len(self._strlist),
+                             strtab_off, nodes_off, links_off, var_off, meta_off, len(metadata))
+        return b"".join([header, strtab, nodes, links, var, metadata])
+
+
+def _float (value):
+    if value is None:
+        return math.nan
+    return value
+
+
+def _dump_advertisement (ad):
+    w = _Writer()
+    images = {}
+
+    def image_id (image):
+        if image not in images:
+            images[image] = len(images)
+        return images[image]
+
+    for node in ad.nodes:
+        var = [len(node.hardware_types)]
+        for (name, slots) in node.hardware_types.items():
+            var.extend([w.sid(name), w.sid(slots)])
+        var.append(len(node.images))
+        for (stype, image_list) in node.images.items():
+            var.extend([w.sid(stype), len(image_list)])
+            var.extend([image_id(image) for image in image_list])
+        # Sliver types with no image list (only possible for hand-built nodes)
+        extra = [stype for stype in node.sliver_types if stype not in node.images]
+        var.append(len(extra))
+        var.extend([w.sid(stype) for stype in extra])
+        var.append(len(node.interfaces))
+        for intf in node.interfaces:
+            var.extend([w.sid(intf.component_id), w.sid(intf.name), w.sid(intf.role)])
+
+        flags = ((_F_EXCLUSIVE if node.exclusive else 0) | (_F_AVAILABLE if node.available else 0) |
+                 (_F_SHARED if node.shared else 0) | (_F_LOCATION if node.location is not None else 0) |
+                 (_F_CPU if node.cpu is not None else 0) | (_F_RAM if node.ram is not None else 0))
+        loc = node.location
+        (off, length) = w.add_var(var)
+        w.records.append((w.sid(node.component_id), w.sid(node.component_manager_id), w.sid(node.name), flags,
+                          node.cpu or 0, node.ram or 0, _float(loc.latitude if loc else None),
+                          _float(loc.longitude if loc else None), off, length))
+
+    for link in ad.links:
+        var = [len(link.link_types)] + [w.sid(ltype) for ltype in sorted(link.link_types)]
+        var.append(len(link.interface_refs))
+        var.extend([w.sid(ref) for ref in link.interface_refs])
+        (off, length) = w.add_var(var)
+        w.links.append((w.sid(link.component_id), off, length))
+
+    routable = ad.routable_addresses
+    meta = {"images" : [[i.name, i.os, i.version, i.description, i.url] for i in images],
+            "shared_vlans" : [svlan.name for svlan in ad.shared_vlans],
+            "routable_addresses" : [routable.available, routable.configured] if routable else None,
+            "error_url" : getattr(ad, "error_url", None)}
+    return w.build(KIND_ADVERTISEMENT, AD_NODE, AD_LINK, meta)
+
+
+def _dump_manifest (manifest):
+    w = _Writer()
+
+    for node in manifest.nodes:
+        var = [len(node.logins)]
+        for login in node.logins:
+            var.extend([w.sid(login.auth), w.sid(login.hostname), NONE if login.port is None else login.port,
+                        w.sid(login.username)])
+        var.append(len(node.users))
+        for user in node.users:
+            var.extend([w.sid(user.login), w.sid(user.public_key)])
+        var.append(len(node.interfaces))
+        for intf in node.interfaces:
+            (addr, mask) = intf.address_info if intf.address_info is not None else (None, None)
+            var.extend([w.sid(intf.client_id), w.sid(intf.sliver_id), w.sid(intf.component_id),
+                        w.sid(intf.mac_address), int(intf.address_info is not None), w.sid(addr), w.sid(mask)])
+        (off, length) = w.add_var(var)
+        w.records.append((w.sid(node.client_id), w.sid(node.component_id), w.sid(node.sliver_id),
+                          w.sid(node.hostfqdn), w.sid(node.hostipv4), off, length))
+
+    for link in manifest.links:
+        (off, length) = w.add_var([w.sid(ref) for ref in link.interface_refs])
+        w.links.append((w.sid(link.client_id), w.sid(link.sliver_id), w.sid(link.vlan), off, length))
+
+    meta = {"expires" : manifest.expiresstr, "latitude" : manifest.latitude, "longitude" : manifest.longitude,
+            "parameters" : [[p.name, p.value] for p in manifest.parameters],
+            "error_url" : getattr(manifest, "error_url", None)}
+    return w.build(KIND_MANIFEST, MF_NODE, MF_LINK, meta)
+
+
+def dumps (obj):
+    """Serialize an advertisement or manifest (or a snapshot of one) to bytes."""
+    if isinstance(obj, pgad.Advertisement):
+        return _dump_advertisement(obj)
+    if isinstance(obj, pgmanifest.Manifest):
+        return _dump_manifest(obj)
+    raise TypeError("Can not snapshot objects of type %s" % (type(obj).__name__))
+
+
+def dump (obj, path):
+    """Write a snapshot of an advertisement or manifest to `path`.
+
+    The file is written under a temporary name and renamed into place, so concurrent
+    readers never observe a partial snapshot."""
+    data = dumps(obj)
+    tmppath = "%s.%d.%d" % (path, os.getpid(), threading.get_ident())
+    with open(tmppath, "wb") as outfile:
+        outfile.write(data)
+    os.replace(tmppath, path)
+
+
+class _Buffer(object):
+    """Decoded header, string table and section access for a snapshot buffer."""
+
+    def __init__ (self, buf):
+        if len(buf) < HEADER.size:
+            raise SnapshotError("Truncated snapshot")
+        (magic, version, kind, self.nodes, self.links, nstrings, self.strtab_off, self.nodes_off,
+         self.links_off, self.var_off, meta_off, meta_len) = HEADER.unpack_from(buf, 0)
+        if magic != MAGIC:
+            raise SnapshotError("Not a geni-lib snapshot")
+        if version != FORMAT_VERSION:
+            raise SnapshotVersionError("Snapshot format version %d is not supported (expected %d)"
+                                       % (version, FORMAT_VERSION))
+        if meta_off + meta_len > len(buf):
+            raise SnapshotError("Truncated snapshot")
+        self.buf = buf
+        self.kind = kind
+        self.strdata_off = self.strtab_off + (nstrings + 1) * 4
+        self.meta = json.loads(bytes(buf[meta_off:meta_off + meta_len]).decode("utf-8"))
+        self._strings = {}
+
+    def string (self, sid):
+        if sid == NONE:
+            return None
+        value = self._strings.get(sid)
+        if value is None:
+            (start, end) = struct.unpack_from("<II", self.buf, self.strtab_off + sid * 4)
+            value = self._strings[sid] = bytes(self.buf[self.strdata_off + start:self.strdata_off + end]).decode("utf-8")
+        return value
+
+    def record (self, rstruct, base, idx):
+        return rstruct.unpack_from(self.buf, base + idx * rstruct.size)
+
+    def var (self, offset, length):
+        return struct.unpack_from("<%dI" % (length), self.buf, self.var_off + offset * 4)
+
+
+class _Records(object):
+    """Indexable, lazily materialized sequence of snapshot records."""
+
+    def __init__ (self, count, build):
+        self._count = count
+        self._build = build
+
+    def __len__ (self):
+        return self._count
+
+    def __getitem__ (self, idx):
+        if isinstance(idx, slice):
+            return [self._build(i) for i in range(*idx.indices(self._count))]
+        if idx < 0:
+            idx += self._count
+        if not 0 <= idx < self._count:
+            raise IndexError("snapshot record index out of range")
+        return self._build(idx)
+
+    def __iter__ (self):
+        for idx in range(self._count):
+            yield self._build(idx)
+
+
+class AdvertisementSnapshot(pgad.Advertisement):
+    """An advertisement loaded from a snapshot file (see :py:func:`load`).
+
+    Behaves like :py:class:`geni.rspec.pgad.Advertisement` (including :py:meth:`index`,
+    :py:meth:`query` and :py:meth:`to_table`), except that the XML text of the original
+    document and its stitching information are not available."""
+
+    # pylint: disable=super-init-not-called
+    def __init__ (self, buf):
+        self._buf = buf
+        self._root = None
+        self._routable_addresses = None
+        self._images = set()
+        self._index = None
+        self._image_objs = None
+        self.error_url = buf.meta.get("error_url")
+
+    def _image (self, idx):
+        if self._image_objs is None:
+            objs = []
+            for (name, os_, version, description, url) in self._buf.meta["images"]:
+                image = pgad.Image()
+                (image.name, image.os, image.version, image.description, image.url) = (name, os_, version,
+                                                                                      description, url)
+                objs.append(image)
+            self._image_objs = objs
+        return self._image_objs[idx]
+
+    def _node (self, idx):
+        b = self._buf
+        (cid, cmid, name, flags, cpu, ram, lat, lon, off, length) = b.record(AD_NODE, b.nodes_off, idx)
+        var = b.var(off, length)
+
+        node = pgad.AdNode()
+        node.component_id = b.string(cid)
+        node.component_manager_id = b.string(cmid)
+        node.name = b.string(name)
+        node.exclusive = bool(flags & _F_EXCLUSIVE)
+        node.available = bool(flags & _F_AVAILABLE)
+        node.shared = bool(flags & _F_SHARED)
+        if flags & _F_CPU:
+            node.cpu = cpu
+        if flags & _F_RAM:
+            node.ram = ram
+        if flags & _F_LOCATION:
+            node.location = pgad.Location()
+            node.location.latitude = None if math.isnan(lat) else lat
+            node.location.longitude = None if math.isnan(lon) else lon
+
+        pos = 1
+        for _ in range(var[0]):
+            node.hardware_types[b.string(var[pos])] = b.string(var[pos + 1])
+            pos += 2
+        count = var[pos]
+        pos += 1
+        for _ in range(count):
+            (stype, nimages) = (b.string(var[pos]), var[pos + 1])
+            node.sliver_types.add(stype)
+            node.images[stype] = [self._image(i) for i in var[pos + 2:pos + 2 + nimages]]
+            pos += 2 + nimages
+        count = var[pos]
+        pos += 1
+        for sid in var[pos:pos + count]:
+            node.sliver_types.add(b.string(sid))
+        pos += count
+        count = var[pos]
+        pos += 1
+        for _ in range(count):
+            intf = pgad.AdInterface(b.string(var[pos + 1]))
+            intf.component_id = b.string(var[pos])
+            intf.role = b.string(var[pos + 2])
+            node.interfaces.append(intf)
+            pos += 3
+        return node
+
+    def _link (self, idx):
+        b = self._buf
+        (cid, off, length) = b.record(AD_LINK, b.links_off, idx)
+        var = b.var(off, length)
+        link = pgad.AdLink()
+        link.component_id = b.string(cid)
+        ntypes = var[0]
+        link.link_types = set([b.string(sid) for sid in var[1:1 + ntypes]])
+        link.interface_refs = [b.string(sid) for sid in var[2 + ntypes:2 + ntypes + var[1 + ntypes]]]
+        return link
+
+    @property
+    def nodes (self):
+        """An indexable sequence of the AdNode objects in this advertisement."""
+        return _Records(self._buf.nodes, self._node)
+
+    @property
+    def links (self):
+        """An indexable sequence of the AdLink objects in this advertisement."""
+        return _Records(self._buf.links, self._link)
+
+    @property
+    def shared_vlans (self):
+        out = []
+        for name in self._buf.meta["shared_vlans"]:
+            svlan = pgad.AdSharedVLAN()
+            svlan.name = name
+            out.append(svlan)
+        return out
+
+    @property
+    def routable_addresses (self):
+        data = self._buf.meta["routable_addresses"]
+        if data is None:
+            return None
+        ra = pgad.RoutableAddresses()
+        (ra.available, ra.configured) = data
+        return ra
+
+    @property
+    def stitchinfo (self):
+        return None
+
+    @property
+    def text (self):
+        raise SnapshotError("The XML text of an advertisement is not stored in its snapshot")
+
+
+class ManifestSnapshot(pgmanifest.Manifest):
+    """A manifest loaded from a snapshot file (see :py:func:`load`).
+
+    Behaves like :py:class:`geni.rspec.pgmanifest.Manifest`, except that the XML text
+    of the original document is not available."""
+
+    # pylint: disable=super-init-not-called
+    def __init__ (self, buf):
+        self._buf = buf
+        self._xml = None
+        self._root = None
+        self._pid = os.getpid()
+        self.error_url = buf.meta.get("error_url")
+
+    def _node (self, idx):
+        b = self._buf
+        (client_id, cid, sliver_id, fqdn, ipv4, off, length) = b.record(MF_NODE, b.nodes_off, idx)
+        var = b.var(off, length)
+
+        node = pgmanifest.ManifestNode()
+        node.client_id = b.string(client_id)
+        node.component_id = b.string(cid)
+        node.sliver_id = b.string(sliver_id)
+        node._hostfqdn = b.string(fqdn)
+        node._hostipv4 = b.string(ipv4)
+
+        pos = 1
+        for _ in range(var[0]):
+            login = pgmanifest.ManifestSvcLogin()
+            login.auth = b.string(var[pos])
+            login.hostname = b.string(var[pos + 1])
+            login.port = None if var[pos + 2] == NONE else var[pos + 2]
+            login.username = b.string(var[pos + 3])
+            node.logins.append(login)
+            pos += 4
+        count = var[pos]
+        pos += 1
+        for _ in range(count):
+            user = pgmanifest.ManifestSvcUser()
+            user.login = b.string(var[pos])
+            user.public_key = b.string(var[pos + 1])
+            node.users.append(user)
+            pos += 2
+        count = var[pos]
+        pos += 1
+        for _ in range(count):
+            intf = pgmanifest.ManifestNode.Interface()
+            intf.client_id = b.string(var[pos])
+            intf.sliver_id = b.string(var[pos + 1])
+            intf.component_id = b.string(var[pos + 2])
+            intf.mac_address = b.string(var[pos + 3])
+            if var[pos + 4]:
+                intf.address_info = (b.string(var[pos + 5]), b.string(var[pos + 6]))
+            node.interfaces.append(intf)
+            pos += 7
+        return node
+
+    def _link (self, idx):
+        b = self._buf
+        (client_id, sliver_id, vlan, off, length) = b.record(MF_LINK, b.links_off, idx)
+        link = pgmanifest.ManifestLink()
+        link._client_id = b.string(client_id)
+        link.sliver_id = b.string(sliver_id)
+        link.vlan = b.string(vlan)
+        link.interface_refs = [b.string(sid) for sid in b.var(off, length)]
+        return link
+
+    @property
+    def root (self):
+        return None
+
+    @property
+    def latitude (self):
+        return self._buf.meta["latitude"]
+
+    @property
+    def longitude (self):
+        return self._buf.meta["longitude"]
+
+    @property
+    def expiresstr (self):
+        return self._buf.meta["expires"]
+
+    @property
+    def nodes (self):
+        return _Records(self._buf.nodes, self._node)
+
+    @property
+    def links (self):
+        return _Records(self._buf.links, self._link)
+
+    @property
+    def parameters (self):
+        for (name, value) in self._buf.meta["parameters"]:
+            yield pgmanifest.ManifestParameter(name, value)
+
+    @property
+    def text (self):
+        raise SnapshotError("The XML text of a manifest is not stored in its snapshot")
+
+
+def loads (data):
+    """Load a snapshot from a bytes-like object.  See :py:func:`load`."""
+    buf = _Buffer(memoryview(data))
+    if buf.kind == KIND_ADVERTISEMENT:
+        return AdvertisementSnapshot(buf)
+    if buf.kind == KIND_MANIFEST:
+        return ManifestSnapshot(buf)
+    raise SnapshotError("Unknown snapshot kind %d" % (buf.kind))
+
+
+def load (path):
+    """Memory-map the snapshot at `path`.
+
+    Returns:
+        :py:class:`AdvertisementSnapshot` or :py:class:`ManifestSnapshot`
+
+    Raises:
+        SnapshotError: The file is not a valid snapshot
+        SnapshotVersionError: The file was written with an unsupported format version
+    """
+    with open(path, "rb") as snapfile:
+        try:
+            mapped = mmap.mmap(snapfile.fileno(), 0, access = mmap.ACCESS_READ)
+        except ValueError:
+            # Empty file
+            raise SnapshotError("Truncated snapshot")
+    return loads(mapped)
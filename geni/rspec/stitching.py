@@ -12,11 +12,11 @@ from lxml import etree as ET
 
 from . import pg
 from .. import namespaces
+from . import xpath
 from ..model.util import XPathXRange
 
 STITCHNS = namespaces.Namespace("stitch", "http://hpn.east.isi.edu/rspec/ext/stitch/0.1/")
 
-_XPNS = {'t' : STITCHNS.name}
 
 class StitchInfo(pg.Resource):
     def __init__ (self):
@@ -137,7 +137,7 @@ class AdInfo(object):
     @property
     def aggregates (self):
         if not self._aggregates:
-            for elem in self._root.xpath('t:aggregate', namespaces=_XPNS):
+            for elem in xpath.STITCH_AGGREGATE(self._root):
                 info = AggInfo(elem)
                 self._aggregates[info.urn] = info
         return self._aggregates
@@ -151,21 +151,21 @@ class AggInfo(object):
 
     @property
     def mode (self):
-        return self._root.xpath("t:stitchingmode", namespaces=_XPNS)[0].text
+        return xpath.STITCH_MODE(self._root)[0].text
 
     @property
     def scheduledservices (self):
-        t = self._root.xpath("t:scheduledservices", namespaces=_XPNS)[0].text
+        t = xpath.STITCH_SCHEDULED_SERVICES(self._root)[0].text
         return coerceBool(t)
 
     @property
     def negotiatedservices (self):
-        t = self._root.xpath("t:negotiatedservices", namespaces=_XPNS)[0].text
+        t = xpath.STITCH_NEGOTIATED_SERVICES(self._root)[0].text
         return coerceBool(t)
 
     @property
     def nodes (self):
-        n = self._root.xpath("t:node", namespaces=_XPNS)
+        n = xpath.STITCH_NODE(self._root)
         return XPathXRange(n, AggNode)
 
 
@@ -176,7 +176,7 @@ class AggNode(object):
 
     @property
     def ports (self):
-        p = self._root.xpath("t:port", namespaces=_XPNS)
+        p = xpath.STITCH_PORT(self._root)
         return XPathXRange(p, AggPort)
 
     @classmethod
@@ -195,7 +195,7 @@ class AggPort(object):
 
     @property
     def links (self):
-        l = self._root.xpath("t:link", namespaces=_XPNS)
+        l = xpath.STITCH_LINK(self._root)
         return XPathXRange(l, AggLink)
 
     @classmethod
@@ -203,7 +203,7 @@ class AggPort(object):
         port = AggPort()
         port._root = elem
         port.id = elem.get("id")
-        port.capacity = int((elem.xpath("t:capacity", namespaces=_XPNS)[0].text).strip("kbps"))
+        port.capacity = int((xpath.STITCH_CAPACITY(elem)[0].text).strip("kbps"))
         return port
 
 
@@ -227,5 +227,5 @@ class AggLink(object):
         link = AggLink()
         link._root = elem
         link.id = elem.get("id")
-        link.remote_urn = elem.xpath("t:remoteLinkId", namespaces=_XPNS)[0].text
+        link.remote_urn = xpath.STITCH_REMOTE_LINK_ID(elem)[0].text
         return link
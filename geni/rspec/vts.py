@@ -581,9 +581,6 @@ class Container(Resource):
         self.ram = None
         self.routes = []
 
-        for ename,ext in Container.EXTENSIONS:
-            self._wrapext(ename, ext)
-
     def attach_port(self, port):
         if port.name is None:
             port.client_id = "%s:%d" % (self.name, len(self.ports))
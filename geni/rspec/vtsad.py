@@ -8,11 +8,11 @@ from lxml import etree as ET
 import six
 
 import geni.namespaces as GNS
+from . import xpath
 from geni.model.util import XPathXRange
 
 
 VTSNS = GNS.Namespace("vts", "http://geni.bssoftworks.com/rspec/ext/vts/ad/1")
-_XPNS = {'g' : GNS.REQUEST.name, 'v' : VTSNS.name}
 
 def dumbcoerce(val):
     try:
@@ -40,17 +40,17 @@ class CircuitPlane:
     def _fromdom (cls, elem):
         cp = CircuitPlane()
         cp.label = elem.get("label")
-        supported = elem.xpath('v:supported-tunnels/v:tunnel-type', namespaces = _XPNS)
+        supported = xpath.VTSA_TUNNEL_TYPE(elem)
 
         for tuntyp in supported:
             cp.tunnel_types.append(tuntyp.get("name"))
 
         try:
-            cp.endpoint = elem.xpath('v:endpoint', namespaces = _XPNS)[0].get("value")
+            cp.endpoint = xpath.VTSA_ENDPOINT(elem)[0].get("value")
         except IndexError:
             cp.endpoint = None
 
-        for celem in elem.xpath('v:constraints/v:constraint', namespaces = _XPNS):
+        for celem in xpath.VTSA_CONSTRAINT(elem):
             cp.constraints[celem.get("key")] = dumbcoerce(celem.get("value"))
 
         return cp
@@ -79,19 +79,21 @@ class Image:
 
 
 class Advertisement:
-    def __init__ (self, path = None, xml = None):
+    def __init__ (self, path = None, xml = None, root = None):
         if path:
             self._root = ET.parse(open(path, "rb"))
         elif xml:
             self._root = ET.fromstring(bytes(xml, "utf-8"))
+        elif root is not None:
+            self._root = root
 
     @property
     def circuit_planes (self):
-        return XPathXRange(self._root.xpath("v:circuit-planes/v:circuit-plane", namespaces = _XPNS), CircuitPlane)
+        return XPathXRange(xpath.VTSA_CIRCUIT_PLANE(self._root), CircuitPlane)
 
     @property
     def images (self):
-        return XPathXRange(self._root.xpath("v:images/v:image", namespaces = _XPNS), Image)
+        return XPathXRange(xpath.VTSA_IMAGE(self._root), Image)
 
     @property
     def text (self):
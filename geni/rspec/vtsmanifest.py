@@ -9,13 +9,8 @@ import os
 from lxml import etree as ET
 import six
 
-import geni.namespaces as GNS
 from .pgmanifest import ManifestSvcLogin, ManifestSvcUser
-
-XPNS = {'g' : GNS.REQUEST.name,
-                'u' : GNS.USER.name,
-                'v' : "http://geni.bssoftworks.com/rspec/ext/vts/manifest/1",
-                's' : "http://geni.bssoftworks.com/rspec/ext/sdn/manifest/1"}
+from . import xpath
 
 class UnhandledPortTypeError(Exception):
     def __init__(self, typ):
@@ -148,7 +143,7 @@ class GREPort(GenericPort):
     def _fromdom (cls, elem):
         p = GREPort()
         p.client_id = elem.get("client_id")
-        endpe = elem.xpath("v:endpoint", namespaces=XPNS)[0]
+        endpe = xpath.VTSM_ENDPOINT(elem)[0]
         p.circuit_plane = endpe.get("circuit-plane")
         p.local_endpoint = endpe.get("local")
         p.remote_endpoint = endpe.get("remote")
@@ -224,22 +219,22 @@ class ManifestContainer:
         c.image = elem.get("image")
         c.sliver_id = elem.get("sliver_id")
 
-        logins = elem.xpath('g:services/g:login', namespaces = XPNS)
+        logins = xpath.PG_SVC_LOGIN(elem)
         for lelem in logins:
             l = ManifestSvcLogin._fromdom(lelem)
             c.logins.append(l)
 
-        users = elem.xpath('g:services/u:services_user', namespaces = XPNS)
+        users = xpath.PG_SVC_USER(elem)
         for uelem in users:
             u = ManifestSvcUser._fromdom(uelem)
             c.users.append(u)
 
-        ports = elem.xpath('v:port', namespaces = XPNS)
+        ports = xpath.VTSM_PORT(elem)
         for cport in ports:
             p = Manifest._buildPort(cport, True)
             c.ports.append(p)
 
-        mounts = elem.xpath('v:mount', namespaces = XPNS)
+        mounts = xpath.VTSM_MOUNT(elem)
         for melem in mounts:
             m = ManifestMount._fromdom(melem)
             c.mounts.append(m)
@@ -279,15 +274,15 @@ class ManifestDatapath:
         dp.image = elem.get("image")
         dp.sliver_id = elem.get("sliver_id")
 
-        mirror = elem.xpath('v:mirror', namespaces = XPNS)
+        mirror = xpath.VTSM_MIRROR(elem)
         if mirror:
             dp.mirror = mirror[0].get("target")
 
-        stp = elem.xpath('v:stp', namespaces = XPNS)
+        stp = xpath.VTSM_STP(elem)
         if stp:
             dp.stp_mode = stp[0].get("type")
 
-        ports = elem.xpath('v:port', namespaces = XPNS)
+        ports = xpath.VTSM_PORT(elem)
         for port in ports:
             p = Manifest._buildPort(port)
             dp.ports.append(p)
@@ -314,7 +309,7 @@ class SSLVPNFunction(ManifestFunction):
 class Manifest:
     """Wrapper object for GENI XML manifest rspec, providing a pythonic API to the contained data"""
 
-    def __init__(self, path=None, xml=None):
+    def __init__(self, path=None, xml=None, root=None):
         if path:
             self._root = ET.parse(open(path, "rb"))
             self._xml = ET.tostring(self._root)
@@ -324,11 +319,14 @@ class Manifest:
             else:
                 self._xml = xml
             self._root = ET.fromstring(self._xml)
+        elif root is not None:
+            self._root = root
+            self._xml = None
         self._pid = os.getpid()
         self._info = {}
 
     def _populate_info(self):
-        ielems = self._root.xpath('v:info', namespaces = XPNS)
+        ielems = xpath.VTSM_INFO(self._root)
         if ielems:
             self._info["host"] = ielems[0].get("host")
             self._info["slice"] = ielems[0].get("slice")
@@ -339,7 +337,7 @@ class Manifest:
 
     @property
     def root (self):
-        if os.getpid() != self._pid:
+        if os.getpid() != self._pid and self._xml is not None:
             self._root = ET.fromstring(self._xml)
             self._pid = os.getpid()
         return self._root
@@ -352,7 +350,7 @@ class Manifest:
     @property
     def pg_circuits (self):
         """Iterator for allocated circuit names on the local PG circuit plane (as strings)."""
-        elems = self._root.xpath("v:datapath/v:port[@shared-lan]", namespaces = XPNS)
+        elems = xpath.VTSM_SHARED_LAN_PORT(self._root)
         for elem in elems:
             yield elem.get("shared-lan")
 
@@ -371,21 +369,21 @@ class Manifest:
     @property
     def containers (self):
         """Iterator over all allocated containers as :py:class:`ManifestContainer` objects."""
-        elems = self._root.xpath("v:container", namespaces = XPNS)
+        elems = xpath.VTSM_CONTAINER(self._root)
         for elem in elems:
             yield ManifestContainer._fromdom(elem)
 
     @property
     def functions (self):
         """Iterator over all allocated functions as :py:class:`ManifestFunction` objects."""
-        elems = self._root.xpath("v:functions/v:function", namespaces = XPNS)
+        elems = xpath.VTSM_FUNCTION(self._root)
         for elem in elems:
             yield ManifestFunction._fromdom(elem)
 
     @property
     def datapaths (self):
         """Iterator over all allocated datapaths as :py:class:`ManifestDatapath` objects."""
-        elems = self._root.xpath("v:datapath", namespaces = XPNS)
+        elems = xpath.VTSM_DATAPATH(self._root)
         for elem in elems:
             yield ManifestDatapath._fromdom(elem)
 
@@ -416,11 +414,11 @@ class Manifest:
         Returns:
             :py:class:`ManifestDatapath`, :py:class:`ManifestContainer`, or `None`
         """
-        dpelems = self._root.xpath("v:datapath[@client_id='%s']" % (client_id), namespaces = XPNS)
+        dpelems = xpath.VTSM_DATAPATH_BY_ID(self._root, client_id = client_id)
         if dpelems:
             return ManifestDatapath._fromdom(dpelems[0])
 
-        ctelems = self._root.xpath("v:container[@client_id='%s']" % (client_id), namespaces = XPNS)
+        ctelems = xpath.VTSM_CONTAINER_BY_ID(self._root, client_id = client_id)
         if ctelems:
             return ManifestContainer._fromdom(ctelems[0])
 
@@ -433,7 +431,7 @@ class Manifest:
         Returns:
             :py:class:`GenericPort` or `None`
         """
-        pelems = self._root.xpath("v:datapath/v:port[@client_id='%s']" % (client_id), namespaces = XPNS)
+        pelems = xpath.VTSM_PORT_BY_ID(self._root, client_id = client_id)
         if pelems:
             return Manifest._buildPort(pelems[0])
 
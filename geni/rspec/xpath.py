@@ -0,0 +1,112 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Precompiled XPath expressions shared by the rspec parsers.
+
+Calling `elem.xpath("...", namespaces = ...)` compiles the expression on every call; the
+:py:class:`lxml.etree.XPath` objects here are compiled once at import time and called
+directly with the context element (`xpath.PG_INTERFACE(elem)`).  Parameterized lookups
+use XPath variables instead of string interpolation, so values never end up in (or break)
+the expression text::
+
+  xpath.VTSM_DATAPATH_BY_ID(root, client_id = "dp0")
+"""
+
+from __future__ import absolute_import
+
+from lxml import etree as ET
+
+from .. import namespaces as GNS
+from .pg import Namespaces as PGNS
+
+# Extension namespaces owned by individual parser modules
+STITCH_NAME = "http://hpn.east.isi.edu/rspec/ext/stitch/0.1/"
+TOPO_NAME = "http://geni.bssoftworks.com/rspec/ext/topo/1"
+VTS_AD_NAME = "http://geni.bssoftworks.com/rspec/ext/vts/ad/1"
+VTS_MANIFEST_NAME = "http://geni.bssoftworks.com/rspec/ext/vts/manifest/1"
+SDN_MANIFEST_NAME = "http://geni.bssoftworks.com/rspec/ext/sdn/manifest/1"
+
+NAMESPACES = {"g" : GNS.REQUEST.name,
+              "s" : GNS.SVLAN.name,
+              "u" : GNS.USER.name,
+              "o" : GNS.OFv3.name,
+              "e" : PGNS.EMULAB.name,
+              "i" : PGNS.INFO.name,
+              "p" : PGNS.PARAMS.name,
+              "t" : STITCH_NAME,
+              "topo" : TOPO_NAME,
+              "va" : VTS_AD_NAME,
+              "vm" : VTS_MANIFEST_NAME,
+              "sdn" : SDN_MANIFEST_NAME}
+
+
+def compile_expr (expr):
+    """Compile `expr` against the shared :py:data:`NAMESPACES` prefix map."""
+    return ET.XPath(expr, namespaces = NAMESPACES)
+
+
+# GENI v3 / ProtoGENI (pgad, pgmanifest)
+PG_AVAILABLE = compile_expr("g:available")
+PG_SLIVER_TYPE = compile_expr("g:sliver_type")
+PG_DISK_IMAGE = compile_expr("g:disk_image")
+PG_HARDWARE_TYPE = compile_expr("g:hardware_type")
+PG_INTERFACE = compile_expr("g:interface")
+PG_INTERFACE_REF = compile_expr("g:interface_ref")
+PG_LOCATION = compile_expr("g:location")
+PG_LINK_TYPE = compile_expr("g:link_type")
+PG_HOST = compile_expr("g:host")
+PG_IP = compile_expr("g:ip")
+PG_SVC_LOGIN = compile_expr("g:services/g:login")
+PG_SVC_USER = compile_expr("g:services/u:services_user")
+PG_PUBLIC_KEY = compile_expr("u:public_key")
+PG_LINK_SHARED_VLAN = compile_expr("s:link_shared_vlan")
+PG_SHARED_VLANS = compile_expr("/g:rspec/s:rspec_shared_vlan/s:available")
+PG_STITCHING = compile_expr("/g:rspec/t:stitching")
+PG_SITE_LOCATION = compile_expr("i:site_info/i:location")
+
+EMULAB_INTERFACE = compile_expr("e:interface")
+EMULAB_NODE_TYPE = compile_expr("e:node_type")
+EMULAB_FD_BY_NAME = compile_expr("e:fd[@name=$name]")
+EMULAB_ROUTABLE_ADDRESSES = compile_expr("/g:rspec/e:rspec_routable_addresses")
+
+# Stitching extension
+STITCH_AGGREGATE = compile_expr("t:aggregate")
+STITCH_MODE = compile_expr("t:stitchingmode")
+STITCH_SCHEDULED_SERVICES = compile_expr("t:scheduledservices")
+STITCH_NEGOTIATED_SERVICES = compile_expr("t:negotiatedservices")
+STITCH_NODE = compile_expr("t:node")
+STITCH_PORT = compile_expr("t:port")
+STITCH_LINK = compile_expr("t:link")
+STITCH_CAPACITY = compile_expr("t:capacity")
+STITCH_REMOTE_LINK_ID = compile_expr("t:remoteLinkId")
+
+# OpenFlow advertisements
+OF_GENI_OF = compile_expr("topo:geni-of")
+OF_PORT = compile_expr("o:port")
+OF_LOCATION = compile_expr("o:location")
+
+# VTS advertisements
+VTSA_TUNNEL_TYPE = compile_expr("va:supported-tunnels/va:tunnel-type")
+VTSA_ENDPOINT = compile_expr("va:endpoint")
+VTSA_CONSTRAINT = compile_expr("va:constraints/va:constraint")
+VTSA_CIRCUIT_PLANE = compile_expr("va:circuit-planes/va:circuit-plane")
+VTSA_IMAGE = compile_expr("va:images/va:image")
+
+# VTS manifests
+VTSM_ENDPOINT = compile_expr("vm:endpoint")
+VTSM_PORT = compile_expr("vm:port")
+VTSM_MOUNT = compile_expr("vm:mount")
+VTSM_MIRROR = compile_expr("vm:mirror")
+VTSM_STP = compile_expr("vm:stp")
+VTSM_INFO = compile_expr("vm:info")
+VTSM_SHARED_LAN_PORT = compile_expr("vm:datapath/vm:port[@shared-lan]")
+VTSM_CONTAINER = compile_expr("vm:container")
+VTSM_FUNCTION = compile_expr("vm:functions/vm:function")
+VTSM_DATAPATH = compile_expr("vm:datapath")
+VTSM_DATAPATH_BY_ID = compile_expr("vm:datapath[@client_id=$client_id]")
+VTSM_CONTAINER_BY_ID = compile_expr("vm:container[@client_id=$client_id]")
+VTSM_PORT_BY_ID = compile_expr("vm:datapath/vm:port[@client_id=$client_id]")
@@ -0,0 +1,10 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+#    This Source Code Form is subject to the terms of the Mozilla Public
+#    License, v. 2.0. If a copy of the MPL was not distributed with this
+#    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Offline stand-ins for testbed services, for load testing and benchmarking geni-lib
+without access to live aggregates.  See :py:mod:`geni.testing.fakeam`.
+"""
@@ -0,0 +1,928 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+#    This Source Code Form is subject to the terms of the Mozilla Public
+#    License, v. 2.0. If a copy of the MPL was not distributed with this
+#    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Local fake aggregate manager and clearinghouse for offline load testing.
+
+:py:class:`FakeAM` serves the AM API v2 (at `/am/2.0`) and v3 (at `/am/3.0`) over HTTPS,
+handing out canned or synthetic advertisements and building manifests from the request
+rspecs it is sent.  :py:class:`FakeCH` serves the CH API v2 (`/CH`, `/MA` and `/SA`)
+with enough state (projects, slices, credentials, aggregate list) for a regular
+:py:class:`geni.aggregate.context.Context` to work against it.  Both require client
+certificates issued by a :py:class:`TestCA`, and can inject latency and errors through
+:py:class:`Faults`.
+
+:py:class:`FakeTestbed` wires all of this together::
+
+  from geni.testing.fakeam import FakeTestbed, Faults
+
+  with FakeTestbed(sites = 10, nodes = 500, faults = Faults(latency = 0.2, busy_rate = 0.05)) as tb:
+    context = tb.context()
+    for (am, ad) in geni.util.iter_advertisements(context, tb.aggregates()):
+      ...
+
+.. note::
+  The credentials handed out are unsigned and are not checked - this is a load
+  generator, not a conformance test.
+"""
+
+# pylint: disable=too-many-arguments,too-many-instance-attributes,unused-argument
+
+import base64
+import datetime
+import ipaddress
+import os
+import os.path
+import random
+import socketserver
+import ssl
+import tempfile
+import threading
+import time
+import uuid
+import zlib
+from xmlrpc.server import MultiPathXMLRPCServer, SimpleXMLRPCDispatcher, SimpleXMLRPCRequestHandler
+
+from lxml import etree as ET
+
+from .. import namespaces as GNS
+from .. import tempfile as GTF
+from ..aggregate import apis # pylint: disable=unused-import
+from ..aggregate import amtypes # pylint: disable=unused-import
+from ..aggregate.context import Context
+from ..aggregate.core import AM
+from ..aggregate.frameworks import CHAPI2
+from ..aggregate.user import User
+from ..rspec.pg import Namespaces as PGNS
+
+DATE_FMT = "%Y-%m-%dT%H:%M:%SZ"
+
+HARDWARE_TYPES = ("d430", "d710", "m400", "c220g2", "pc3000")
+IMAGES = ("urn:publicid:IDN+emulab.net+image+emulab-ops//UBUNTU22-64-STD",
+          "urn:publicid:IDN+emulab.net+image+emulab-ops//UBUNTU20-64-STD",
+          "urn:publicid:IDN+emulab.net+image+emulab-ops//CENTOS8-64-STD")
+
+
+class TestCA(object):
+    """Throwaway certificate authority issuing server and client certificates.
+
+    Keys and certificates are written as PEM files under `path` (by default a directory
+    that is removed when the process exits)."""
+
+    def __init__ (self, path = None):
+        # pylint: disable=import-outside-toplevel
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.x509.oid import NameOID
+
+        if path is None:
+            path = tempfile.mkdtemp(dir = GTF.TFM.path)
+        self.path = path
+        self._issued = {}
+
+        self._key = self._new_key()
+        name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "geni-lib test CA")])
+        now = datetime.datetime.now(datetime.timezone.utc)
+        self._cert = (x509.CertificateBuilder()
+                      .subject_name(name).issuer_name(name)
+                      .public_key(self._key.public_key())
+                      .serial_number(x509.random_serial_number())
+                      .not_valid_before(now - datetime.timedelta(days = 1))
+                      .not_valid_after(now + datetime.timedelta(days = 30))
+                      .add_extension(x509.BasicConstraints(ca = True, path_length = None), critical = True)
+                      .sign(self._key, hashes.SHA256()))
+        self.ca_path = self._write("ca.pem", self._pem(self._cert))
+
+    @staticmethod
+    def _new_key ():
+        # pylint: disable=import-outside-toplevel
+        from cryptography.hazmat.primitives.asymmetric import ec
+        return ec.generate_private_key(ec.SECP256R1())
+
+    @staticmethod
+    def _pem (obj):
+        # pylint: disable=import-outside-toplevel
+        from cryptography.hazmat.primitives import serialization
+        if hasattr(obj, "private_bytes"):
+            return obj.private_bytes(serialization.Encoding.PEM, serialization.PrivateFormat.TraditionalOpenSSL,
+                                     serialization.NoEncryption())
+        return obj.public_bytes(serialization.Encoding.PEM)
+
+    def _write (self, name, data):
+        path = os.path.join(self.path, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def issue (self, name, hosts = (), uris = (), client = False):
+        """Issue a certificate, returning `(cert_path, key_path)`.
+
+        Args:
+          name (str): Common name, also used for the file names
+          hosts (list): Host names and IP addresses for the subjectAltName
+          uris (list): URIs (such as a GENI user URN) for the subjectAltName
+          client (bool): Issue a client (rather than server) certificate
+        """
+        if name in self._issued:
+            return self._issued[name]
+
+        # pylint: disable=import-outside-toplevel
+        from cryptography import x509
+        from cryptography.hazmat.primitives import hashes
+        from cryptography.x509.oid import NameOID, ExtendedKeyUsageOID
+
+        sans = []
+        for host in hosts:
+            try:
+                sans.append(x509.IPAddress(ipaddress.ip_address(host)))
+            except ValueError:
+                sans.append(x509.DNSName(host))
+        sans.extend([x509.UniformResourceIdentifier(uri) for uri in uris])
+
+        key = self._new_key()
+        now = datetime.datetime.now(datetime.timezone.utc)
+        usage = ExtendedKeyUsageOID.CLIENT_AUTH if client else ExtendedKeyUsageOID.SERVER_AUTH
+        builder = (x509.CertificateBuilder()
+                   .subject_name(x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, name)]))
+                   .issuer_name(self._cert.subject)
+                   .public_key(key.public_key())
+                   .serial_number(x509.random_serial_number())
+                   .not_valid_before(now - datetime.timedelta(days = 1))
+                   .not_valid_after(now + datetime.timedelta(days = 30))
+                   .add_extension(x509.ExtendedKeyUsage([usage]), critical = False))
+        if sans:
+            builder = builder.add_extension(x509.SubjectAlternativeName(sans), critical = False)
+        cert = builder.sign(self._key, hashes.SHA256())
+
+        paths = (self._write(f"{name}-cert.pem", self._pem(cert)), self._write(f"{name}-key.pem", self._pem(key)))
+        self._issued[name] = paths
+        return paths
+
+    def ssh_public_key (self, name):
+        """Write a throwaway SSH public key for `name`, returning its path."""
+        # pylint: disable=import-outside-toplevel
+        from cryptography.hazmat.primitives import serialization
+        from cryptography.hazmat.primitives.asymmetric import ed25519
+        pub = ed25519.Ed25519PrivateKey.generate().public_key().public_bytes(serialization.Encoding.OpenSSH,
+                                                                              serialization.PublicFormat.OpenSSH)
+        return self._write(f"{name}.pub", pub + b" " + name.encode("utf-8") + b"\n")
+
+
+class Faults(object):
+    """Latency and error injection settings for fake servers.
+
+    Args:
+      latency: Seconds to delay every call - a number, a dict of `{method_name : seconds}`,
+        or a callable taking the method name
+      jitter (float): Additional uniformly distributed random delay, in seconds
+      error_rate (float): Probability of a call failing with a generic error result
+      busy_rate (float): Probability of an AM call being rejected as busy (ProtoGENI am_code 14)
+      http_error_rate (float): Probability of a request failing with HTTP 503
+      seed: Seed for the random number generator, for repeatable runs
+    """
+
+    def __init__ (self, latency = 0.0, jitter = 0.0, error_rate = 0.0, busy_rate = 0.0, http_error_rate = 0.0,
+                  seed = None):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.busy_rate = busy_rate
+        self.http_error_rate = http_error_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def _roll (self, rate):
+        if not rate:
+            return False
+        with self._lock:
+            return self._rng.random() < rate
+
+    def delay (self, method):
+        if callable(self.latency):
+            delay = self.latency(method)
+        elif isinstance(self.latency, dict):
+            delay = self.latency.get(method, 0.0)
+        else:
+            delay = self.latency
+        if self.jitter:
+            with self._lock:
+                delay += self._rng.uniform(0, self.jitter)
+        return delay
+
+    def http_error (self):
+        return self._roll(self.http_error_rate)
+
+    def outcome (self):
+        """Return `"busy"`, `"error"` or `None` for a single call."""
+        if self._roll(self.busy_rate):
+            return "busy"
+        if self._roll(self.error_rate):
+            return "error"
+        return None
+
+
+def _timestamp (delta):
+    return (datetime.datetime.utcnow() + delta).strftime(DATE_FMT)
+
+def _urn (authority, typ, name):
+    return f"urn:publicid:IDN+{authority}+{typ}+{name}"
+
+def _tag (ns, name):
+    return f"{{{ns.name}}}{name}"
+
+
+def synthetic_advertisement (nodes = 100, site = "fake.example.net", links = 0, hardware_types = HARDWARE_TYPES,
+                             images = IMAGES, available = 0.75, seed = 0):
+    """Build a ProtoGENI-style advertisement rspec.
+
+    Args:
+      nodes (int): Number of nodes
+      site (str): Authority name used in component URNs
+      links (int): Number of LANs, each joining a few nodes
+      hardware_types (list): Hardware type names, assigned round-robin
+      images (list): Disk image URNs offered on every node
+      available (float): Fraction of nodes that are available
+      seed: Random seed for availability and locations
+
+    Returns:
+      str: The advertisement XML
+    """
+    rng = random.Random(seed)
+    cmid = _urn(site, "authority", "cm")
+    root = ET.Element(_tag(GNS.REQUEST, "rspec"), nsmap = {None : GNS.REQUEST.name, "emulab" : PGNS.EMULAB.name})
+    root.set("type", "advertisement")
+    root.set("generated", _timestamp(datetime.timedelta()))
+    root.set("expires", _timestamp(datetime.timedelta(hours = 1)))
+
+    (lat, lon) = (rng.uniform(25, 48), rng.uniform(-122, -72))
+    for idx in range(nodes):
+        name = f"pc{idx}"
+        shared = (idx % 10 == 9)
+        node = ET.SubElement(root, _tag(GNS.REQUEST, "node"))
+        node.set("component_id", _urn(site, "node", name))
+        node.set("component_manager_id", cmid)
+        node.set("component_name", name)
+        node.set("exclusive", "false" if shared else "true")
+
+        htype = ET.SubElement(node, _tag(GNS.REQUEST, "hardware_type"))
+        htype.set("name", hardware_types[idx % len(hardware_types)])
+        ET.SubElement(htype, _tag(PGNS.EMULAB, "node_type")).set("type_slots", "10" if shared else "1")
+
+        for stype_name in (("emulab-xen",) if shared else ("raw-pc", "emulab-xen")):
+            stype = ET.SubElement(node, _tag(GNS.REQUEST, "sliver_type"))
+            stype.set("name", stype_name)
+            for image in images:
+                ET.SubElement(stype, _tag(GNS.REQUEST, "disk_image")).set("name", image)
+
+        ET.SubElement(node, _tag(GNS.REQUEST, "available")).set("now", "true" if rng.random() < available else "false")
+
+        loc = ET.SubElement(node, _tag(GNS.REQUEST, "location"))
+        loc.set("country", "US")
+        loc.set("latitude", "%.5f" % (lat + rng.uniform(-0.01, 0.01)))
+        loc.set("longitude", "%.5f" % (lon + rng.uniform(-0.01, 0.01)))
+
+        for (fd, weight) in (("cpu", "2400"), ("ram", "65536")):
+            fde = ET.SubElement(node, _tag(PGNS.EMULAB, "fd"))
+            fde.set("name", fd)
+            fde.set("weight", weight)
+        if shared:
+            ET.SubElement(node, _tag(PGNS.EMULAB, "fd")).set("name", "pcshared")
+
+        for port in range(2):
+            intf = ET.SubElement(node, _tag(GNS.REQUEST, "interface"))
+            intf.set("component_id", _urn(site, "interface", f"{name}:eth{port}"))
+            intf.set("role", "control" if port == 0 else "experimental")
+            ET.SubElement(intf, _tag(PGNS.EMULAB, "interface")).set("name", f"eth{port}")
+
+    for idx in range(links):
+        link = ET.SubElement(root, _tag(GNS.REQUEST, "link"))
+        link.set("component_id", _urn(site, "link", f"lan{idx}"))
+        ET.SubElement(link, _tag(GNS.REQUEST, "link_type")).set("name", "lan")
+        for member in range(min(4, nodes)):
+            iref = ET.SubElement(link, _tag(GNS.REQUEST, "interface_ref"))
+            iref.set("component_id", _urn(site, "interface", f"pc{(idx * 4 + member) % nodes}:eth1"))
+
+    return ET.tostring(root, xml_declaration = True, encoding = "UTF-8").decode("utf-8")
+
+
+def synthetic_manifest (request, slice_urn, site = "fake.example.net", username = "geniuser"):
+    """Turn a request rspec into the manifest a ProtoGENI aggregate would return for it.
+
+    Args:
+      request (str): Request rspec XML
+      slice_urn (str): URN of the slice the slivers belong to
+      site (str): Authority name used in component and sliver URNs
+      username (str): Login name advertised in the node services
+
+    Returns:
+      str: The manifest XML
+    """
+    root = ET.fromstring(request.encode("utf-8") if isinstance(request, str) else request)
+    root.set("type", "manifest")
+    root.set("expires", _timestamp(datetime.timedelta(hours = 4)))
+    sname = slice_urn.split("+")[-1]
+
+    def _sliver (elem, typ):
+        elem.set("sliver_id", _urn(site, "sliver", f"{typ}-{uuid.uuid4().hex[:12]}"))
+
+    for (idx, node) in enumerate(root.iter(_tag(GNS.REQUEST, "node"))):
+        client_id = node.get("client_id", f"node-{idx}")
+        if node.get("component_id") is None:
+            node.set("component_id", _urn(site, "node", f"pc{idx}"))
+        node.set("component_manager_id", _urn(site, "authority", "cm"))
+        _sliver(node, "node")
+        services = node.find(_tag(GNS.REQUEST, "services"))
+        if services is None:
+            services = ET.SubElement(node, _tag(GNS.REQUEST, "services"))
+        login = ET.SubElement(services, _tag(GNS.REQUEST, "login"))
+        login.set("authentication", "ssh-keys")
+        login.set("hostname", f"{client_id}.{sname}.{site}")
+        login.set("port", "22")
+        login.set("username", username)
+        ET.SubElement(node, _tag(GNS.REQUEST, "host")).set("name", f"{client_id}.{sname}.{site}")
+        for (port, intf) in enumerate(node.iter(_tag(GNS.REQUEST, "interface"))):
+            _sliver(intf, "interface")
+            intf.set("component_id", _urn(site, "interface", f"pc{idx}:eth{port + 1}"))
+            intf.set("mac_address", "02%010x" % (random.getrandbits(40)))
+
+    for link in root.iter(_tag(GNS.REQUEST, "link")):
+        _sliver(link, "link")
+        link.set("vlantag", str(random.randint(257, 4000)))
+
+    return ET.tostring(root, xml_declaration = True, encoding = "UTF-8").decode("utf-8")
+
+
+def credential (owner_urn, target_urn, expires):
+    """Build an (unsigned) GENI privilege credential."""
+    root = ET.Element("signed-credential")
+    cred = ET.SubElement(root, "credential")
+    cred.set("{http://www.w3.org/XML/1998/namespace}id", "ref0")
+    for (name, value) in (("type", "privilege"), ("serial", "1"), ("owner_urn", owner_urn),
+                          ("target_urn", target_urn), ("uuid", str(uuid.uuid4())),
+                          ("expires", expires.strftime(DATE_FMT))):
+        ET.SubElement(cred, name).text = value
+    priv = ET.SubElement(ET.SubElement(cred, "privileges"), "privilege")
+    ET.SubElement(priv, "name").text = "*"
+    ET.SubElement(priv, "can_delegate").text = "true"
+    return ET.tostring(root, xml_declaration = True, encoding = "UTF-8").decode("utf-8")
+
+
+class _Handler(SimpleXMLRPCRequestHandler):
+    rpc_paths = ()
+    protocol_version = "HTTP/1.1"
+
+    def do_POST (self):
+        if self.server.faults.http_error():
+            self.rfile.read(int(self.headers.get("content-length", 0)))
+            self.send_response(503)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        super().do_POST()
+
+    def log_message (self, format, *args): # pylint: disable=redefined-builtin
+        pass
+
+
+class _Server(socketserver.ThreadingMixIn, MultiPathXMLRPCServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+
+class _FakeServer(object):
+    def __init__ (self, ca = None, host = "127.0.0.1", port = 0, faults = None, require_client_cert = True):
+        self.ca = ca if ca is not None else TestCA()
+        self.host = host
+        self.faults = faults if faults is not None else Faults()
+        self.require_client_cert = require_client_cert
+        self.calls = 0
+        self._port = port
+        self._server = None
+        self._thread = None
+
+    def _dispatchers (self):
+        """Return a dict of `{path : {method_name : function}}`."""
+        raise NotImplementedError()
+
+    def _failure (self, outcome, method):
+        raise NotImplementedError()
+
+    def _wrap (self, method, func):
+        def call (*args):
+            self.calls += 1
+            delay = self.faults.delay(method)
+            if delay:
+                time.sleep(delay)
+            outcome = self.faults.outcome()
+            if outcome is not None:
+                return self._failure(outcome, method)
+            return func(*args)
+        return call
+
+    @property
+    def port (self):
+        return self._server.server_address[1] if self._server else self._port
+
+    @property
+    def url (self):
+        return f"https://{self.host}:{self.port}"
+
+    def start (self):
+        self._server = _Server((self.host, self._port), _Handler, logRequests = False, allow_none = True)
+        self._server.faults = self.faults
+        for (path, methods) in self._dispatchers().items():
+            dispatcher = SimpleXMLRPCDispatcher(allow_none = True, encoding = None)
+            for (name, func) in methods.items():
+                dispatcher.register_function(self._wrap(name, func), name)
+            self._server.add_dispatcher(path, dispatcher)
+
+        (cert, key) = self.ca.issue(f"server-{self.host}", hosts = [self.host, "localhost"])
+        ctx = ssl.SSLContext(ssl.PROTOCOL_TLS_SERVER)
+        ctx.load_cert_chain(cert, key)
+        if self.require_client_cert:
+            ctx.load_verify_locations(self.ca.ca_path)
+            ctx.verify_mode = ssl.CERT_REQUIRED
+        # Handshake in the per-connection thread, not in the accept loop
+        self._server.socket = ctx.wrap_socket(self._server.socket, server_side = True,
+                                              do_handshake_on_connect = False)
+
+        self._thread = threading.Thread(target = self._server.serve_forever, daemon = True)
+        self._thread.start()
+        return self
+
+    def stop (self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__ (self):
+        return self.start()
+
+    def __exit__ (self, *args):
+        self.stop()
+
+
+class FakeAM(_FakeServer):
+    """Fake ProtoGENI-style aggregate manager.
+
+    Args:
+      name (str): Short name, also used to build the site authority (`<name>.fake.geni`)
+      ca (TestCA): Certificate authority to use (a new one is created if not supplied)
+      advertisement (str): Advertisement XML to serve; a synthetic one is generated if not supplied
+      nodes (int): Size of the synthetic advertisement
+      links (int): Number of LANs in the synthetic advertisement
+      faults (Faults): Latency and error injection settings
+      seed: Random seed for the synthetic advertisement
+    """
+
+    def __init__ (self, name = "fake", ca = None, advertisement = None, nodes = 100, links = 0, faults = None,
+                  seed = 0, **kwargs):
+        super().__init__(ca, faults = faults, **kwargs)
+        self.name = name
+        self.site = f"{name}.fake.geni"
+        self.cmid = _urn(self.site, "authority", "cm")
+        if advertisement is None:
+            advertisement = synthetic_advertisement(nodes, self.site, links, seed = seed)
+        self.advertisement = advertisement
+        self._compressed = None
+        self._slivers = {}
+        self._lock = threading.Lock()
+
+    @property
+    def url_v3 (self):
+        return f"{self.url}/am/3.0"
+
+    @property
+    def url_v2 (self):
+        return f"{self.url}/am/2.0"
+
+    def aggregate (self, name = None, api = "amapiv2"):
+        """Return a :py:class:`geni.aggregate.core.AM` pointing at this server."""
+        url = self.url_v3 if api == "amapiv3" else self.url_v2
+        return AM(name or self.name, url, api, "pg", self.cmid)
+
+    def _code (self, geni_code, am_code):
+        return {"geni_code" : geni_code, "am_type" : "protogeni", "am_code" : am_code,
+                "protogeni_error_url" : f"{self.url}/spewlogfile.php3?logfile={uuid.uuid4().hex}"}
+
+    def _result (self, value, output = ""):
+        return {"code" : self._code(0, 0), "value" : value, "output" : output}
+
+    def _error (self, geni_code, output, am_code = None):
+        return {"code" : self._code(geni_code, geni_code if am_code is None else am_code), "value" : 0, "output" : output}
+
+    def _failure (self, outcome, method):
+        if outcome == "busy":
+            return self._error(14, "Server is busy; try again later")
+        return self._error(2, f"Injected failure in {method}")
+
+    def _username (self, users):
+        for user in users or []:
+            if user.get("urn"):
+                return user["urn"].split("+")[-1]
+        return "geniuser"
+
+    def _manifest (self, slice_urn):
+        with self._lock:
+            return self._slivers.get(slice_urn)
+
+    def _sliver_info (self, slice_urn, status = "geni_ready"):
+        (_, expires) = self._slivers[slice_urn]
+        return [{"geni_sliver_urn" : _urn(self.site, "sliver", slice_urn.split("+")[-1]),
+                 "geni_expires" : expires, "geni_allocation_status" : "geni_provisioned",
+                 "geni_operational_status" : status, "geni_error" : ""}]
+
+    def _allocate (self, slice_urn, rspec, users = None):
+        try:
+            manifest = synthetic_manifest(rspec, slice_urn, self.site, self._username(users))
+        except ET.XMLSyntaxError as e:
+            return None, self._error(1, f"Bad request rspec: {e}")
+        with self._lock:
+            self._slivers[slice_urn] = (manifest, _timestamp(datetime.timedelta(hours = 4)))
+        return manifest, None
+
+    def _slice_from_urns (self, urns):
+        for urn in urns:
+            if urn in self._slivers:
+                return urn
+        return None
+
+    ### AM API v2
+    def get_version (self, options = None):
+        return self._result({"geni_api" : 2 if options is None else 3,
+                             "geni_api_versions" : {"2" : self.url_v2, "3" : self.url_v3},
+                             "geni_request_rspec_versions" : [{"type" : "GENI", "version" : "3"}],
+                             "geni_ad_rspec_versions" : [{"type" : "GENI", "version" : "3"}],
+                             "urn" : self.cmid, "hrn" : self.site})
+
+    def list_resources (self, creds, options):
+        slice_urn = options.get("geni_slice_urn")
+        if slice_urn:
+            entry = self._manifest(slice_urn)
+            if entry is None:
+                return self._error(12, f"No such slice here: {slice_urn}")
+            return self._result(entry[0])
+
+        if options.get("geni_compressed"):
+            if self._compressed is None:
+                self._compressed = base64.b64encode(zlib.compress(self.advertisement.encode("utf-8"))).decode("ascii")
+            return self._result(self._compressed)
+        return self._result(self.advertisement)
+
+    def create_sliver (self, slice_urn, creds, rspec, users, options):
+        (manifest, err) = self._allocate(slice_urn, rspec, users)
+        return err if err else self._result(manifest)
+
+    def sliver_status (self, slice_urn, creds, options):
+        if self._manifest(slice_urn) is None:
+            return self._error(12, f"No such slice here: {slice_urn}")
+        return self._result({"geni_urn" : slice_urn, "geni_status" : "ready", "pg_status" : "ready",
+                             "geni_resources" : [{"geni_urn" : s["geni_sliver_urn"], "geni_status" : "ready",
+                                                  "geni_error" : ""} for s in self._sliver_info(slice_urn)]})
+
+    def renew_sliver (self, slice_urn, creds, date, options):
+        with self._lock:
+            if slice_urn not in self._slivers:
+                return self._error(12, f"No such slice here: {slice_urn}")
+            self._slivers[slice_urn] = (self._slivers[slice_urn][0], date)
+        return self._result(True)
+
+    def delete_sliver (self, slice_urn, creds, options):
+        with self._lock:
+            if self._slivers.pop(slice_urn, None) is None:
+                return self._error(12, f"No such slice here: {slice_urn}")
+        return self._result(True)
+
+    def list_images (self, owner_urn, creds, options):
+        return self._result([{"urn" : image, "url" : image} for image in IMAGES])
+
+    ### AM API v3
+    def allocate (self, slice_urn, creds, rspec, options):
+        (manifest, err) = self._allocate(slice_urn, rspec)
+        if err:
+            return err
+        return self._result({"geni_rspec" : manifest, "geni_slivers" : self._sliver_info(slice_urn, "geni_notready")})
+
+    def provision (self, urns, creds, options):
+        slice_urn = self._slice_from_urns(urns)
+        if slice_urn is None:
+            return self._error(12, "No slivers found")
+        return self._result({"geni_rspec" : self._slivers[slice_urn][0], "geni_slivers" : self._sliver_info(slice_urn)})
+
+    def status (self, urns, creds, options):
+        slice_urn = self._slice_from_urns(urns)
+        if slice_urn is None:
+            return self._error(12, "No slivers found")
+        return self._result({"geni_urn" : slice_urn, "geni_slivers" : self._sliver_info(slice_urn)})
+
+    def describe (self, urns, creds, options):
+        slice_urn = self._slice_from_urns(urns)
+        if slice_urn is None:
+            return self._error(12, "No slivers found")
+        return self._result({"geni_rspec" : self._slivers[slice_urn][0], "geni_urn" : slice_urn,
+                             "geni_slivers" : self._sliver_info(slice_urn)})
+
+    def perform_operational_action (self, urns, creds, action, options):
+        slice_urn = self._slice_from_urns(urns)
+        if slice_urn is None:
+            return self._error(12, "No slivers found")
+        return self._result(self._sliver_info(slice_urn))
+
+    def perform_aggregate_action (self, action, options):
+        return self._result({})
+
+    def delete (self, urns, creds, options):
+        slice_urn = self._slice_from_urns(urns)
+        if slice_urn is None:
+            return self._error(12, "No slivers found")
+        info = self._sliver_info(slice_urn, "geni_notready")
+        with self._lock:
+            self._slivers.pop(slice_urn, None)
+        return self._result(info)
+
+    def _dispatchers (self):
+        v2 = {"GetVersion" : lambda options = None: self.get_version(),
+              "ListResources" : self.list_resources,
+              "CreateSliver" : self.create_sliver,
+              "SliverStatus" : self.sliver_status,
+              "RenewSliver" : self.renew_sliver,
+              "DeleteSliver" : self.delete_sliver,
+              "ListImages" : self.list_images}
+        v3 = {"GetVersion" : lambda options = None: self.get_version(options or {}),
+              "ListResources" : self.list_resources,
+              "Allocate" : self.allocate,
+              "Provision" : self.provision,
+              "Status" : self.status,
+              "Describe" : self.describe,
+              "PerformOperationalAction" : self.perform_operational_action,
+              "PerformAggregateAction" : self.perform_aggregate_action,
+              "Delete" : self.delete}
+        return {"/am/2.0" : v2, "/am/3.0" : v3}
+
+
+class FakeCH(_FakeServer):
+    """Fake CH API v2 clearinghouse (member and slice authority).
+
+    Args:
+      ca (TestCA): Certificate authority to use (a new one is created if not supplied)
+      authority (str): Authority name used in project, slice and member URNs
+      aggregates (list): :py:class:`FakeAM` instances to report from service lookups
+      faults (Faults): Latency and error injection settings
+    """
+
+    def __init__ (self, ca = None, authority = "fake.geni", aggregates = (), faults = None, **kwargs):
+        super().__init__(ca, faults = faults, **kwargs)
+        self.authority = authority
+        self.aggregates = list(aggregates)
+        self.projects = {}
+        self.slices = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _result (value):
+        return {"code" : 0, "value" : value, "output" : ""}
+
+    @staticmethod
+    def _error (code, output):
+        return {"code" : code, "value" : None, "output" : output}
+
+    def _failure (self, outcome, method):
+        return self._error(2, f"Injected failure in {method}")
+
+    def project_urn (self, name):
+        return _urn(self.authority, "project", name)
+
+    def slice_urn (self, name, project):
+        return f"urn:publicid:IDN+{self.authority}:{project}+slice+{name}"
+
+    def add_project (self, name, member_urn = None):
+        urn = self.project_urn(name)
+        with self._lock:
+            self.projects.setdefault(urn, {"PROJECT_URN" : urn, "PROJECT_UID" : str(uuid.uuid4()), "PROJECT_NAME" : name,
+                                           "PROJECT_EXPIRED" : False, "PROJECT_EXPIRATION" : None,
+                                           "PROJECT_DESCRIPTION" : "", "_MEMBERS" : {}})
+            if member_urn:
+                self.projects[urn]["_MEMBERS"][member_urn] = "MEMBER"
+        return urn
+
+    def _service (self, am):
+        return {"SERVICE_URN" : am.cmid, "SERVICE_URL" : am.url_v2, "SERVICE_NAME" : am.name,
+                "SERVICE_DESCRIPTION" : f"Fake aggregate {am.name}", "SERVICE_TYPE" : "AGGREGATE_MANAGER",
+                "_GENI_SERVICE_SHORT_NAME" : am.name,
+                "_GENI_SERVICE_ATTRIBUTES" : {"UI_AM_TYPE" : "ui_instageni_am"}}
+
+    @staticmethod
+    def _matches (entry, match):
+        for (key, value) in (match or {}).items():
+            if isinstance(value, list):
+                if entry.get(key) not in value:
+                    return False
+            elif entry.get(key) != value:
+                return False
+        return True
+
+    @staticmethod
+    def _public (entry):
+        return {k : v for (k, v) in entry.items() if not k.startswith("_") and v is not None}
+
+    def get_version (self):
+        return self._result({"VERSION" : "2", "SERVICES" : ["MEMBER", "SLICE", "PROJECT", "SERVICE"],
+                             "CREDENTIAL_TYPES" : [{"type" : "geni_sfa", "version" : "3"}]})
+
+    def lookup (self, typ, creds, options):
+        match = options.get("match")
+        if typ == "SERVICE":
+            return self._result([s for s in (self._service(am) for am in self.aggregates) if self._matches(s, match)])
+        if typ == "PROJECT":
+            table = self.projects
+        elif typ == "SLICE":
+            table = self.slices
+        else:
+            return self._result({})
+        with self._lock:
+            return self._result({urn : self._public(e) for (urn, e) in table.items() if self._matches(e, match)})
+
+    def get_credentials (self, target_urn, creds, options):
+        expires = datetime.datetime.utcnow() + datetime.timedelta(days = 7)
+        if "+slice+" in target_urn:
+            with self._lock:
+                entry = self.slices.get(target_urn)
+            if entry is None:
+                return self._error(3, f"No such slice: {target_urn}")
+            expires = datetime.datetime.strptime(entry["SLICE_EXPIRATION"], DATE_FMT)
+            owner = entry["_OWNER"]
+        else:
+            owner = target_urn
+        return self._result([{"geni_type" : "geni_sfa", "geni_version" : "3",
+                              "geni_value" : credential(owner, target_urn, expires)}])
+
+    def create (self, typ, creds, options):
+        fields = options.get("fields", {})
+        if typ == "PROJECT":
+            urn = self.add_project(fields["PROJECT_NAME"])
+            return self._result(self._public(self.projects[urn]))
+        if typ == "SLICE":
+            project_urn = fields.get("SLICE_PROJECT_URN")
+            project = project_urn.split("+")[-1] if project_urn else "default"
+            urn = self.slice_urn(fields["SLICE_NAME"], project)
+            expires = fields.get("SLICE_EXPIRATION", _timestamp(datetime.timedelta(days = 7)))
+            with self._lock:
+                if urn in self.slices:
+                    return self._error(5, f"Slice already exists: {urn}")
+                self.slices[urn] = {"SLICE_URN" : urn, "SLICE_UID" : str(uuid.uuid4()), "SLICE_NAME" : fields["SLICE_NAME"],
+                                    "SLICE_PROJECT_URN" : project_urn, "SLICE_EXPIRATION" : expires,
+                                    "SLICE_EXPIRED" : False, "SLICE_DESCRIPTION" : fields.get("SLICE_DESCRIPTION", ""),
+                                    "_OWNER" : self._owner(creds), "_MEMBERS" : {}}
+                return self._result(self._public(self.slices[urn]))
+        return self._result({})
+
+    def _owner (self, creds):
+        for cred in creds or []:
+            try:
+                return ET.fromstring(cred["geni_value"].encode("utf-8")).findtext("credential/owner_urn")
+            except (KeyError, TypeError, ET.XMLSyntaxError):
+                continue
+        return _urn(self.authority, "user", "unknown")
+
+    def update (self, typ, urn, creds, options):
+        table = self.slices if typ == "SLICE" else self.projects
+        with self._lock:
+            if urn not in table:
+                return self._error(3, f"No such {typ.lower()}: {urn}")
+            table[urn].update(options.get("fields", {}))
+        return self._result(None)
+
+    def delete (self, typ, urn, creds, options):
+        table = self.slices if typ == "SLICE" else self.projects
+        with self._lock:
+            table.pop(urn, None)
+        return self._result(None)
+
+    def lookup_for_member (self, typ, member_urn, creds, options):
+        table = self.slices if typ == "SLICE" else self.projects
+        prefix = typ
+        with self._lock:
+            return self._result([{f"{prefix}_URN" : urn, f"{prefix}_UID" : e[f"{prefix}_UID"],
+                                  f"{prefix}_ROLE" : e["_MEMBERS"].get(member_urn, "MEMBER"),
+                                  f"{prefix}_EXPIRED" : e.get(f"{prefix}_EXPIRED", False)}
+                                 for (urn, e) in table.items() if member_urn in e["_MEMBERS"] or typ == "SLICE"])
+
+    def lookup_members (self, typ, urn, creds, options):
+        table = self.slices if typ == "SLICE" else self.projects
+        with self._lock:
+            members = dict(table.get(urn, {}).get("_MEMBERS", {}))
+        return self._result([{f"{typ}_MEMBER" : m, f"{typ}_ROLE" : role} for (m, role) in members.items()])
+
+    def modify_membership (self, typ, urn, creds, options):
+        table = self.slices if typ == "SLICE" else self.projects
+        with self._lock:
+            if urn not in table:
+                return self._error(3, f"No such {typ.lower()}: {urn}")
+            members = table[urn]["_MEMBERS"]
+            for entry in options.get("members_to_add", []) + options.get("members_to_change", []):
+                members[entry[f"{typ}_MEMBER"]] = entry[f"{typ}_ROLE"]
+            for member in options.get("members_to_remove", []):
+                members.pop(member, None)
+        return self._result(None)
+
+    def _dispatchers (self):
+        methods = {"get_version" : self.get_version,
+                   "lookup" : self.lookup,
+                   "get_credentials" : self.get_credentials,
+                   "create" : self.create,
+                   "update" : self.update,
+                   "delete" : self.delete,
+                   "lookup_for_member" : self.lookup_for_member,
+                   "lookup_members" : self.lookup_members,
+                   "modify_membership" : self.modify_membership}
+        return {"/CH" : methods, "/MA" : methods, "/SA" : methods}
+
+
+class FakeFramework(CHAPI2):
+    """CH API v2 framework pointing at a :py:class:`FakeCH`."""
+
+    def __init__ (self, ch):
+        super().__init__("fake-ch2")
+        self._fakech = ch
+        self._authority = ch.authority
+        self._ch = f"{ch.url}/CH"
+        self._ma = f"{ch.url}/MA"
+        self._sa = f"{ch.url}/SA"
+
+    @property
+    def projecturn (self):
+        return self.projectNameToURN(self.project)
+
+    def projectNameToURN (self, name):
+        return self._fakech.project_urn(name)
+
+    def sliceNameToURN (self, name, project = None):
+        return self._fakech.slice_urn(name, project or self.project)
+
+
+def make_context (ch, datadir = None, project = "fakeproject", username = "fakeuser"):
+    """Build a :py:class:`geni.aggregate.context.Context` for a user of the given (started)
+    :py:class:`FakeCH`, with a client certificate from its :py:class:`TestCA`."""
+    user_urn = _urn(ch.authority, "user", username)
+    (cert, key) = ch.ca.issue(f"user-{username}", uris = [user_urn], client = True)
+    ch.add_project(project, user_urn)
+
+    framework = FakeFramework(ch)
+    framework.cert = cert
+    framework.key = key
+
+    context = Context()
+    context.cf = framework
+    context.datadir = datadir if datadir is not None else tempfile.mkdtemp(dir = GTF.TFM.path)
+    user = User()
+    user.name = username
+    user.urn = user_urn
+    user.add_key(ch.ca.ssh_public_key(username))
+    context.add_user(user)
+    context.project = project
+    return context
+
+
+class FakeTestbed(object):
+    """A :py:class:`FakeCH` and a number of :py:class:`FakeAM` sites sharing one :py:class:`TestCA`.
+
+    Args:
+      sites (int): Number of aggregates to run
+      nodes (int): Size of each synthetic advertisement
+      faults (Faults): Latency and error injection settings for every aggregate
+      ch_faults (Faults): Latency and error injection settings for the clearinghouse
+      **kwargs: Additional arguments for every :py:class:`FakeAM`
+    """
+
+    def __init__ (self, sites = 1, nodes = 100, faults = None, ch_faults = None, **kwargs):
+        self.ca = TestCA()
+        self.ams = [FakeAM(f"site{idx}", self.ca, nodes = nodes, faults = faults, seed = idx, **kwargs)
+                    for idx in range(sites)]
+        self.ch = FakeCH(self.ca, aggregates = self.ams, faults = ch_faults)
+
+    def start (self):
+        for server in [self.ch] + self.ams:
+            server.start()
+        return self
+
+    def stop (self):
+        for server in [self.ch] + self.ams:
+            server.stop()
+
+    def __enter__ (self):
+        return self.start()
+
+    def __exit__ (self, *args):
+        self.stop()
+
+    def context (self, **kwargs):
+        """Build a context for this testbed, see :py:func:`make_context`."""
+        return make_context(self.ch, **kwargs)
+
+    def aggregates (self, api = "amapiv2"):
+        """Return :py:class:`geni.aggregate.core.AM` objects for every site."""
+        return [am.aggregate(api = api) for am in self.ams]
@@ -6,16 +6,16 @@
 
 # pylint: disable=too-many-arguments,fixme
 
+import concurrent.futures as CF
 import datetime
+import functools
+import itertools
 import json
-import multiprocessing as MP
 import os
 import os.path
 import shutil
 import subprocess
-import tempfile
 import time
-import traceback as tb
 import zipfile
 import logging
 import six
@@ -98,98 +98,166 @@ requested from the given aggregate."""
             print(f'[{client_id}][{info["username"]}] {info["hostname"]}:{info["port"]}')
 
 
-# You can't put very much information in a queue before you hang your OS
-# trying to write to the pipe, so we only write the paths and then load
-# them again on the backside
-def _mp_get_manifest(context, site, slc, queue):
+def _iter_bounded(tasks, max_workers = None, timeout = None):
+    """Run `(key, callable)` tasks on at most `max_workers` threads at a time, yielding
+    `(key, result)` pairs in completion order.  A task that raises yields its exception as
+    the result, and a task still running `timeout` seconds after it started yields a
+    :py:class:`TimeoutError`.  Its thread is abandoned, not interrupted, and no longer
+    counts against `max_workers`, so the remaining tasks are not held up behind it."""
+
+    tasks = list(tasks)
+    if not tasks:
+        return
+
+    started = {}
+    def run(idx, func):
+        started[idx] = time.monotonic()
+        return func()
+
+    limit = max_workers or min(32, len(tasks))
+    # Submissions are limited to `limit` live tasks below; the pool is sized so that a
+    # queued task always gets a fresh thread when the one it replaces is stuck.
+    pool = CF.ThreadPoolExecutor(max_workers = len(tasks))
+    queued = iter(enumerate(tasks))
+    pending = {}
     try:
-        # Don't use geni.tempfile here - we don't want them deleted when the child process ends
-        # TODO: tempfiles should get deleted when the parent process picks them back up
-        mf = site.listresources(context, slc)
-        with tempfile.NamedTemporaryFile(delete=False) as file:
-            file.write(mf.text)
-            path = file.name
-
-        queue.put((site.name, slc, path))
-    except ListResourcesError:
-        queue.put((site.name, slc, None))
-    except Exception:
-        tb.print_exc()
-        queue.put((site.name, slc, None))
-
-def getManifests(context, ams, slices):
-    """Returns a two-level dictionary of the form:
-::
-    {slice_name : { site_object : manifest_object, ... }, ...}
-
-Containing the manifests for all provided slices at all the provided
-sites.    Requests are made in parallel and the function blocks until the
-slowest site returns (or times out)."""
+        while True:
+            for (idx, (key, func)) in itertools.islice(queued, max(0, limit - len(pending))):
+                pending[pool.submit(run, idx, func)] = (idx, key)
+            if not pending:
+                break
 
-    sitemap = {}
+            wait_for = None
+            if timeout is not None:
+                now = time.monotonic()
+                expired = False
+                for (fut, (idx, key)) in list(pending.items()):
+                    if idx in started and not fut.done() and now - started[idx] >= timeout:
+                        del pending[fut]
+                        expired = True
+                        yield (key, TimeoutError(f"No result within {timeout}s"))
+                if expired:
+                    continue
+                deadlines = [started[idx] + timeout for (idx, _) in pending.values() if idx in started]
+                wait_for = max(0, min(deadlines) - now) if deadlines else 0.05
+
+            (done, _) = CF.wait(pending, timeout = wait_for, return_when = CF.FIRST_COMPLETED)
+            for fut in done:
+                (_, key) = pending.pop(fut)
+                try:
+                    yield (key, fut.result())
+                except Exception as e:
+                    yield (key, e)
+    finally:
+        for fut in pending:
+            fut.cancel()
+        pool.shutdown(wait = False)
+
+
+def iter_manifests(context, ams, slices, max_workers = None, timeout = None):
+    """Generator yielding `(am, slice_name, manifest)` tuples for every combination
+of the provided aggregates and slices, in the order the aggregates answer.  At
+most `max_workers` requests are in flight at once, and a request that has not
+completed after `timeout` seconds is given up on (its thread is left to finish
+and no longer counts as in flight).  If a request fails, the exception is
+yielded in place of the manifest."""
+
+    tasks = []
     for am in ams:
-        sitemap[am.name] = am
-
-    queue = MP.Queue()
-    for site in ams:
         for slc in slices:
-            proc = MP.Process(target=_mp_get_manifest, args=(context, site, slc, queue))
-            proc.start()
+            tasks.append(((am, slc), functools.partial(am.list_resources, context, slc)))
 
-    while MP.active_children():
-        time.sleep(0.5)
+    for ((am, slc), mf) in _iter_bounded(tasks, max_workers, timeout):
+        yield (am, slc, mf)
 
-    d = {}
-    while not queue.empty():
-        (site, slc, mpath) = queue.get()
 
-        if mpath:
-            with open(mpath) as file:
-                am = sitemap[site]
-                data = file.read()
-                mf = am.amtype.parseManifest(data)
-                d.setdefault(slc, {})[sitemap[site]] = mf
+def getManifests(context, ams, slices, max_workers = None, timeout = None):
+    """Returns a two-level dictionary of the form:
+::
+        {slice_name : { site_object : manifest_object, ... }, ...}
 
-    return d
+Containing the manifests for all provided slices at all the provided
+sites.    Requests are made in parallel (see :py:func:`iter_manifests`) and the
+function blocks until the slowest site returns (or times out).  Sites that fail
+or time out are omitted."""
 
+    d = {}
+    for (am, slc, mf) in iter_manifests(context, ams, slices, max_workers, timeout):
+        if isinstance(mf, ListResourcesError):
+            continue
+        if isinstance(mf, Exception):
+            LOG.warning("Failed to get manifest for slice %s at %s: %s", slc, am.name, mf)
+            continue
+        d.setdefault(slc, {})[am] = mf
 
-def _mp_get_advertisement(context, site, queue):
-    try:
-        ad = site.listresources(context)
-        queue.put((site.name, ad))
-    except Exception:
-        queue.put((site.name, None))
+    return d
 
-def get_advertisements(context, ams):
-    """Returns a dictionary of the form:
-::
-    { site_object : advertisement_object, ...}
 
-Containing the advertisements for all the requested aggregates.    Requests
-are made in parallel and the function blocks until the slowest site
-returns (or times out).
+def iter_advertisements(context, ams, max_workers = None, timeout = None):
+    """Generator yielding `(am, advertisement)` pairs as each aggregate answers.
+At most `max_workers` requests are in flight at once, and an aggregate that has
+not answered after `timeout` seconds is given up on (as in
+:py:func:`iter_manifests`).  If a request fails, the exception
+(:py:class:`TimeoutError` for timeouts) is yielded in place of the
+advertisement."""
 
-.. warning::
-    Particularly large advertisements may break the shared memory queue
-    used by this function."""
+    tasks = [(am, functools.partial(am.list_resources, context)) for am in ams]
+    return _iter_bounded(tasks, max_workers, timeout)
 
 
-    queue = MP.Queue()
-    for site in ams:
-        proc = MP.Process(target=_mp_get_advertisement, args=(context, site, queue))
-        proc.start()
+def get_advertisements(context, ams, max_workers = None, timeout = None):
+    """Returns a dictionary of the form:
+::
+        { site_name : advertisement_object, ...}
 
-    while MP.active_children():
-        time.sleep(0.5)
+Containing the advertisements for all the requested aggregates (`None` for
+aggregates that failed or timed out).    Requests are made in parallel (see
+:py:func:`iter_advertisements`) and the function blocks until the slowest site
+returns (or times out)."""
 
     d = {}
-    while not queue.empty():
-        (site,ad) = queue.get()
-        d[site] = ad
+    for (am, ad) in iter_advertisements(context, ams, max_workers, timeout):
+        if isinstance(ad, Exception):
+            LOG.warning("Failed to get advertisement from %s: %s", am.name, ad)
+            ad = None
+        d[am.name] = ad
 
     return d
 
 
+def poll_advertisement(context, am, interval = 60, available = True, count = None):
+    """Generator that polls an aggregate and yields only what changed between polls.
+
+    The first poll yields a :py:class:`geni.rspec.pgad.AdDiff` with every node as added, and
+    each later poll that found a change yields the difference from the previous advertisement
+    (see :py:func:`geni.rspec.pgad.diff`).    Polls that find no change yield nothing.
+    Advertisements are always fetched from the aggregate, bypassing any advertisement cache.
+
+    Args:
+        context: geni-lib context
+        am: Aggregate to poll
+        interval (float): Seconds between the start of consecutive polls
+        available (bool): Passed to `list_resources`
+        count (int): Stop after this many polls (poll forever if `None`)
+    """
+    # pylint: disable=import-outside-toplevel
+    from .rspec import pgad
+
+    prev = None
+    polls = 0
+    while count is None or polls < count:
+        start = time.monotonic()
+        cur = am.list_resources(context, available = available, refresh = True)
+        delta = pgad.diff(prev, cur)
+        prev = cur
+        polls += 1
+        if delta:
+            yield delta
+        if count is not None and polls >= count:
+            break
+        time.sleep(max(0, interval - (time.monotonic() - start)))
+
+
 def delete_sliver_exists(am, context, sname):
     """Attempts to delete all slivers for the given slice at the given AM, suppressing all returned errors."""
     try:
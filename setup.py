@@ -15,6 +15,8 @@ requires = ["cryptography",
             "requests",
             "wrapt"]
 
+extras = {"analytics" : ["numpy"]}
+
 # If you are on linux, and don't have ca-certs, we can do an awful thing and it will still work
 if os.name == "posix" and os.uname()[0] == "Linux":
     if not os.path.exists("/etc/ssl/certs/ca-certificates.crt"):
@@ -40,6 +42,7 @@ setup(name = 'geni-lib',
 
       url = 'https://gitlab.flux.utah.edu/emulab/geni-lib',
       install_requires = requires,
+      extras_require = extras,
       classifiers = [
         "Development Status :: 5 - Production/Stable",
         "Environment :: Console",
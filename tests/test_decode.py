@@ -0,0 +1,86 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+#    This Source Code Form is subject to the terms of the Mozilla Public
+#    License, v. 2.0. If a copy of the MPL was not distributed with this
+#    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+# The streaming decoder must produce the same response as xmlrpclib.loads, whatever
+# the chunking, with the rspec `value` member parsed instead of left as a string.
+
+import base64
+import zlib
+
+import pytest
+from lxml import etree as ET
+from six.moves import xmlrpc_client as xmlrpclib
+
+# Importing geni.aggregate first avoids the geni.rspec.pg <-> geni.urn import cycle
+import geni.aggregate  # pylint: disable=unused-import
+from geni.minigcf import decode
+
+RSPEC = ("<rspec xmlns=\"http://www.geni.net/resources/rspec/3\" type=\"advertisement\">"
+         + "".join(["<node component_id=\"urn:publicid:IDN+example.net+node+pc%d\" "
+                    "exclusive=\"true\"><available now=\"true\"/></node>" % (idx)
+                    for idx in range(200)])
+         + "<node component_id=\"urn:publicid:IDN+example.net+node+café\"/></rspec>")
+
+RSPEC_DECL = "<?xml version=\"1.0\"?>\n" + RSPEC
+
+
+def _compress (text):
+    return base64.b64encode(zlib.compress(text.encode("utf-8"))).decode("ascii")
+
+def _wrapped (text):
+    # Compressed payloads split over lines, as some aggregates send them
+    return "\n".join([text[idx:idx + 76] for idx in range(0, len(text), 76)])
+
+def _response (value, output = ""):
+    ret = {"code" : {"geni_code" : 0, "am_type" : "protogeni", "am_code" : 0},
+           "value" : value, "output" : output}
+    return xmlrpclib.dumps((ret,), methodresponse = True, allow_none = True).encode("utf-8")
+
+def _stream (data, size):
+    decoder = decode.StreamingDecoder()
+    for idx in range(0, len(data), size):
+        decoder.feed(data[idx:idx + size])
+    return decoder.close()
+
+def _canonical (value):
+    # Both parsed elements and rspec strings, as serialized XML
+    if isinstance(value, str):
+        value = ET.fromstring(decode.decompress_rspec(value).encode("utf-8"))
+    return ET.tostring(value)
+
+
+CHUNK_SIZES = [1, 7, 100, decode.CHUNK_SIZE]
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+@pytest.mark.parametrize("rspec", [RSPEC, RSPEC_DECL, _compress(RSPEC), _wrapped(_compress(RSPEC))],
+                         ids = ["plain", "declaration", "compressed", "compressed-wrapped"])
+def test_rspec_value (rspec, size):
+    data = _response(rspec)
+    expected = xmlrpclib.loads(data, use_datetime = True)[0][0]
+    result = _stream(data, size)
+
+    assert ET.iselement(result["value"])
+    assert _canonical(result["value"]) == _canonical(expected["value"])
+    del result["value"]
+    del expected["value"]
+    assert result == expected
+
+
+@pytest.mark.parametrize("size", CHUNK_SIZES)
+@pytest.mark.parametrize("value", ["", "   ", "No such slice", "abcd", "café <not xml", 42, None,
+                                   {"value" : RSPEC, "other" : [1, 2.5, True]},
+                                   [RSPEC, {"geni_urn" : "urn:publicid:IDN+example.net+sliver+1"}]],
+                         ids = ["empty", "blank", "text", "base64-like", "text-lt", "int", "none",
+                                "struct", "array"])
+def test_other_values (value, size):
+    data = _response(value, output = "café")
+    assert _stream(data, size) == xmlrpclib.loads(data, use_datetime = True)[0][0]
+
+
+def test_fault ():
+    data = xmlrpclib.dumps(xmlrpclib.Fault(2, "Bad request"), methodresponse = True).encode("utf-8")
+    with pytest.raises(xmlrpclib.Fault):
+        _stream(data, 16)
@@ -0,0 +1,177 @@
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+#    This Source Code Form is subject to the terms of the Mozilla Public
+#    License, v. 2.0. If a copy of the MPL was not distributed with this
+#    file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+import pytest
+from lxml import etree as ET
+
+# Importing geni.aggregate first avoids the geni.rspec.pg <-> geni.urn import cycle
+import geni.aggregate  # pylint: disable=unused-import
+from geni.rspec import pg
+from geni.rspec import igext
+from geni.rspec.emulab import emuext
+
+
+def build_request(tour = True, tail = False):
+    request = pg.Request()
+    interfaces = []
+    for idx in range(6):
+        node = [pg.RawPC, igext.XenVM, igext.DockerContainer][idx % 3]("node-%d" % (idx))
+        node.disk_image = "urn:publicid:IDN+emulab.net+image+emulab-ops//UBUNTU22-64-STD"
+        node.add_service(pg.Execute(shell = "sh", command = "echo %d" % (idx)))
+        node.add_service(emuext.ProgramAgent("agent-%d" % (idx), "ls", "/tmp", True))
+        node.Blockstore("bs-%d" % (idx), "/mnt").size = "10GB"
+        node.Site("site-%d" % (idx % 2))
+        node.Desire("FirewallAllowAll", 1.0)
+        # A namespace the request doesn't declare, for which lxml makes up a prefix
+        raw = ET.Element("{http://example.com/undeclared}raw")
+        raw.text = "raw-%d" % (idx)
+        node.add_raw_element(raw)
+        intf = node.add_interface("eth1")
+        intf.add_address(pg.IPv4Address("10.1.1.%d" % (idx + 1), "255.255.255.0"))
+        intf.bandwidth = 1000 if idx % 2 else None
+        request.add_resource(node)
+        interfaces.append(intf)
+
+    lan = request.LAN("lan")
+    for intf in interfaces:
+        lan.add_interface(intf)
+    lan.vlan_tagging = True
+    lan.best_effort = True
+
+    link = pg.Link("link", members = [request.get("node-0"), request.get("node-1")])
+    link.latency = 5
+    request.add_resource(link)
+    request.L1Link("l1").add_node(request.get("node-2"))
+    request.add_resource(igext.RemoteBlockstore("remote", "/data"))
+
+    if tour:
+        request.add_tour(igext.Tour())
+        request.tour.Description(igext.Tour.TEXT, "A test profile")
+        request.tour.addStep(igext.Tour.Step(request.get("node-0"), "The first node"))
+
+    raw = ET.Element("{http://example.com/undeclared}top")
+    if tail:
+        raw.tail = "tail text"
+    request.add_raw_element(raw)
+    return request
+
+
+def iter_xml_string(request, pretty_print):
+    return "".join(request.iter_xml(pretty_print = pretty_print))
+
+
+@pytest.mark.parametrize("pretty_print", [False, True])
+@pytest.mark.parametrize("tour", [False, True])
+def test_iter_xml_matches_to_xml_string(pretty_print, tour):
+    request = build_request(tour = tour)
+    chunks = list(request.iter_xml(pretty_print = pretty_print))
+    assert len(chunks) > 1
+    assert "".join(chunks) == request.to_xml_string(pretty_print = pretty_print)
+
+
+@pytest.mark.parametrize("pretty_print", [False, True])
+def test_iter_xml_cached(pretty_print):
+    # Reused fragments must line up with lxml's prefix numbering like freshly rendered ones
+    expected = build_request().to_xml_string(pretty_print = pretty_print)
+    request = build_request()
+    request.cache_fragments = True
+    for _ in range(3):
+        assert iter_xml_string(request, pretty_print) == expected
+
+
+@pytest.mark.parametrize("pretty_print", [False, True])
+def test_iter_xml_raw_tail(pretty_print):
+    request = build_request(tail = True)
+    assert iter_xml_string(request, pretty_print) == request.to_xml_string(pretty_print = pretty_print)
+
+
+def test_iter_xml_empty():
+    request = pg.Request()
+    for pretty_print in (False, True):
+        assert iter_xml_string(request, pretty_print) == request.to_xml_string(pretty_print = pretty_print)
+
+
+def test_write_xml(tmp_path):
+    request = build_request()
+    path = tmp_path / "request.xml"
+    request.write_xml(str(path))
+    assert path.read_text(encoding = "utf-8") == request.to_xml_string(pretty_print = True)
+
+
+@pytest.mark.parametrize("first", [pg.RawPC, igext.XenVM, pg.Link, pg.LAN])
+@pytest.mark.parametrize("second", [pg.RawPC, igext.XenVM, pg.Link, pg.LAN])
+def test_duplicate_resource(first, second):
+    request = pg.Request()
+    existing = first("dup")
+    request.add_resource(existing)
+    with pytest.raises(pg.DuplicateClientIdError):
+        request.add_resource(second("dup"))
+    assert request.resources == [existing]
+    assert request.get("dup") is existing
+
+
+def test_duplicate_extension():
+    request = pg.Request()
+    node = request.RawPC("dup")
+    for make in (request.LAN, request.Link, request.XenVM, request.Switch, request.L1Link,
+                 lambda name: request.AddressPool(name, 2)):
+        with pytest.raises(pg.DuplicateClientIdError):
+            make("dup")
+    assert request.resources == [node]
+    request.AddressPool("pool", 2)
+    with pytest.raises(pg.DuplicateClientIdError):
+        request.add_resource(pg.RawPC("pool"))
+
+
+def test_duplicate_interface():
+    request = pg.Request()
+    node = request.RawPC("node")
+    intf = node.add_interface("if0")
+    # A resource named like an existing interface, and the other way around
+    with pytest.raises(pg.DuplicateClientIdError):
+        request.add_resource(pg.RawPC("node:if0"))
+    request.add_resource(pg.RawPC("other:if1"))
+    other = pg.RawPC("other")
+    other.add_interface("if1")
+    with pytest.raises(pg.DuplicateClientIdError):
+        request.add_resource(other)
+    # Interfaces added to a node that is already in the request
+    request.add_resource(pg.LAN("node:if1"))
+    with pytest.raises(pg.DuplicateClientIdError):
+        node.add_interface("if1")
+    assert node.interfaces == [intf]
+
+
+def test_duplicate_link_interface():
+    request = pg.Request()
+    request.RawPC("a:if0")
+    link = request.Link("link")
+    loose = pg.RawPC("a").add_interface("if0")
+    with pytest.raises(pg.DuplicateClientIdError):
+        link.add_interface(loose)
+    assert not link.interfaces
+
+
+def test_same_object_twice():
+    request = pg.Request()
+    node = request.RawPC("node")
+    intf = node.add_interface()
+    lan = request.LAN("lan")
+    lan.add_interface(intf)
+    request.Link("link").add_interface(intf)
+    assert request.get(intf.client_id) is intf
+
+
+def test_renamed():
+    request = pg.Request()
+    node = request.RawPC("old")
+    node.client_id = "new"
+    assert request.get("old") is None
+    request.add_resource(pg.RawPC("old"))
+    request.reindex()
+    assert request.get("new") is node
+    with pytest.raises(pg.DuplicateClientIdError):
+        request.add_resource(pg.RawPC("new"))
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Check and time `Request.cache_fragments`: apply a sequence of random edits to a request,
+re-serialize after each one, and compare the cached output with an uncached render of
+the same request.  Exits non-zero on the first difference.
+
+  python tools/benchmarks/bench_fragment_cache.py --nodes 2000 --edits 200
+"""
+
+import argparse
+import random
+import sys
+import time
+
+# Importing geni.aggregate first avoids the geni.rspec.pg <-> geni.urn import cycle
+import geni.aggregate  # pylint: disable=unused-import
+from geni.rspec import pg
+from geni.rspec import igext
+
+
+def build (count, rnd):
+  request = pg.Request()
+  nodes = []
+  for idx in range(count):
+    node = (igext.XenVM if idx % 3 else pg.RawPC)("node-%d" % (idx))
+    if rnd.random() < 0.3:
+      node.Site("site-%d" % (idx % 4))
+    if rnd.random() < 0.2:
+      node.routable_control_ip = True
+    request.add_resource(node)
+    nodes.append(node)
+  links = []
+  for idx in range(max(1, count // 10)):
+    link = (pg.LAN if idx % 2 else pg.Link)("link-%d" % (idx))
+    for node in rnd.sample(nodes, min(len(nodes), 3)):
+      link.add_interface(node.add_interface())
+    request.add_resource(link)
+    links.append(link)
+  return (request, nodes, links)
+
+
+def edit (request, nodes, links, rnd):
+  node = rnd.choice(nodes)
+  link = rnd.choice(links)
+  choice = rnd.randrange(9)
+  if choice == 0:
+    node.hardware_type = rnd.choice(["d430", "m510", None])
+  elif choice == 1:
+    node.routable_control_ip = not node.routable_control_ip
+  elif choice == 2:
+    node.Site("site-%d" % (rnd.randrange(4)))
+  elif choice == 3:
+    link.best_effort = not link.best_effort
+  elif choice == 4:
+    link.vlan_tagging = rnd.choice([True, False])
+  elif choice == 5:
+    if link.interfaces:
+      rnd.choice(link.interfaces).bandwidth = rnd.choice([1000, 10000, None])
+  elif choice == 6:
+    link.add_interface(node.add_interface())
+  elif choice == 7:
+    node.add_service(pg.Execute("sh", "echo %d" % (rnd.randrange(100))))
+  else:
+    new = pg.RawPC("node-%d" % (len(nodes)))
+    if rnd.random() < 0.5:
+      new.Site("site-0")
+    request.add_resource(new)
+    nodes.append(new)
+
+
+def uncached (request, pretty_print):
+  (cache, request._fragment_cache) = (request._fragment_cache, None)
+  try:
+    return request.to_xml_string(pretty_print = pretty_print)
+  finally:
+    request._fragment_cache = cache
+
+
+def main ():
+  parser = argparse.ArgumentParser(description = __doc__.strip().splitlines()[0])
+  parser.add_argument("--nodes", type = int, default = 2000)
+  parser.add_argument("--edits", type = int, default = 200)
+  parser.add_argument("--seed", type = int, default = 1)
+  opts = parser.parse_args()
+
+  rnd = random.Random(opts.seed)
+  (request, nodes, links) = build(opts.nodes, rnd)
+  request.cache_fragments = True
+
+  (cached_time, uncached_time) = (0.0, 0.0)
+  for step in range(opts.edits + 1):
+    if step:
+      edit(request, nodes, links, rnd)
+    pretty_print = step == opts.edits
+    start = time.perf_counter()
+    out = request.to_xml_string(pretty_print = pretty_print)
+    cached_time += time.perf_counter() - start
+    start = time.perf_counter()
+    ref = uncached(request, pretty_print)
+    uncached_time += time.perf_counter() - start
+    if out != ref:
+      print("Cached output differs from an uncached render after %d edits" % (step))
+      sys.exit(1)
+
+  print("%d nodes, %d edits: cached output identical" % (opts.nodes, opts.edits))
+  print("  uncached  %8.3fs" % (uncached_time))
+  print("  cached    %8.3fs" % (cached_time))
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Time `<property>` emission for a shaped multi-member link: the pair walk the link writer
+used to do with itertools.permutations, the current pairwise writer, and the compact
+(`Link.compact_properties`) writer, which emits one property per member as LAN does.
+
+  python tools/benchmarks/bench_link_properties.py --members 1000
+"""
+
+import argparse
+import itertools
+import time
+
+from lxml import etree as ET
+
+# Importing geni.aggregate first avoids the geni.rspec.pg <-> geni.urn import cycle
+import geni.aggregate  # pylint: disable=unused-import
+import geni.namespaces as GNS
+from geni.rspec import pg
+
+
+def build_link (members, shaped):
+  link = pg.Link("biglink")
+  for idx in range(members):
+    node = pg.RawPC("node-%d" % (idx))
+    intf = node.add_interface("if0")
+    if shaped == "uniform":
+      (intf.bandwidth, intf.latency) = (10000, 5)
+    elif shaped == "mixed" and idx % 10 == 0:
+      (intf.bandwidth, intf.latency, intf.plr) = (1000, 20, 0.01)
+    link.add_interface(intf)
+  if shaped == "mixed":
+    link.bandwidth = 10000
+  return link
+
+
+def write_permutations (link, lnk):
+  # The previous writer, kept here as the baseline
+  for (intf_a, intf_b) in itertools.permutations(link.interfaces, 2):
+    bw = intf_a.bandwidth if intf_a.bandwidth else link.bandwidth
+    lat = intf_a.latency if intf_a.latency else link.latency
+    plr = intf_a.plr if intf_a.plr else link.plr
+    if bw != pg.Link.DEFAULT_BW or lat != pg.Link.DEFAULT_LAT or plr != pg.Link.DEFAULT_PLR:
+      prop = ET.SubElement(lnk, "{%s}property" % (GNS.REQUEST.name))
+      prop.attrib["source_id"] = intf_b.client_id
+      prop.attrib["dest_id"] = intf_a.client_id
+      if bw != pg.Link.DEFAULT_BW:
+        prop.attrib["capacity"] = str(bw)
+      if lat != pg.Link.DEFAULT_LAT:
+        prop.attrib["latency"] = str(lat)
+      if plr != pg.Link.DEFAULT_PLR:
+        prop.attrib["packet_loss"] = str(plr)
+
+
+def write_pairs (link, lnk):
+  link._write_pair_props(lnk)
+
+
+def write_compact (link, lnk):
+  for (intf, attrs) in zip(link.interfaces, link._member_shaping()):
+    link._write_shaping(lnk, intf.client_id, link.client_id, attrs)
+
+
+def measure (func, link, repeat):
+  best = None
+  for _ in range(repeat):
+    lnk = ET.Element("{%s}link" % (GNS.REQUEST.name))
+    start = time.perf_counter()
+    func(link, lnk)
+    size = len(ET.tostring(lnk))
+    elapsed = time.perf_counter() - start
+    best = elapsed if best is None else min(best, elapsed)
+  return (best, len(lnk), size)
+
+
+def main ():
+  parser = argparse.ArgumentParser(description = __doc__.strip().splitlines()[0])
+  parser.add_argument("--members", type = int, default = 1000)
+  parser.add_argument("--repeat", type = int, default = 3)
+  opts = parser.parse_args()
+
+  print("%d-member link, best of %d (emission + serialization)" % (opts.members, opts.repeat))
+  for shaped in ("none", "mixed", "uniform"):
+    link = build_link(opts.members, shaped)
+    print("  shaping: %s" % (shaped))
+    for (label, func) in (("permutations", write_permutations), ("pairwise", write_pairs),
+                          ("compact", write_compact)):
+      (elapsed, count, size) = measure(func, link, opts.repeat)
+      print("    %-14s %8.3fs  %8d properties  %7.1f MB" % (label, elapsed, count, size / 1e6))
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Measure the memory held by the request model (pg.Request and the nodes, interfaces,
+links and services in it), in bytes per node, using tracemalloc.
+
+  python tools/benchmarks/bench_request_memory.py --nodes 50000
+
+Each scenario builds a fresh request and reports the memory still allocated once it
+has been built, so the numbers cover the model objects and not the XML writer.
+"""
+
+import argparse
+import gc
+import tracemalloc
+
+# Importing geni.aggregate first avoids the geni.rspec.pg <-> geni.urn import cycle
+import geni.aggregate  # pylint: disable=unused-import
+from geni.rspec import pg
+from geni.rspec import igext
+from geni.rspec.emulab import emuext  # pylint: disable=unused-import
+
+
+def build_bare (request, count):
+  for idx in range(count):
+    request.add_resource(pg.RawPC("node-%d" % (idx)))
+
+
+def build_lan (request, count):
+  lan = request.LAN("lan")
+  for idx in range(count):
+    node = pg.RawPC("node-%d" % (idx))
+    node.disk_image = "urn:publicid:IDN+emulab.net+image+emulab-ops:UBUNTU22-64-STD"
+    request.add_resource(node)
+    intf = node.add_interface("if0")
+    intf.add_address(pg.IPv4Address("10.%d.%d.%d" % (idx >> 16, (idx >> 8) & 255, idx & 255), "255.0.0.0"))
+    lan.add_interface(intf)
+
+
+def build_vms (request, count):
+  for idx in range(0, count, 2):
+    vm_a = igext.XenVM("vm-%d" % (idx))
+    vm_b = igext.XenVM("vm-%d" % (idx + 1))
+    for node in (vm_a, vm_b):
+      (node.cores, node.ram) = (2, 4096)
+      node.add_service(pg.Execute("sh", "/local/repository/setup.sh"))
+      node.Desire("FirewallAllowAll", 1.0)
+      request.add_resource(node)
+    link = request.Link(members = [vm_a, vm_b])
+    link.bandwidth = 100000
+
+
+SCENARIOS = (("bare", build_bare), ("lan", build_lan), ("vms", build_vms))
+
+
+def measure (build, count):
+  gc.collect()
+  tracemalloc.start()
+  start = tracemalloc.get_traced_memory()[0]
+  request = pg.Request()
+  build(request, count)
+  gc.collect()
+  used = tracemalloc.get_traced_memory()[0] - start
+  tracemalloc.stop()
+  del request
+  return used
+
+
+def main ():
+  parser = argparse.ArgumentParser(description = __doc__.strip().splitlines()[0])
+  parser.add_argument("--nodes", type = int, default = 20000)
+  parser.add_argument("--scenario", choices = [name for (name, _) in SCENARIOS], action = "append")
+  opts = parser.parse_args()
+
+  print("%d nodes, memory held after building the request" % (opts.nodes))
+  for (name, build) in SCENARIOS:
+    if opts.scenario and name not in opts.scenario:
+      continue
+    used = measure(build, opts.nodes)
+    print("  %-6s %8.0f bytes/node  %8.1f MB" % (name, used / opts.nodes, used / 1e6))
+
+
+if __name__ == "__main__":
+  main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+
+# Copyright (c) 2026  Barnstormer Softworks, Ltd.
+
+# This Source Code Form is subject to the terms of the Mozilla Public
+# License, v. 2.0. If a copy of the MPL was not distributed with this
+# file, You can obtain one at http://mozilla.org/MPL/2.0/.
+
+"""
+Compare string `elem.xpath(...)` calls against the precompiled expressions in
+:py:mod:`geni.rspec.xpath` on a synthetic ProtoGENI advertisement.
+
+  python tools/benchmarks/bench_xpath.py --nodes 5000 --repeat 5
+"""
+
+import argparse
+import time
+
+from lxml import etree as ET
+
+# Importing geni.aggregate first avoids the geni.rspec.pg <-> geni.urn import cycle
+from geni.testing.fakeam import synthetic_advertisement
+from geni.rspec import pgad
+from geni.rspec import xpath
+
+# The per-node lookups made when every AdNode attribute is decoded
+NODE_EXPRS = [("g:available", xpath.PG_AVAILABLE, {}),
+              ("g:sliver_type", xpath.PG_SLIVER_TYPE, {}),
+              ("g:hardware_type", xpath.PG_HARDWARE_TYPE, {}),
+              ("e:fd[@name=$name]", xpath.EMULAB_FD_BY_NAME, {"name" : "cpu"}),
+              ("e:fd[@name=$name]", xpath.EMULAB_FD_BY_NAME, {"name" : "ram"}),
+              ("e:fd[@name=$name]", xpath.EMULAB_FD_BY_NAME, {"name" : "pcshared"}),
+              ("g:interface", xpath.PG_INTERFACE, {}),
+              ("g:location", xpath.PG_LOCATION, {})]
+
+
+def _best (func, repeat):
+  best = None
+  for _ in range(repeat):
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    best = elapsed if best is None else min(best, elapsed)
+  return best
+
+
+def run_strings (nodes):
+  for node in nodes:
+    for (expr, _, kwargs) in NODE_EXPRS:
+      node.xpath(expr, namespaces = xpath.NAMESPACES, **kwargs)
+
+
+def run_compiled (nodes):
+  for node in nodes:
+    for (_, compiled, kwargs) in NODE_EXPRS:
+      compiled(node, **kwargs)
+
+
+def run_decode (ad):
+  for node in ad.nodes:
+    (node.available, node.sliver_types, node.images, node.hardware_types, node.cpu, node.ram,
+     node.shared, node.interfaces, node.location)
+
+
+def main ():
+  parser = argparse.ArgumentParser(description = __doc__.strip().splitlines()[0])
+  parser.add_argument("--nodes", type = int, default = 5000)
+  parser.add_argument("--repeat", type = int, default = 5)
+  opts = parser.parse_args()
+
+  xml = synthetic_advertisement(opts.nodes, seed = 0)
+  ad = pgad.Advertisement(xml = xml)
+  elems = ad._root.findall("{%s}node" % (xpath.NAMESPACES["g"]))
+  lookups = len(elems) * len(NODE_EXPRS)
+
+  t_str = _best(lambda: run_strings(elems), opts.repeat)
+  t_comp = _best(lambda: run_compiled(elems), opts.repeat)
+  t_decode = _best(lambda: run_decode(pgad.Advertisement(root = ET.fromstring(xml.encode("utf-8")))), opts.repeat)
+
+  print("%d nodes, %d lookups per pass, best of %d" % (len(elems), lookups, opts.repeat))
+  print("  elem.xpath(str)      %8.3fs  %6.2f us/lookup" % (t_str, t_str / lookups * 1e6))
+  print("  precompiled XPath    %8.3fs  %6.2f us/lookup  (%.1fx)" % (t_comp, t_comp / lookups * 1e6, t_str / t_comp))
+  print("  full AdNode decode   %8.3fs  (includes parsing the advertisement)" % (t_decode))
+
+
+if __name__ == "__main__":
+  main()